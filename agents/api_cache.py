@@ -0,0 +1,134 @@
+import asyncio
+import copy
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple, Union
+
+from .metrics import metrics
+
+Tags = Union[Iterable[str], Callable[[Any], Iterable[str]]]
+
+
+def order_tag(order_id) -> str:
+    return f"order:{order_id}"
+
+
+def document_tag(document: str) -> str:
+    return f"document:{re.sub(r'[^0-9A-Za-z]', '', str(document))}"
+
+
+class ResponseCache:
+    """Cache TTL + LRU para leituras da API de pedidos, com invalidação por tags."""
+
+    def __init__(self, ttl: float = 60.0, max_entries: int = 1024, name: str = "orders_api"):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.name = name
+        self._entries: "OrderedDict[str, Tuple[float, Any, Set[str]]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        # Tags invalidadas durante cada busca em andamento; ``None`` depois de um ``clear()``.
+        self._invalidated: Dict[asyncio.Future, Optional[Set[str]]] = {}
+
+    def _count(self, result: str) -> None:
+        metrics.increment("api_cache_requests_total", cache=self.name, result=result)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def _store(self, key: str, value: Any, tags: Iterable[str]) -> None:
+        self._remove(key)
+        tag_set = set(tags)
+        self._entries[key] = (time.monotonic() + self.ttl, value, tag_set)
+        for tag in tag_set:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]], tags: Tags = ()) -> Any:
+        """Retornar a resposta em cache ou buscá-la, compartilhando buscas simultâneas."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self._count("hit")
+                return copy.deepcopy(entry[1])
+            self._remove(key)
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self._count("coalesced")
+            try:
+                return copy.deepcopy(await asyncio.shield(in_flight))
+            except asyncio.CancelledError:
+                # Quem iniciou a busca foi cancelado (uma busca antecipada, por
+                # exemplo); esta chamada segue com a própria requisição.
+                if not in_flight.cancelled():
+                    raise
+
+        self._count("miss")
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        self._invalidated[future] = set()
+        try:
+            value = await fetch()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Evita o aviso de exceção não recuperada quando ninguém mais aguardava.
+            future.exception()
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+            invalidated = self._invalidated.pop(future, None)
+
+        future.set_result(value)
+        # Se uma escrita invalidou alguma tag desta resposta durante a busca, ela
+        # pode já estar desatualizada e não é guardada.
+        tag_set = set(tags(value) if callable(tags) else tags)
+        if invalidated is not None and not invalidated & tag_set:
+            self._store(key, value, tag_set)
+        return copy.deepcopy(value)
+
+    def has(self, key: str) -> bool:
+        """``True`` se a próxima leitura de ``key`` não fará uma nova requisição."""
+        entry = self._entries.get(key)
+        return (entry is not None and entry[0] > time.monotonic()) or key in self._in_flight
+
+    def invalidate(self, *tags: str) -> int:
+        """Remover todas as entradas marcadas com alguma das tags informadas."""
+        for invalidated in self._invalidated.values():
+            if invalidated is not None:
+                invalidated.update(tags)
+        removed = 0
+        for tag in tags:
+            for key in list(self._tags.get(tag, ())):
+                self._remove(key)
+                removed += 1
+        if removed:
+            metrics.increment("api_cache_invalidations_total", removed, cache=self.name)
+        return removed
+
+    def clear(self) -> None:
+        self._invalidated = dict.fromkeys(self._invalidated)
+        self._entries.clear()
+        self._tags.clear()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "entries": len(self._entries),
+            "hits": metrics.value("api_cache_requests_total", cache=self.name, result="hit"),
+            "misses": metrics.value("api_cache_requests_total", cache=self.name, result="miss"),
+            "coalesced": metrics.value("api_cache_requests_total", cache=self.name, result="coalesced"),
+        }
@@ -0,0 +1,204 @@
+"""Carrinho e rascunho de alterações de pedido, guardados em listas compactas no estado da sessão."""
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .records import OrderItem
+
+try:
+    CART_MAX_LINES = int(os.getenv("CART_MAX_LINES", "20"))
+except (TypeError, ValueError):
+    CART_MAX_LINES = 20
+
+try:
+    CART_MAX_QUANTITY = int(os.getenv("CART_MAX_QUANTITY", "50"))
+except (TypeError, ValueError):
+    CART_MAX_QUANTITY = 50
+
+LineKey = Tuple[str, str, str]
+
+
+class CartError(ValueError):
+    """A alteração não cabe no carrinho ou se refere a um item inexistente."""
+
+
+class LineItem:
+    __slots__ = ("name", "size", "crust", "quantity", "unit_price")
+
+    def __init__(self, name: str, size: str, crust: str, quantity: int, unit_price: float):
+        self.name = name
+        self.size = size
+        self.crust = crust
+        self.quantity = quantity
+        self.unit_price = unit_price
+
+    @property
+    def key(self) -> LineKey:
+        return self.name, self.size, self.crust
+
+    @property
+    def line_total(self) -> float:
+        return round(self.unit_price * self.quantity, 2)
+
+    def as_item(self) -> Dict:
+        """Item no formato usado pelo ``PricingEngine``."""
+        return {
+            "name": self.name,
+            "size": self.size,
+            "crust": self.crust,
+            "quantity": self.quantity,
+            "unit_price": self.unit_price,
+        }
+
+    def to_row(self) -> List:
+        return [self.name, self.size, self.crust, self.quantity, self.unit_price]
+
+
+def _check_quantity(quantity: int) -> None:
+    if quantity > CART_MAX_QUANTITY:
+        raise CartError(f"A quantidade máxima por item é {CART_MAX_QUANTITY}.")
+
+
+class Cart:
+    """Itens do pedido em criação, somando linhas iguais e mantendo o total a cada alteração."""
+
+    __slots__ = ("_lines", "total")
+
+    def __init__(self, lines: Optional[List[LineItem]] = None):
+        self._lines: Dict[LineKey, LineItem] = {}
+        self.total = 0.0
+        for line in lines or []:
+            self._lines[line.key] = line
+            self.total += line.unit_price * line.quantity
+        self.total = round(self.total, 2)
+
+    @classmethod
+    def from_state(cls, rows: Optional[List]) -> "Cart":
+        return cls([LineItem(*row) for row in rows or []])
+
+    def to_state(self) -> List[List]:
+        return [line.to_row() for line in self._lines.values()]
+
+    def __iter__(self) -> Iterator[LineItem]:
+        return iter(self._lines.values())
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def add(self, item: Dict) -> LineItem:
+        """Somar um item já precificado; devolve a linha resultante."""
+        key = (item["name"], item["size"], item["crust"])
+        quantity = int(item["quantity"])
+        line = self._lines.get(key)
+        if line is None:
+            if len(self._lines) >= CART_MAX_LINES:
+                raise CartError(f"O pedido pode ter no máximo {CART_MAX_LINES} itens diferentes.")
+            _check_quantity(quantity)
+            line = LineItem(*key, quantity, float(item["unit_price"]))
+            self._lines[key] = line
+        else:
+            _check_quantity(line.quantity + quantity)
+            line.quantity += quantity
+        self.total = round(self.total + line.unit_price * quantity, 2)
+        return line
+
+    def remove(self, key: LineKey) -> Optional[LineItem]:
+        """Retirar a linha inteira; devolve ``None`` se ela não estiver no carrinho."""
+        line = self._lines.pop(key, None)
+        if line is not None:
+            self.total = round(self.total - line.line_total, 2)
+        return line
+
+
+class OrderDraft:
+    """Pedido selecionado para alteração e o registro das alterações pendentes."""
+
+    __slots__ = ("order_id", "items", "changes")
+
+    def __init__(self, order_id: Optional[int] = None, items: Optional[Dict[int, List]] = None,
+                 changes: Optional[List[List]] = None):
+        self.order_id = order_id
+        self.items = items or {}
+        # ["add", sabor, tamanho, borda, quantidade, preço], ["remove", id_do_item]
+        # ou ["address", rua, número, complemento, ponto_de_referência].
+        self.changes = changes or []
+
+    @classmethod
+    def from_state(cls, session_state: Dict) -> "OrderDraft":
+        order = session_state.get("selected_order") or {}
+        items = {row[0]: row for row in order.get("items", [])}
+        return cls(order.get("id"), items, [list(change) for change in session_state.get("changes") or []])
+
+    def save(self, session_state: Dict) -> None:
+        session_state["selected_order_id"] = self.order_id
+        session_state["selected_order"] = {"id": self.order_id, "items": list(self.items.values())}
+        session_state["changes"] = self.changes
+
+    def select(self, order: Dict) -> None:
+        """Selecionar um pedido; só as alterações pendentes de outro pedido são descartadas."""
+        if self.order_id is not None and order.get("id") != self.order_id:
+            self.changes = []
+        self.order_id = order.get("id")
+        self.items = {item["id"]: list(OrderItem.from_api(item)) for item in order.get("items", [])}
+
+    def _check_size(self) -> None:
+        if len(self.changes) >= CART_MAX_LINES:
+            raise CartError(f"São permitidas no máximo {CART_MAX_LINES} alterações pendentes por vez.")
+
+    def add_item(self, item: Dict) -> LineItem:
+        quantity = int(item["quantity"])
+        for change in self.changes:
+            if change[0] == "add" and tuple(change[1:4]) == (item["name"], item["size"], item["crust"]):
+                _check_quantity(change[4] + quantity)
+                change[4] += quantity
+                return LineItem(*change[1:])
+        self._check_size()
+        _check_quantity(quantity)
+        change = ["add", item["name"], item["size"], item["crust"], quantity, float(item["unit_price"])]
+        self.changes.append(change)
+        return LineItem(*change[1:])
+
+    def remove_item(self, item_id: int) -> None:
+        if self.order_id is None:
+            raise CartError("Nenhum pedido selecionado. Por favor, selecione um pedido primeiro.")
+        if item_id not in self.items:
+            raise CartError(f"O item {item_id} não faz parte do pedido #{self.order_id}. Use os IDs de find_order_items().")
+        if ["remove", item_id] in self.changes:
+            return
+        self._check_size()
+        self.changes.append(["remove", item_id])
+
+    def set_address(self, street_name: str, number: int, complement: str, reference_point: str) -> None:
+        self.changes = [change for change in self.changes if change[0] != "address"]
+        self.changes.append(["address", street_name, number, complement, reference_point])
+
+    def additions(self) -> List[LineItem]:
+        return [LineItem(*change[1:]) for change in self.changes if change[0] == "add"]
+
+    def removals(self) -> List[int]:
+        return [change[1] for change in self.changes if change[0] == "remove"]
+
+    def address(self) -> Optional[Dict]:
+        for change in self.changes:
+            if change[0] == "address":
+                street_name, number, complement, reference_point = change[1:]
+                return {
+                    "street_name": street_name,
+                    "number": number,
+                    "complement": complement,
+                    "reference_point": reference_point,
+                }
+        return None
+
+    @property
+    def additions_total(self) -> float:
+        return round(sum(line.line_total for line in self.additions()), 2)
+
+    def discard(self, kind: str, item_ids: Optional[List[int]] = None) -> None:
+        """Tirar do registro as alterações já aplicadas na API."""
+        if kind == "remove":
+            applied = set(item_ids or ())
+            self.changes = [change for change in self.changes if change[0] != "remove" or change[1] not in applied]
+            for item_id in applied:
+                self.items.pop(item_id, None)
+        else:
+            self.changes = [change for change in self.changes if change[0] != kind]
@@ -0,0 +1,67 @@
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import duckdb
+
+MENU_QUERY = """
+SELECT p.sabor AS pizza_name, t.tamanho AS size, b.tipo AS crust, pr.preco AS unit_price
+FROM pizzas p
+JOIN precos pr ON p.id = pr.pizza_id
+JOIN tamanhos t ON pr.tamanho_id = t.id
+JOIN bordas b ON pr.borda_id = b.id;
+"""
+
+MENU_COLUMNS = ("pizza_name", "size", "crust", "unit_price")
+
+
+class CatalogDatabase:
+    """Acesso somente leitura ao banco do cardápio, com uma conexão compartilhada e um cursor por thread."""
+
+    def __init__(self, db_path: Optional[str], read_only: bool = True):
+        self.db_path = db_path
+        self.read_only = read_only
+        self._connection: Optional["duckdb.DuckDBPyConnection"] = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._statements: Dict[str, Tuple[str, int]] = {}
+
+    @property
+    def connection(self) -> "duckdb.DuckDBPyConnection":
+        if self._connection is None:
+            with self._lock:
+                if self._connection is None:
+                    # Importado só aqui: quem lê o cardápio de um snapshot não precisa do DuckDB.
+                    import duckdb
+
+                    kwargs = {"read_only": self.read_only} if self.read_only else {}
+                    self._connection = duckdb.connect(database=self.db_path or ":memory:", **kwargs)
+        return self._connection
+
+    def cursor(self) -> "duckdb.DuckDBPyConnection":
+        """Cursor da thread atual, criado na primeira consulta dela."""
+        connection = self.connection
+        cursor = getattr(self._local, "cursor", None)
+        if cursor is None or getattr(self._local, "connection", None) is not connection:
+            cursor = connection.cursor()
+            self._local.cursor = cursor
+            self._local.connection = connection
+        return cursor
+
+    def prepare(self, name: str, sql: str, columns: Sequence[str]) -> None:
+        """Registrar uma consulta que será lida como colunas ``columns``."""
+        aggregates = ", ".join(f"list({column})" for column in columns)
+        self._statements[name] = (f"SELECT {aggregates} FROM ({sql.strip().rstrip(';')}) AS query", len(columns))
+
+    def query_columns(self, name: str, parameters: Optional[Sequence] = None) -> Tuple[List, ...]:
+        """Executar a consulta registrada e devolver uma lista por coluna."""
+        sql, width = self._statements[name]
+        row = self.cursor().execute(sql, parameters).fetchone()
+        # Sem linhas, ``list()`` devolve NULL em cada coluna.
+        return tuple(column or [] for column in row) if row else tuple([] for _ in range(width))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+            self._connection = None
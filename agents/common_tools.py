@@ -1,117 +1,185 @@
 from dotenv import load_dotenv
 import os
-import asyncio
+import json
+import logging
 from typing import Dict, Optional
-import requests
-from requests.exceptions import RequestException
-from agno.tools.duckdb import DuckDbTools
-from difflib import get_close_matches
+
+from .api_cache import ResponseCache, Tags
+from .catalog_db import MENU_COLUMNS, MENU_QUERY, CatalogDatabase
+from .http_client import OrdersApiClient
+from .menu_catalog import MenuCatalog, MenuData
+from .menu_snapshot import load_snapshot
+from .prefetch import Prefetcher
+from .pricing import PricingEngine
+from .tool_cache import ToolMemo
+from .tracing import tracer
+
+logger = logging.getLogger(__name__)
 
 load_dotenv()
 db_path = os.getenv("SQLITE_DB_PATH")
 ORDER_API_URL = os.getenv("ORDER_API_URL")
+MENU_SNAPSHOT_PATH = os.getenv("MENU_SNAPSHOT_PATH")
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+ORDERS_API_TIMEOUT = _env_float("ORDERS_API_TIMEOUT", 10.0)
+ORDERS_API_CONNECT_TIMEOUT = _env_float("ORDERS_API_CONNECT_TIMEOUT", 3.0)
+ORDERS_API_MAX_CONNECTIONS = _env_int("ORDERS_API_MAX_CONNECTIONS", 20)
+ORDERS_API_MAX_PER_HOST = _env_int("ORDERS_API_MAX_PER_HOST", 10)
+ORDERS_API_MAX_RETRIES = _env_int("ORDERS_API_MAX_RETRIES", 2)
+ORDERS_API_RETRY_BACKOFF = _env_float("ORDERS_API_RETRY_BACKOFF", 0.1)
+ORDERS_API_RETRY_BACKOFF_MAX = _env_float("ORDERS_API_RETRY_BACKOFF_MAX", 2.0)
+ORDERS_API_BREAKER_THRESHOLD = _env_int("ORDERS_API_BREAKER_THRESHOLD", 5)
+ORDERS_API_BREAKER_RESET = _env_float("ORDERS_API_BREAKER_RESET", 30.0)
+ORDERS_API_MAX_FANOUT = _env_int("ORDERS_API_MAX_FANOUT", 4)
+
+ORDERS_API_BULK_DELETE = os.getenv("ORDERS_API_BULK_DELETE", "").lower() in ("1", "true", "yes")
+ORDERS_API_BULK_DELETE_ENDPOINT = os.getenv(
+    "ORDERS_API_BULK_DELETE_ENDPOINT", "/api/orders/{order_id}/remove-items/"
+)
+
+ORDERS_PREFETCH = os.getenv("ORDERS_PREFETCH", "true").lower() in ("1", "true", "yes")
+ORDERS_PREFETCH_MAX_PER_SESSION = _env_int("ORDERS_PREFETCH_MAX_PER_SESSION", 3)
+ORDERS_CACHE_TTL = _env_float("ORDERS_CACHE_TTL", 60.0)
+ORDERS_CACHE_MAX_ENTRIES = _env_int("ORDERS_CACHE_MAX_ENTRIES", 1024)
+MENU_REFRESH_INTERVAL = _env_float("MENU_REFRESH_INTERVAL", 5.0)
+TOOL_CACHE_MAX_ENTRIES = _env_int("TOOL_CACHE_MAX_ENTRIES", 512)
+FLAVOUR_MATCH_MARGIN = _env_float("FLAVOUR_MATCH_MARGIN", 0.05)
+
+
+def _load_flavour_aliases() -> Dict[str, str]:
+    aliases_path = os.getenv("MENU_ALIASES_PATH")
+    if not aliases_path:
+        return {}
+    try:
+        with open(aliases_path, encoding="utf-8") as aliases_file:
+            return dict(json.load(aliases_file))
+    except (OSError, ValueError, TypeError) as exc:
+        logger.warning("Não foi possível carregar apelidos de sabores: %s", exc)
+        return {}
+
+
+catalog_db = CatalogDatabase(db_path=db_path, read_only=True)
+catalog_db.prepare("menu", MENU_QUERY, MENU_COLUMNS)
+
 
-try:
-    ORDERS_API_TIMEOUT = float(os.getenv("ORDERS_API_TIMEOUT", "10"))
-except (TypeError, ValueError):
-    ORDERS_API_TIMEOUT = 10.0
+def _load_menu_rows() -> list:
+    with tracer.span("menu_query", kind="db") as span:
+        columns = catalog_db.query_columns("menu")
+        rows = list(zip(*columns))
+        span.set(rows=len(rows))
+    return rows
 
-duckdb_tools = DuckDbTools(
-    db_path=db_path, 
-    read_only=True  
+
+def _load_menu_snapshot() -> MenuData:
+    with tracer.span("menu_snapshot", kind="db") as span:
+        data = load_snapshot(MENU_SNAPSHOT_PATH)
+        span.set(rows=len(data.rows))
+    return data
+
+
+# Com um snapshot publicado, o cardápio vem dele e o DuckDB nem chega a ser aberto;
+# um novo snapshot é recarregado pela mudança de mtime.
+menu_catalog = MenuCatalog(
+    loader=_load_menu_snapshot if MENU_SNAPSHOT_PATH else _load_menu_rows,
+    db_path=MENU_SNAPSHOT_PATH or db_path,
+    check_interval=MENU_REFRESH_INTERVAL,
+    aliases=_load_flavour_aliases()
+)
+
+pricing_engine = PricingEngine(menu_catalog, match_margin=FLAVOUR_MATCH_MARGIN)
+
+tool_memo = ToolMemo(menu_catalog.current_version, max_entries=TOOL_CACHE_MAX_ENTRIES)
+
+orders_api = OrdersApiClient(
+    base_url=ORDER_API_URL,
+    connect_timeout=ORDERS_API_CONNECT_TIMEOUT,
+    read_timeout=ORDERS_API_TIMEOUT,
+    max_connections=ORDERS_API_MAX_CONNECTIONS,
+    max_per_host=ORDERS_API_MAX_PER_HOST,
+    max_retries=ORDERS_API_MAX_RETRIES,
+    backoff_base=ORDERS_API_RETRY_BACKOFF,
+    backoff_max=ORDERS_API_RETRY_BACKOFF_MAX,
+    breaker_threshold=ORDERS_API_BREAKER_THRESHOLD,
+    breaker_reset=ORDERS_API_BREAKER_RESET
 )
 
-async def make_request(method: str, endpoint: str, data: Optional[Dict] = None) -> Dict:
-    """Fazer requisição HTTP para a API de pedidos."""
-    if not ORDER_API_URL:
-        raise RuntimeError("A variável de ambiente ORDER_API_URL não foi configurada.")
-
-    url = f"{ORDER_API_URL.rstrip('/')}/{endpoint.lstrip('/')}"
-
-    def _do_request() -> Dict:
-        try:
-            if method.upper() == 'POST':
-                response = requests.post(
-                    url=url,
-                    json=data,
-                    timeout=ORDERS_API_TIMEOUT
-                )
-            else:
-                response = requests.request(
-                    method=method,
-                    url=url,
-                    json=data,
-                    timeout=ORDERS_API_TIMEOUT
-                )
-            
-            response.raise_for_status()
-
-            content_type = response.headers.get("Content-Type", "").lower()
-            if response.content and "application/json" in content_type:
-                return response.json()
-            return {}
-        except RequestException as exc:
-            raise RequestException(f"Erro na requisição para {url}: {exc}") from exc
-
-    return await asyncio.to_thread(_do_request)
+orders_cache = ResponseCache(ttl=ORDERS_CACHE_TTL, max_entries=ORDERS_CACHE_MAX_ENTRIES)
+
+orders_prefetcher = Prefetcher("orders", cache=orders_cache, max_per_session=ORDERS_PREFETCH_MAX_PER_SESSION)
 
 
+async def make_request(
+    method: str, endpoint: str, data: Optional[Dict] = None, idempotency_key: Optional[str] = None
+) -> Dict:
+    """Fazer requisição HTTP para a API de pedidos.
+
+    Levanta ``OrdersApiError`` (ou uma subclasse) em caso de falha.
+    """
+    return await orders_api.request(method, endpoint, data, idempotency_key=idempotency_key)
+
+
+async def cached_get(endpoint: str, tags: Tags = ()) -> Dict:
+    """Fazer um GET na API de pedidos passando pelo cache de respostas."""
+    return await orders_cache.get_or_fetch(endpoint, lambda: make_request('GET', endpoint), tags)
+
+
+@tool_memo.memoize
 def get_pizza_prices(pizza_flavour: str) -> list:
     """Recuperar preços de pizza do banco de dados baseado no sabor da pizza com busca por similaridade."""
-    print("Consultando preços de pizza especifica")
-    flavours_query = "SELECT DISTINCT sabor FROM pizzas"
-    available_flavours = [row[0] for row in duckdb_tools.connection.execute(flavours_query).fetchall()]
-    
-    close_matches = get_close_matches(pizza_flavour.lower(), [f.lower() for f in available_flavours], n=1, cutoff=0.3)
-    
-    if close_matches:
-        matched_flavour = None
-        for flavour in available_flavours:
-            if flavour.lower() == close_matches[0]:
-                matched_flavour = flavour
-                break
-        
-        query = """
-        SELECT p.sabor AS pizza_name, t.tamanho AS size, b.tipo AS crust, pr.preco AS unit_price
-        FROM pizzas p
-        JOIN precos pr ON p.id = pr.pizza_id
-        JOIN tamanhos t ON pr.tamanho_id = t.id
-        JOIN bordas b ON pr.borda_id = b.id
-        WHERE p.sabor = ?;
-        """
-        
-        results = duckdb_tools.connection.execute(query, [matched_flavour]).fetchall()
-    else:
-        results = []
-    
+    logger.debug("Consultando preços de pizza especifica")
+    matches = menu_catalog.match_flavour(pizza_flavour, limit=3, cutoff=0.3)
+    if not matches:
+        return []
+
+    # Sabores com pontuação praticamente empatada são devolvidos juntos para que
+    # o modelo resolva a ambiguidade sem precisar de uma nova chamada.
+    best_score = matches[0].score
     prices = []
-    for row in results:
-        prices.append({
-            "pizza_name": row[0],
-            "size": row[1],
-            "crust": row[2],
-            "unit_price": row[3]
-        })
+    for match in matches:
+        if best_score - match.score > FLAVOUR_MATCH_MARGIN:
+            break
+        prices.extend(menu_catalog.prices_for(match.name))
     return prices
 
 
-def get_pizza_menu() -> list:
-    """Recuperar o cardápio completo de pizzas do banco de dados."""
-    print("Consultando cardápio completo")
-    query = """
-    SELECT p.sabor AS pizza_name, t.tamanho AS size, b.tipo AS crust, pr.preco AS unit_price
-    FROM pizzas p
-    JOIN precos pr ON p.id = pr.pizza_id
-    JOIN tamanhos t ON pr.tamanho_id = t.id
-    JOIN bordas b ON pr.borda_id = b.id;
+@tool_memo.memoize
+def get_pizza_menu(
+    menu_format: str = "grouped",
+    size: Optional[str] = None,
+    crust: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    page: int = 1,
+    page_size: int = 0
+) -> list:
+    """Recuperar o cardápio de pizzas.
+
+    Args:
+        menu_format: "grouped" (padrão, preços por sabor em uma matriz tamanho × borda), "names" (apenas os sabores) ou "full" (uma linha por combinação).
+        size: Filtrar por tamanho.
+        crust: Filtrar por tipo de borda.
+        min_price: Preço mínimo.
+        max_price: Preço máximo.
+        page: Página a retornar quando page_size for informado.
+        page_size: Quantidade de itens por página (0 retorna tudo).
     """
-    results = duckdb_tools.connection.sql(query).fetchall()
-    menu = []
-    for row in results:
-        menu.append({
-            "pizza_name": row[0],
-            "size": row[1],
-            "crust": row[2],
-            "unit_price": row[3]
-        })
-    return menu
\ No newline at end of file
+    logger.debug("Consultando cardápio completo")
+    try:
+        return menu_catalog.view(menu_format, size, crust, min_price, max_price, page, page_size)
+    except ValueError as e:
+        return [f"❌ Erro: {str(e)}"]
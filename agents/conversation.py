@@ -0,0 +1,99 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from .deadline import Deadline, start_deadline, turn_deadline
+from .streaming import stream_turn
+
+Responder = Callable[[str, str], Awaitable[str]]
+
+
+class ConversationBusy(Exception):
+    """A conversa já tem mensagens demais aguardando processamento."""
+
+
+class ServerOverloaded(Exception):
+    """O servidor atingiu o limite de turnos simultâneos aguardando na fila."""
+
+
+async def orchestrator_responder(conversation_id: str, message: str) -> str:
+    """Responder uma mensagem passando pelo roteador do orquestrador."""
+    from .orchestrator.router import router
+
+    return await router.respond(conversation_id, message)
+
+
+class _Conversation:
+    __slots__ = ("lock", "pending")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.pending = 0
+
+
+class ConversationManager:
+    """Atende várias conversas ao mesmo tempo sobre os agentes compartilhados, com filas limitadas."""
+
+    def __init__(
+        self,
+        responder: Optional[Responder] = None,
+        max_concurrent_turns: int = 64,
+        max_pending_turns: int = 1024,
+        max_pending_per_conversation: int = 4,
+    ):
+        self.responder = responder or orchestrator_responder
+        self.max_pending_turns = max_pending_turns
+        self.max_pending_per_conversation = max_pending_per_conversation
+        self._turn_slots = asyncio.Semaphore(max_concurrent_turns)
+        self._conversations: Dict[str, _Conversation] = {}
+        self._pending_turns = 0
+
+    @property
+    def active_conversations(self) -> int:
+        return len(self._conversations)
+
+    @property
+    def pending_turns(self) -> int:
+        return self._pending_turns
+
+    @asynccontextmanager
+    async def _turn(self, conversation_id: str):
+        if self._pending_turns >= self.max_pending_turns:
+            raise ServerOverloaded("Servidor sobrecarregado, tente novamente em instantes.")
+
+        conversation = self._conversations.get(conversation_id)
+        if conversation is None:
+            conversation = _Conversation()
+            self._conversations[conversation_id] = conversation
+
+        if conversation.pending >= self.max_pending_per_conversation:
+            raise ConversationBusy("Ainda estou respondendo suas mensagens anteriores.")
+
+        conversation.pending += 1
+        self._pending_turns += 1
+        try:
+            async with conversation.lock:
+                async with self._turn_slots:
+                    yield
+        finally:
+            conversation.pending -= 1
+            self._pending_turns -= 1
+            if conversation.pending == 0:
+                self._conversations.pop(conversation_id, None)
+
+    async def _respond(self, conversation_id: str, message: str, deadline: Optional[Deadline]) -> str:
+        with turn_deadline(deadline):
+            return await self.responder(conversation_id, message)
+
+    async def handle_message(self, conversation_id: str, message: str) -> str:
+        """Processar uma mensagem respeitando a ordem da conversa e os limites de fila."""
+        deadline = start_deadline()
+        async with self._turn(conversation_id):
+            return await self._respond(conversation_id, message, deadline)
+
+    async def stream_message(self, conversation_id: str, message: str) -> AsyncIterator[str]:
+        """Processar uma mensagem entregando a resposta em trechos, à medida que é gerada."""
+        deadline = start_deadline()
+        async with self._turn(conversation_id):
+            async for chunk in stream_turn(lambda: self._respond(conversation_id, message, deadline)):
+                yield chunk
@@ -3,11 +3,15 @@ import os
 from textwrap import dedent
 from agno.agent import Agent
 from agno.models.openai import OpenAIChat
-from agno.db.in_memory import InMemoryDb
 
 from ..common_tools import get_pizza_menu, get_pizza_prices
+from ..history import HISTORY_NUM_RUNS, HISTORY_POST_HOOKS, instructions_with_state
+from ..storage import agent_db
+from ..tracing import TOOL_HOOKS
 from .tools import (
     set_item,
+    remove_item,
+    get_cart_total,
     set_user_name,
     set_user_document,
     set_user_address,
@@ -27,18 +31,28 @@ system_instructions = dedent("""\
     2. Pergunte se o cliente já sabe o que quer ou se precisa ver o cardápio.
     3. Caso o cliente queira ver o cardápio use get_pizza_menu() e mostre as opções.
     4. Caso ele escolha uma pizza, sempre use get_pizza_prices(sabor_da_pizza) e mostre o preço dessa pizza em cada situação.
-    5. Quando ele escolher o tamanho, a borda e o preço, salve a pizza no estado usando set_item().
+    5. Quando ele escolher o tamanho e a borda, salve a pizza no estado usando set_item(). O preço é calculado automaticamente pelo cardápio; use o valor retornado pela função.
+       - Para retirar uma pizza do pedido use remove_item().
+       - Se o cliente perguntar quanto está o pedido, use get_cart_total() em vez de calcular.
     6. Pergunte se ele quer adicionar mais itens ao pedido.
     7. Se ele disser que não quer adicionar mais itens no pedido, pergunte o endereço de entrega e salve-o no estado usando set_user_address().
     8. Pergunte o documento para a nota fiscal e salve-o no estado usando set_user_document().
     9. Nesse momento chame a API de pedidos para enviar usando send_data_to_api() o pedido e diga que o pedido está confirmado.
+
+    As funções devolvem JSON (itens, preços e totais); apresente os dados ao cliente em texto amigável, com preços em reais.
+    Um campo "error" indica que a operação falhou e traz o motivo.
+    Um campo "same_as" indica que o resultado é igual ao de uma chamada anterior neste turno; use o resultado anterior.
+    Se send_data_to_api() devolver "problems", peça ao cliente todas as correções da lista de uma vez, salve-as e chame send_data_to_api() de novo.
     """)
 
 agent = Agent(
     model=OpenAIChat(id="gpt-4o-mini", api_key=openai_api_key, temperature=0.5),
     name="Beauty Pizza Bot",
-    tools=[get_pizza_menu, get_pizza_prices, set_item, set_user_name, set_user_document, set_user_address, send_data_to_api],
-    instructions=system_instructions,
-    session_state={"pizzas": [], "user_name": "", "user_document": "", "address": {}},
-    db=InMemoryDb(),
+    tools=[get_pizza_menu, get_pizza_prices, set_item, remove_item, get_cart_total, set_user_name, set_user_document, set_user_address, send_data_to_api],
+    instructions=instructions_with_state(system_instructions, ["cart", "total", "user_name", "user_document", "address"]),
+    session_state={"cart": [], "total": 0.0, "user_name": "", "user_document": "", "address": {}},
+    db=agent_db,
+    num_history_runs=HISTORY_NUM_RUNS,
+    post_hooks=HISTORY_POST_HOOKS,
+    tool_hooks=TOOL_HOOKS,
 )
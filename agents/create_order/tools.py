@@ -1,34 +1,83 @@
+import hashlib
+import json
+import logging
+import uuid
 from datetime import date
-from ..common_tools import make_request
+from typing import Dict, Optional
 
+from ..api_cache import document_tag
+from ..cart import Cart, CartError
+from ..common_tools import make_request, orders_cache, pricing_engine
+from ..http_client import OrdersApiError, OrdersApiStatusError, OrdersApiUnavailable
+from ..order_validation import validate_order
+from ..pricing import PricingError, corrected_price
+from ..records import CartLine, tool_error, tool_result
 
-def set_item(session_state, pizza_name: str, size: str, crust: str, quantity: int, unit_price: float) -> None:
-    """Adicionar uma pizza à lista de itens do pedido."""
-    print("Adicionando pizza ao pedido")
-    session_state["pizzas"].append({
-        "name": pizza_name,
-        "size": size,
-        "crust": crust,
-        "quantity": quantity,
-        "unit_price": unit_price
-    })
+logger = logging.getLogger(__name__)
+
+
+def _save_cart(session_state, cart: Cart) -> None:
+    session_state["cart"] = cart.to_state()
+    session_state["total"] = cart.total
+
+
+def set_item(session_state, pizza_name: str, size: str, crust: str, quantity: int, unit_price: Optional[float] = None) -> str:
+    """Adicionar uma pizza à lista de itens do pedido. O preço unitário é sempre o do cardápio."""
+    logger.debug("Adicionando pizza ao pedido")
+    if int(quantity) <= 0:
+        return tool_error("A quantidade precisa ser maior que zero.")
+
+    try:
+        item = pricing_engine.price_item({"name": pizza_name, "size": size, "crust": crust, "quantity": quantity})
+        cart = Cart.from_state(session_state.get("cart"))
+        line = cart.add(item)
+    except (PricingError, CartError) as e:
+        return tool_error(str(e))
+
+    _save_cart(session_state, cart)
+    return tool_result(
+        added=CartLine.from_item(line.as_item()), total=cart.total, price_corrected_from=corrected_price(unit_price, item)
+    )
+
+
+def remove_item(session_state, pizza_name: str, size: str, crust: str) -> str:
+    """Remover uma pizza da lista de itens do pedido."""
+    logger.debug("Removendo pizza do pedido")
+    try:
+        quote = pricing_engine.quote(pizza_name, size, crust)
+    except PricingError as e:
+        return tool_error(str(e))
+
+    cart = Cart.from_state(session_state.get("cart"))
+    line = cart.remove((quote.pizza_name, quote.size, quote.crust))
+    if line is None:
+        return tool_error(f"{quote.pizza_name} ({quote.size}, borda {quote.crust}) não está no pedido.")
+    _save_cart(session_state, cart)
+    return tool_result(removed=CartLine.from_item(line.as_item()), total=cart.total)
+
+
+def get_cart_total(session_state) -> str:
+    """Informar os itens do pedido e o valor total até agora."""
+    logger.debug("Calculando total do pedido")
+    cart = Cart.from_state(session_state.get("cart"))
+    return tool_result(cart=[CartLine.from_item(line.as_item()) for line in cart], total=cart.total)
 
 
 def set_user_name(session_state, name: str) -> None:
     """Definir o nome do usuário."""
-    print("Salvando nome do cliente")
+    logger.debug("Salvando nome do cliente")
     session_state["user_name"] = name
 
 
 def set_user_document(session_state, document: str) -> None:
     """Definir o documento do usuário."""
-    print("Salvando documento do cliente")
+    logger.debug("Salvando documento do cliente")
     session_state["user_document"] = document
 
 
 def set_user_address(session_state, street_name: str, number: int, reference_point: str, complement: str) -> None:
     """Definir o endereço de entrega do usuário."""
-    print("Salvando endereço do cliente")
+    logger.debug("Salvando endereço do cliente")
     session_state["address"] = {
         "street_name": street_name,
         "number": number,
@@ -37,63 +86,75 @@ def set_user_address(session_state, street_name: str, number: int, reference_poi
     }
 
 
+def _idempotency_key(session_state, order_data: Dict) -> str:
+    """Chave de idempotência do pedido, reaproveitada enquanto o pedido não mudar.
+
+    Se o envio falhar depois de a API ter criado o pedido, uma nova tentativa
+    com os mesmos dados usa a mesma chave e não duplica o pedido.
+    """
+    fingerprint = hashlib.sha256(json.dumps(order_data, sort_keys=True).encode("utf-8")).hexdigest()
+    pending = session_state.get("order_idempotency") or {}
+    if pending.get("fingerprint") != fingerprint:
+        pending = {"fingerprint": fingerprint, "key": uuid.uuid4().hex}
+        session_state["order_idempotency"] = pending
+    return pending["key"]
+
+
 async def send_data_to_api(session_state) -> str:
-    """Enviar os dados do pedido para a API externa e retornar uma mensagem de sucesso."""
-    print("Preparando pedido para envio")
-    
-    if not session_state.get("user_name") or not session_state.get("user_name").strip():
-        return "❌ Erro: Nome do cliente não foi informado. Por favor, informe seu nome."
-    
-    if not session_state.get("user_document") or not session_state.get("user_document").strip():
-        return "❌ Erro: Documento do cliente não foi informado. Por favor, informe seu CPF."
-    
-    address = session_state.get("address", {})
-    if not address or not address.get("street_name") or not address.get("number"):
-        return "❌ Erro: Endereço completo não foi informado. Por favor, informe rua e número."
-    
-    pizzas = session_state.get("pizzas", [])
-    if not pizzas or len(pizzas) == 0:
-        return "❌ Erro: Nenhum item foi adicionado ao pedido. Por favor, adicione pelo menos uma pizza."
-    
-    for i, item in enumerate(pizzas):
-        if not all(key in item for key in ['name', 'size', 'crust', 'quantity', 'unit_price']):
-            return f"❌ Erro: Item {i+1} do pedido está incompleto. Faltam informações obrigatórias."
-    
-    address = session_state.get("address", {})
-    
+    """Enviar os dados do pedido para a API externa e retornar uma mensagem de sucesso.
+
+    Antes do envio, nome, CPF, endereço e itens são conferidos de uma vez; se
+    algo estiver errado, todos os problemas são devolvidos juntos em "problems".
+    """
+    logger.debug("Preparando pedido para envio")
+    order = validate_order(session_state, pricing_engine)
+    if order.problems:
+        _save_cart(session_state, order.cart)
+        return tool_error(
+            f"O pedido não pode ser enviado: {len(order.problems)} problema(s) para resolver com o cliente.",
+            problems=order.problems,
+        )
+
+    session_state["address"] = order.address
+    items = order.items
     order_data = {
-        "client_name": str(session_state.get("user_name", "")),
-        "client_document": str(session_state.get("user_document", "")),
+        "client_name": order.client_name,
+        "client_document": order.client_document,
         "delivery_date": date.today().isoformat(),
-        "delivery_address": {
-            "street_name": str(address.get("street_name", "")),
-            "number": int(address.get("number", 0)) if address.get("number") else 0,
-            "complement": str(address.get("complement", "")),
-            "reference_point": str(address.get("reference_point", ""))
-        },
+        "delivery_address": order.address,
         "items": [
             {
                 "name": f"{item['name']} - {item['size']} - {item['crust']}",
-                "quantity": int(item["quantity"]),
-                "unit_price": float(item["unit_price"]),
+                "quantity": item["quantity"],
+                "unit_price": item["unit_price"],
             }
-            for item in session_state.get("pizzas", [])
+            for item in items
         ],
     }
-    
+
     try:
-        print("Enviando pedido para API")
-        response = await make_request('POST', '/api/orders/', order_data)
-        print("Pedido enviado com sucesso!")
-        return "Pedido enviado para confirmação com sucesso! 🎉"
-    except Exception as e:
-        print(f"Erro ao enviar pedido: {str(e)}")
-        error_msg = str(e)
-        if "400" in error_msg:
-            return "❌ Erro: Os dados do pedido estão incompletos ou inválidos. Verifique se todas as informações foram preenchidas corretamente."
-        elif "404" in error_msg:
-            return "❌ Erro: Serviço de pedidos não encontrado. Tente novamente mais tarde."
-        elif "500" in error_msg:
-            return "❌ Erro interno do servidor. Tente novamente mais tarde."
-        else:
-            return f"❌ Erro ao enviar pedido: {error_msg}"
\ No newline at end of file
+        logger.debug("Enviando pedido para API")
+        response = await make_request(
+            'POST', '/api/orders/', order_data, idempotency_key=_idempotency_key(session_state, order_data)
+        )
+    except OrdersApiStatusError as e:
+        logger.error("Erro ao enviar pedido: %s", e)
+        if e.status_code in (400, 422):
+            return tool_error("Os dados do pedido estão incompletos ou inválidos. Verifique se todas as informações foram preenchidas corretamente.")
+        elif e.status_code == 404:
+            return tool_error("Serviço de pedidos não encontrado. Tente novamente mais tarde.")
+        elif e.status_code >= 500:
+            return tool_error("Erro interno do servidor de pedidos. Tente novamente mais tarde.")
+        return tool_error(f"Erro ao enviar pedido: {str(e)}")
+    except OrdersApiUnavailable as e:
+        logger.error("Erro ao enviar pedido: %s", e)
+        return tool_error("O serviço de pedidos está indisponível no momento. Tente novamente em alguns instantes.")
+    except OrdersApiError as e:
+        logger.error("Erro ao enviar pedido: %s", e)
+        return tool_error(f"Erro ao enviar pedido: {str(e)}")
+
+    session_state.pop("order_idempotency", None)
+    orders_cache.invalidate(document_tag(order_data["client_document"]))
+    logger.debug("Pedido enviado com sucesso!")
+    order_id = response.get("id") if isinstance(response, dict) else None
+    return tool_result(status="sent", order_id=order_id, total=pricing_engine.cart_total(items))
@@ -0,0 +1,126 @@
+"""Prazo de resposta de cada turno, propagado aos subagentes, ferramentas e requisições."""
+import asyncio
+import inspect
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional
+
+from .metrics import metrics
+from .records import tool_error
+
+try:
+    TURN_BUDGET_SECONDS = float(os.getenv("TURN_BUDGET_SECONDS", "45"))
+except (TypeError, ValueError):
+    TURN_BUDGET_SECONDS = 45.0
+
+try:
+    TURN_DEADLINE_GRACE = float(os.getenv("TURN_DEADLINE_GRACE", "1"))
+except (TypeError, ValueError):
+    TURN_DEADLINE_GRACE = 1.0
+
+DEGRADED_REPLY = (
+    "Desculpe, estou demorando mais do que o normal para responder. "
+    "Pode repetir sua última mensagem em alguns instantes?"
+)
+
+
+class DeadlineExceeded(Exception):
+    """O prazo do turno acabou durante ``stage``."""
+
+    def __init__(self, stage: str):
+        super().__init__(f"O prazo do turno acabou ({stage})")
+        self.stage = stage
+
+
+class Deadline:
+    """Instante limite de um turno e o registro de onde ele foi excedido."""
+
+    __slots__ = ("budget", "expires_at", "exceeded_in", "degraded")
+
+    def __init__(self, budget: float):
+        self.budget = budget
+        self.expires_at = time.monotonic() + budget
+        self.exceeded_in: Optional[str] = None
+        self.degraded = False
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def exceed(self, stage: str) -> DeadlineExceeded:
+        """Registrar que o prazo acabou em ``stage``; só a primeira etapa é contada."""
+        if self.exceeded_in is None:
+            self.exceeded_in = stage
+            metrics.increment("turn_deadline_exceeded_total", stage=stage)
+        return DeadlineExceeded(stage)
+
+    def degraded_reply(self) -> str:
+        """A resposta degradada do turno, contada uma única vez."""
+        if not self.degraded:
+            self.degraded = True
+            metrics.increment("turn_degraded_replies_total", stage=self.exceeded_in or "unknown")
+        return DEGRADED_REPLY
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar("turn_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current_deadline.get()
+
+
+def start_deadline(budget: float = TURN_BUDGET_SECONDS) -> Optional[Deadline]:
+    """Novo prazo a partir de agora; ``None`` quando o orçamento está desativado (``<= 0``)."""
+    return Deadline(budget) if budget > 0 else None
+
+
+@contextmanager
+def turn_deadline(deadline: Optional[Deadline] = None) -> Iterator[Optional[Deadline]]:
+    """Executar o bloco com o prazo informado, o prazo já em vigor ou um novo."""
+    if deadline is None:
+        deadline = current_deadline() or start_deadline()
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+@contextmanager
+def no_deadline() -> Iterator[None]:
+    """Executar o bloco sem prazo, para trabalho em segundo plano que sobrevive ao turno."""
+    token = _current_deadline.set(None)
+    try:
+        yield
+    finally:
+        _current_deadline.reset(token)
+
+
+async def bounded(awaitable: Awaitable, stage: str, grace: float = TURN_DEADLINE_GRACE) -> Any:
+    """Aguardar ``awaitable`` até ``grace`` segundos depois do prazo do turno, ou levantar ``DeadlineExceeded``."""
+    deadline = current_deadline()
+    if deadline is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, deadline.remaining() + grace)
+    except asyncio.TimeoutError:
+        if not deadline.expired:
+            raise
+        raise deadline.exceed(stage) from None
+
+
+async def enforce_tool_deadline(function_name: str, function_call: Callable, arguments: Dict[str, Any]) -> Any:
+    """Hook de ferramentas do agno que não inicia ferramentas depois do prazo do turno."""
+    deadline = current_deadline()
+    if deadline is not None and deadline.expired:
+        deadline.exceed(f"tool:{function_name}")
+        return tool_error("O tempo para responder esta mensagem acabou. Peça desculpas ao cliente e peça que repita a mensagem.")
+    result = function_call(**arguments)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
@@ -0,0 +1,110 @@
+import re
+import unicodedata
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_PHONETIC_RULES = (
+    (re.compile(r"(?<=[aeiou])z(?=[aeiou])"), "s"),
+    (re.compile(r"ss"), "s"),
+    (re.compile(r"ph"), "f"),
+    (re.compile(r"y"), "i"),
+    (re.compile(r"k"), "c"),
+    (re.compile(r"h(?=[aeiou]|$)"), ""),
+)
+
+
+class FlavourMatch(NamedTuple):
+    name: str
+    score: float
+
+
+def normalize(text: str) -> str:
+    """Normalizar um nome removendo acentos, pontuação e grafias alternativas."""
+    folded = unicodedata.normalize("NFKD", text.lower())
+    folded = "".join(char for char in folded if not unicodedata.combining(char))
+    folded = _NON_ALNUM.sub(" ", folded).strip()
+    for pattern, replacement in _PHONETIC_RULES:
+        folded = pattern.sub(replacement, folded)
+    return folded
+
+
+def trigrams(text: str) -> Counter:
+    padded = f"  {text} "
+    return Counter(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class FlavourMatcher:
+    """Busca aproximada de sabores com índice de trigramas pré-calculado."""
+
+    def __init__(
+        self,
+        flavours: Iterable[str],
+        aliases: Optional[Dict[str, str]] = None,
+        max_candidates: int = 8,
+        keys: Optional[Dict[str, str]] = None,
+    ):
+        self.max_candidates = max_candidates
+        self._entries: List[Tuple[str, str, Counter]] = []
+        self._exact: Dict[str, str] = {}
+        self._index: Dict[str, List[int]] = {}
+
+        # ``keys`` traz nomes já normalizados (por exemplo, de um snapshot do cardápio).
+        keys = keys or {}
+        flavours = list(flavours)
+        for flavour in flavours:
+            self._add(flavour, flavour, keys.get(flavour))
+
+        known = set(flavours)
+        for alias, flavour in (aliases or {}).items():
+            if flavour in known:
+                self._add(alias, flavour)
+
+    def _add(self, text: str, flavour: str, key: Optional[str] = None) -> None:
+        if key is None:
+            key = normalize(text)
+        if not key or key in self._exact:
+            return
+        grams = trigrams(key)
+        entry_id = len(self._entries)
+        self._entries.append((key, flavour, grams))
+        self._exact[key] = flavour
+        for gram in grams:
+            self._index.setdefault(gram, []).append(entry_id)
+
+    def match(self, query: str, limit: int = 3, cutoff: float = 0.3) -> List[FlavourMatch]:
+        """Retornar os sabores mais próximos da consulta, ordenados por pontuação."""
+        key = normalize(query)
+        if not key:
+            return []
+
+        exact = self._exact.get(key)
+        if exact is not None:
+            return [FlavourMatch(exact, 1.0)]
+
+        query_grams = trigrams(key)
+        shared: Counter = Counter()
+        for gram, count in query_grams.items():
+            for entry_id in self._index.get(gram, ()):
+                shared[entry_id] += min(count, self._entries[entry_id][2][gram])
+
+        query_size = sum(query_grams.values())
+        candidates = []
+        for entry_id, overlap in shared.items():
+            entry_size = sum(self._entries[entry_id][2].values())
+            candidates.append((2.0 * overlap / (query_size + entry_size), entry_id))
+        candidates.sort(reverse=True)
+
+        best: Dict[str, float] = {}
+        for dice, entry_id in candidates[:self.max_candidates]:
+            entry_key, flavour, _ = self._entries[entry_id]
+            ratio = SequenceMatcher(None, key, entry_key).ratio()
+            score = (dice + ratio) / 2
+            if entry_key.startswith(key) or key in entry_key.split():
+                score = max(score, 0.9)
+            if score >= cutoff and score > best.get(flavour, 0.0):
+                best[flavour] = score
+
+        ranked = sorted(best.items(), key=lambda item: item[1], reverse=True)
+        return [FlavourMatch(name, round(score, 3)) for name, score in ranked[:limit]]
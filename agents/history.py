@@ -0,0 +1,93 @@
+import json
+import os
+from typing import Callable, Dict, Iterable
+
+from .metrics import metrics
+
+try:
+    HISTORY_NUM_RUNS = int(os.getenv("HISTORY_NUM_RUNS", "6"))
+except (TypeError, ValueError):
+    HISTORY_NUM_RUNS = 6
+
+try:
+    HISTORY_TOOL_RESULT_MAX_CHARS = int(os.getenv("HISTORY_TOOL_RESULT_MAX_CHARS", "600"))
+except (TypeError, ValueError):
+    HISTORY_TOOL_RESULT_MAX_CHARS = 600
+
+
+def _summarize_tool_result(tool_name: str, content: str) -> str:
+    try:
+        parsed = json.loads(content)
+    except (TypeError, ValueError):
+        parsed = None
+
+    record_lists = (
+        [f"{key}: {len(value)} registros" for key, value in parsed.items() if isinstance(value, list)]
+        if isinstance(parsed, dict) else []
+    )
+    if isinstance(parsed, list):
+        detail = f"{len(parsed)} registros"
+    elif record_lists:
+        detail = ", ".join(record_lists)
+    else:
+        first_line = content.strip().splitlines()[0] if content.strip() else ""
+        detail = first_line[:120]
+    return (
+        f"[Resultado de {tool_name} omitido do histórico ({len(content)} caracteres): {detail}. "
+        f"Chame {tool_name} novamente se precisar dos detalhes.]"
+    )
+
+
+def compact_tool_results(run_output) -> None:
+    """Substituir resultados grandes de ferramentas por referências curtas antes de salvar o histórico.
+
+    O modelo já usou o resultado completo durante o turno; nos turnos seguintes
+    basta saber que a ferramenta foi chamada e como obter os dados de novo.
+    """
+    for message in run_output.messages or []:
+        if message.role != "tool" or message.from_history:
+            continue
+        content = message.content if isinstance(message.content, str) else json.dumps(message.content, default=str)
+        if content and len(content) > HISTORY_TOOL_RESULT_MAX_CHARS:
+            message.content = _summarize_tool_result(message.tool_name or "a ferramenta", content)
+
+
+def record_prompt_size(run_output) -> None:
+    """Registrar o tamanho do prompt enviado ao modelo em cada turno."""
+    agent_name = run_output.agent_name or "agent"
+    input_tokens = getattr(run_output.metrics, "input_tokens", 0) if run_output.metrics else 0
+    if not input_tokens:
+        prompt_chars = sum(
+            len(message.content) for message in run_output.messages or []
+            if message.role != "assistant" and isinstance(message.content, str)
+        )
+        input_tokens = prompt_chars // 4
+
+    metrics.increment("prompt_turns_total", agent=agent_name)
+    metrics.increment("prompt_input_tokens_total", input_tokens, agent=agent_name)
+    metrics.set_gauge("prompt_input_tokens_last", input_tokens, agent=agent_name)
+    if input_tokens > metrics.value("prompt_input_tokens_max", agent=agent_name):
+        metrics.set_gauge("prompt_input_tokens_max", input_tokens, agent=agent_name)
+
+
+def state_snapshot(session_state: Dict, keys: Iterable[str]) -> str:
+    """Resumo estruturado e compacto das partes do estado relevantes para o pedido."""
+    snapshot = {key: session_state.get(key) for key in keys if session_state.get(key) not in (None, "", [], {})}
+    return json.dumps(snapshot, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def instructions_with_state(base_instructions: str, keys: Iterable[str]) -> Callable[[Dict], str]:
+    """Instruções do agente acrescidas do estado atual do pedido.
+
+    Com o estado sempre presente no prompt, o histórico pode ficar limitado às
+    últimas ``HISTORY_NUM_RUNS`` interações sem que o modelo perca o contexto do pedido.
+    """
+    keys = tuple(keys)
+
+    def instructions(session_state: Dict) -> str:
+        return f"{base_instructions}\nEstado atual do pedido: {state_snapshot(session_state or {}, keys)}\n"
+
+    return instructions
+
+
+HISTORY_POST_HOOKS = [record_prompt_size, compact_tool_results]
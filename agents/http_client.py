@@ -0,0 +1,276 @@
+import asyncio
+import random
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from .deadline import Deadline, current_deadline
+from .metrics import metrics
+from .tracing import endpoint_name, tracer
+
+# Métodos idempotentes: podem ser repetidos sem risco de efeito duplicado.
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+
+class OrdersApiError(Exception):
+    """Falha ao falar com a API de pedidos."""
+
+    def __init__(self, message: str, method: str = "", url: str = ""):
+        super().__init__(message)
+        self.method = method
+        self.url = url
+
+
+class OrdersApiUnavailable(OrdersApiError):
+    """A API não respondeu (conexão recusada, timeout) ou o circuito está aberto."""
+
+
+class CircuitOpenError(OrdersApiUnavailable):
+    """O circuito está aberto e a requisição nem foi enviada."""
+
+
+class OrdersApiTimeout(OrdersApiUnavailable):
+    """O prazo do turno acabou antes de a API responder."""
+
+
+class OrdersApiStatusError(OrdersApiError):
+    """A API respondeu com um status de erro (4xx ou 5xx)."""
+
+    def __init__(self, message: str, method: str, url: str, status_code: int, detail: Any = None):
+        super().__init__(message, method, url)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class CircuitBreaker:
+    """Disjuntor simples: abre após ``failure_threshold`` falhas seguidas e testa de novo após ``reset_timeout``."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._publish()
+
+    def _publish(self) -> None:
+        metrics.set_gauge("orders_api_circuit_open", 1.0 if self.state != self.CLOSED else 0.0, breaker=self.name)
+
+    def _transition(self, state: str) -> None:
+        if state != self.state:
+            self.state = state
+            metrics.increment("orders_api_circuit_transitions_total", breaker=self.name, state=state)
+            self._publish()
+
+    def allow(self) -> bool:
+        """Indicar se a próxima requisição pode ser enviada."""
+        if self.failure_threshold <= 0 or self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._transition(self.HALF_OPEN)
+        if self.state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._probing = False
+        self._transition(self.CLOSED)
+
+    def release(self) -> None:
+        """Liberar a requisição de teste interrompida sem resultado (ex.: cancelada)."""
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probing = False
+        if self.state == self.HALF_OPEN or (0 < self.failure_threshold <= self.failures):
+            self._opened_at = time.monotonic()
+            self._transition(self.OPEN)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"state": self.state, "consecutive_failures": self.failures}
+
+
+class OrdersApiClient:
+    """Cliente assíncrono da API de pedidos com pool de conexões, novas tentativas e disjuntor."""
+
+    def __init__(
+        self,
+        base_url: Optional[str],
+        connect_timeout: float = 3.0,
+        read_timeout: float = 10.0,
+        max_connections: int = 20,
+        max_per_host: int = 10,
+        max_retries: int = 2,
+        backoff_base: float = 0.1,
+        backoff_max: float = 2.0,
+        breaker_threshold: int = 5,
+        breaker_reset: float = 30.0,
+    ):
+        self.base_url = base_url
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout, pool=connect_timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        )
+        self.max_per_host = max_per_host
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = CircuitBreaker("orders_api", breaker_threshold, breaker_reset)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    def url_for(self, endpoint: str) -> str:
+        if not self.base_url:
+            raise OrdersApiError("A variável de ambiente ORDER_API_URL não foi configurada.")
+        return f"{self.base_url.rstrip('/')}/{endpoint.lstrip('/')}"
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits)
+            self._loop = loop
+            self._host_limits = {}
+        return self._client
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        semaphore = self._host_limits.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_per_host)
+            self._host_limits[host] = semaphore
+        return semaphore
+
+    def _backoff(self, attempt: int) -> float:
+        """Espera antes da tentativa ``attempt`` (full jitter)."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _timeout_for(self, deadline: Optional[Deadline]) -> httpx.Timeout:
+        if deadline is None:
+            return self.timeout
+        remaining = deadline.remaining()
+        if remaining >= self.timeout.read:
+            return self.timeout
+        return httpx.Timeout(
+            remaining, connect=min(self.timeout.connect, remaining), pool=min(self.timeout.pool, remaining)
+        )
+
+    async def _send(
+        self, method: str, url: str, endpoint: str, data: Optional[Dict], headers: Dict[str, str], timeout: httpx.Timeout
+    ) -> httpx.Response:
+        client = self._get_client()
+        with tracer.span(endpoint_name(method, endpoint), kind="http", method=method) as span:
+            try:
+                async with self._host_limit(url):
+                    response = await client.request(method, url, json=data, headers=headers, timeout=timeout)
+            except httpx.TransportError as exc:
+                span.set(transport_error=type(exc).__name__)
+                raise OrdersApiUnavailable(
+                    f"A API de pedidos não respondeu ({method} {url}): {type(exc).__name__}", method, url
+                ) from exc
+            span.set(
+                status_code=response.status_code,
+                request_bytes=len(response.request.content),
+                response_bytes=len(response.content),
+            )
+        return response
+
+    def _status_error(self, method: str, url: str, response: httpx.Response) -> OrdersApiStatusError:
+        try:
+            detail = response.json()
+        except ValueError:
+            detail = response.text[:200]
+        return OrdersApiStatusError(
+            f"A API de pedidos respondeu {response.status_code} para {method} {url}",
+            method, url, response.status_code, detail
+        )
+
+    async def request(
+        self, method: str, endpoint: str, data: Optional[Dict] = None, idempotency_key: Optional[str] = None
+    ) -> Any:
+        """Enviar uma requisição e retornar o corpo JSON (ou ``{}`` quando vazio)."""
+        method = method.upper()
+        url = self.url_for(endpoint)
+        headers = {"Idempotency-Key": idempotency_key} if idempotency_key else {}
+        retryable = method in IDEMPOTENT_METHODS or idempotency_key is not None
+        deadline = current_deadline()
+
+        attempt = 0
+        while True:
+            if deadline is not None and deadline.expired:
+                deadline.exceed("orders_api")
+                raise OrdersApiTimeout(f"O prazo do turno acabou antes de {method} {url}", method, url)
+            if not self.breaker.allow():
+                metrics.increment("orders_api_circuit_rejected_total", method=method)
+                raise CircuitOpenError(f"A API de pedidos está indisponível ({method} {url})", method, url)
+
+            try:
+                response = await self._send(method, url, endpoint, data, headers, self._timeout_for(deadline))
+            except OrdersApiUnavailable as exc:
+                if deadline is not None and deadline.expired:
+                    # O timeout foi encurtado pelo prazo do turno; não é falha da API.
+                    self.breaker.release()
+                    deadline.exceed("orders_api")
+                    raise OrdersApiTimeout(
+                        f"O prazo do turno acabou esperando {method} {url}", method, url
+                    ) from exc
+                self.breaker.record_failure()
+                error: OrdersApiError = exc
+            except BaseException:
+                self.breaker.release()
+                raise
+            else:
+                if response.status_code >= 500:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                if not response.is_error:
+                    break
+                if method == "DELETE" and attempt > 0 and response.status_code == 404:
+                    # Uma tentativa anterior chegou à API mas a resposta se perdeu:
+                    # o recurso já foi removido.
+                    return {}
+                error = self._status_error(method, url, response)
+                if response.status_code not in RETRYABLE_STATUS:
+                    raise error
+
+            if not retryable or attempt >= self.max_retries:
+                raise error
+            attempt += 1
+            delay = self._backoff(attempt)
+            if deadline is not None and deadline.remaining() <= delay:
+                raise error
+            metrics.increment("orders_api_retries_total", method=method)
+            await asyncio.sleep(delay)
+
+        content_type = response.headers.get("Content-Type", "").lower()
+        if response.content and "application/json" in content_type:
+            return response.json()
+        return {}
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(
+            self.breaker.stats(),
+            retries=metrics.total("orders_api_retries_total"),
+            rejected=metrics.total("orders_api_circuit_rejected_total"),
+        )
+
+    async def aclose(self) -> None:
+        """Fechar as conexões abertas do pool."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
@@ -0,0 +1,255 @@
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from .flavour_matcher import FlavourMatch, FlavourMatcher, normalize
+
+logger = logging.getLogger(__name__)
+
+MenuRow = Tuple[str, str, str, float]
+
+
+class MenuData(NamedTuple):
+    """Linhas do cardápio acompanhadas dos nomes de sabores já normalizados."""
+
+    rows: List[MenuRow]
+    normalized: Dict[str, str]
+
+
+MENU_FORMATS = ("grouped", "names", "full")
+
+
+def _group_by_flavour(rows: Iterable[Dict]) -> List[Dict]:
+    """Agrupar as linhas por sabor, com uma matriz tamanho × borda de preços."""
+    grouped: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for row in rows:
+        sizes = grouped.setdefault(row["pizza_name"], {})
+        sizes.setdefault(row["size"], {})[row["crust"]] = row["unit_price"]
+    return [{"pizza_name": flavour, "prices": prices} for flavour, prices in grouped.items()]
+
+
+def _names(rows: Iterable[Dict]) -> List[str]:
+    return list(dict.fromkeys(row["pizza_name"] for row in rows))
+
+
+_PROJECTIONS = {
+    "grouped": _group_by_flavour,
+    "names": _names,
+    "full": list,
+}
+
+
+class MenuCatalog:
+    """Cardápio carregado em memória, com índices pré-calculados e releitura em segundo plano."""
+
+    def __init__(
+        self,
+        loader: Callable[[], Union[Iterable[Sequence], MenuData]],
+        db_path: Optional[str] = None,
+        check_interval: float = 5.0,
+        aliases: Optional[Dict[str, str]] = None,
+    ):
+        self._loader = loader
+        self._aliases = aliases or {}
+        self._db_path = db_path
+        self._check_interval = check_interval
+        self._lock = threading.Lock()
+        # Mantido pela thread de releitura; as consultas só tentam adquiri-lo sem esperar.
+        self._reload_lock = threading.Lock()
+        self._loaded = False
+        self._mtime: Optional[float] = None
+        self._last_check = 0.0
+        self.version = 0
+
+        self.flavours: Tuple[str, ...] = ()
+        self._menu: Tuple[Dict, ...] = ()
+        self._rows_by_flavour: Dict[str, Tuple[Dict, ...]] = {}
+        self._price_index: Dict[Tuple[str, str, str], float] = {}
+        self._matcher = FlavourMatcher(())
+        self._size_matcher = FlavourMatcher(())
+        self._crust_matcher = FlavourMatcher(())
+        self._views: Dict[str, Tuple] = {}
+        self._filtered_views: Dict[Tuple, Tuple] = {}
+
+    def _file_mtime(self) -> Optional[float]:
+        if not self._db_path:
+            return None
+        try:
+            return os.stat(self._db_path).st_mtime
+        except OSError:
+            return None
+
+    def _build(self, rows: Iterable[Sequence], normalized: Optional[Dict[str, str]] = None) -> None:
+        menu: List[Dict] = []
+        by_flavour: Dict[str, List[Dict]] = {}
+        price_index: Dict[Tuple[str, str, str], float] = {}
+
+        for flavour, size, crust, price in rows:
+            row = {
+                "pizza_name": flavour,
+                "size": size,
+                "crust": crust,
+                "unit_price": price,
+            }
+            menu.append(row)
+            by_flavour.setdefault(flavour, []).append(row)
+            price_index[(flavour, size, crust)] = price
+
+        # Tudo é montado antes de ser publicado, para que uma releitura em
+        # segundo plano não deixe consultas concorrentes verem índices pela metade.
+        flavours = tuple(by_flavour)
+        matcher = FlavourMatcher(flavours, aliases=self._aliases, keys=normalized)
+        size_matcher = FlavourMatcher(dict.fromkeys(size for _, size, _ in price_index))
+        crust_matcher = FlavourMatcher(dict.fromkeys(crust for _, _, crust in price_index))
+        views = {name: tuple(project(menu)) for name, project in _PROJECTIONS.items()}
+
+        self._menu = tuple(menu)
+        self._rows_by_flavour = {name: tuple(items) for name, items in by_flavour.items()}
+        self._price_index = price_index
+        self.flavours = flavours
+        self._matcher = matcher
+        self._size_matcher = size_matcher
+        self._crust_matcher = crust_matcher
+        self._views = views
+        self._filtered_views = {}
+        self.version += 1
+
+    def refresh(self) -> None:
+        """Recarregar o cardápio a partir da fonte de dados."""
+        with self._lock:
+            mtime = self._file_mtime()
+            data = self._loader()
+            if isinstance(data, MenuData):
+                self._build(data.rows, data.normalized)
+            else:
+                self._build(data)
+            self._mtime = mtime
+            self._last_check = time.monotonic()
+            self._loaded = True
+
+    def _ensure_fresh(self) -> None:
+        if not self._loaded:
+            self.refresh()
+            return
+
+        now = time.monotonic()
+        if now - self._last_check < self._check_interval:
+            return
+        self._last_check = now
+
+        if self._file_mtime() != self._mtime:
+            self._reload_in_background()
+
+    def _reload_in_background(self) -> None:
+        if not self._reload_lock.acquire(blocking=False):
+            return
+        try:
+            threading.Thread(target=self._background_reload, name="menu-reload", daemon=True).start()
+        except BaseException:
+            self._reload_lock.release()
+            raise
+
+    def _background_reload(self) -> None:
+        try:
+            self.refresh()
+        except Exception:
+            logger.exception("Falha ao recarregar o cardápio; mantendo a versão anterior")
+        finally:
+            self._reload_lock.release()
+
+    def current_version(self) -> int:
+        """Versão do cardápio em uso, conferindo antes se o arquivo mudou."""
+        self._ensure_fresh()
+        return self.version
+
+    def menu(self) -> List[Dict]:
+        """Todas as combinações de sabor, tamanho e borda com seus preços."""
+        self._ensure_fresh()
+        return list(self._menu)
+
+    def view(
+        self,
+        menu_format: str = "grouped",
+        size: Optional[str] = None,
+        crust: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        page: int = 1,
+        page_size: int = 0,
+    ) -> List:
+        """Cardápio no formato pedido, opcionalmente filtrado e paginado.
+
+        As projeções sem filtro são calculadas no carregamento; as filtradas são
+        calculadas na primeira vez e reaproveitadas até o cardápio mudar.
+        """
+        self._ensure_fresh()
+        if menu_format not in _PROJECTIONS:
+            raise ValueError(f"Formato de cardápio inválido: {menu_format}. Use um de {', '.join(MENU_FORMATS)}.")
+
+        filters = (
+            normalize(size) if size else None,
+            normalize(crust) if crust else None,
+            min_price,
+            max_price,
+        )
+        if filters == (None, None, None, None):
+            items = self._views[menu_format]
+        else:
+            key = (menu_format,) + filters
+            items = self._filtered_views.get(key)
+            if items is None:
+                rows = [row for row in self._menu if self._matches(row, *filters)]
+                items = tuple(_PROJECTIONS[menu_format](rows))
+                if len(self._filtered_views) >= 256:
+                    self._filtered_views.clear()
+                self._filtered_views[key] = items
+
+        if page_size > 0:
+            start = (max(page, 1) - 1) * page_size
+            items = items[start:start + page_size]
+        return list(items)
+
+    @staticmethod
+    def _matches(row: Dict, size: Optional[str], crust: Optional[str], min_price: Optional[float], max_price: Optional[float]) -> bool:
+        if size and normalize(row["size"]) != size:
+            return False
+        if crust and normalize(row["crust"]) != crust:
+            return False
+        if min_price is not None and row["unit_price"] < min_price:
+            return False
+        if max_price is not None and row["unit_price"] > max_price:
+            return False
+        return True
+
+    def prices_for(self, flavour: str) -> List[Dict]:
+        """Preços de um sabor exato do cardápio."""
+        self._ensure_fresh()
+        return list(self._rows_by_flavour.get(flavour, ()))
+
+    def price(self, flavour: str, size: str, crust: str) -> Optional[float]:
+        """Preço de uma combinação exata de sabor, tamanho e borda."""
+        self._ensure_fresh()
+        return self._price_index.get((flavour, size, crust))
+
+    def available_flavours(self) -> Tuple[str, ...]:
+        self._ensure_fresh()
+        return self.flavours
+
+    def match_flavour(self, query: str, limit: int = 3, cutoff: float = 0.3) -> List[FlavourMatch]:
+        """Sabores do cardápio mais próximos do texto digitado pelo cliente."""
+        self._ensure_fresh()
+        return self._matcher.match(query, limit=limit, cutoff=cutoff)
+
+    def match_size(self, query: str) -> Optional[str]:
+        """Tamanho do cardápio correspondente ao texto informado."""
+        self._ensure_fresh()
+        matches = self._size_matcher.match(query, limit=1, cutoff=0.5)
+        return matches[0].name if matches else None
+
+    def match_crust(self, query: str) -> Optional[str]:
+        """Tipo de borda do cardápio correspondente ao texto informado."""
+        self._ensure_fresh()
+        matches = self._crust_matcher.match(query, limit=1, cutoff=0.5)
+        return matches[0].name if matches else None
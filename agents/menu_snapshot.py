@@ -0,0 +1,240 @@
+"""Ingestão e leitura por ``mmap`` do snapshot pré-compilado do cardápio."""
+import argparse
+import array
+import json
+import logging
+import math
+import mmap
+import os
+import sqlite3
+import struct
+import sys
+import zlib
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .flavour_matcher import normalize
+from .menu_catalog import MenuData, MenuRow
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"PZMENU"
+FORMAT_VERSION = 1
+# magic, versão, sabores, tamanhos, bordas, início e tamanho dos nomes, início dos preços, crc32
+HEADER = struct.Struct("<6sHIIIIIII")
+
+
+class SnapshotError(ValueError):
+    """O banco não passou na validação ou o arquivo de snapshot é inválido."""
+
+
+def _read_table(connection: sqlite3.Connection, sql: str, table: str) -> List[Tuple]:
+    try:
+        return connection.execute(sql).fetchall()
+    except sqlite3.Error as exc:
+        raise SnapshotError(f"Não foi possível ler a tabela {table}: {exc}") from exc
+
+
+def _names_by_id(rows: Sequence[Tuple], table: str, problems: List[str]) -> Dict[int, str]:
+    names: Dict[int, str] = {}
+    seen: Dict[str, int] = {}
+    for row_id, name in rows:
+        name = (name or "").strip()
+        if not name:
+            problems.append(f"{table}: registro {row_id} sem nome")
+            continue
+        if name in seen:
+            problems.append(f"{table}: '{name}' repetido nos registros {seen[name]} e {row_id}")
+            continue
+        seen[name] = row_id
+        names[row_id] = name
+    if not rows:
+        problems.append(f"{table}: tabela vazia")
+    return names
+
+
+def read_menu(db_path: str) -> List[MenuRow]:
+    """Ler e validar o cardápio do banco SQLite; levanta ``SnapshotError`` com todos os problemas."""
+    if not os.path.exists(db_path):
+        raise SnapshotError(f"Banco do cardápio não encontrado: {db_path}")
+    connection = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        pizzas = _read_table(connection, "SELECT id, sabor FROM pizzas", "pizzas")
+        sizes = _read_table(connection, "SELECT id, tamanho FROM tamanhos", "tamanhos")
+        crusts = _read_table(connection, "SELECT id, tipo FROM bordas", "bordas")
+        prices = _read_table(connection, "SELECT id, pizza_id, tamanho_id, borda_id, preco FROM precos", "precos")
+    finally:
+        connection.close()
+
+    problems: List[str] = []
+    flavour_names = _names_by_id(pizzas, "pizzas", problems)
+    size_names = _names_by_id(sizes, "tamanhos", problems)
+    crust_names = _names_by_id(crusts, "bordas", problems)
+
+    normalized: Dict[str, str] = {}
+    for flavour in flavour_names.values():
+        key = normalize(flavour)
+        if key in normalized:
+            problems.append(f"pizzas: '{flavour}' e '{normalized[key]}' não se distinguem na busca")
+        normalized[key] = flavour
+
+    rows: Dict[Tuple[str, str, str], float] = {}
+    for price_id, pizza_id, size_id, crust_id, price in prices:
+        key = (flavour_names.get(pizza_id), size_names.get(size_id), crust_names.get(crust_id))
+        if None in key:
+            problems.append(f"precos: registro {price_id} aponta para sabor, tamanho ou borda inexistente")
+            continue
+        if not isinstance(price, (int, float)) or not math.isfinite(price) or price <= 0:
+            problems.append(f"precos: registro {price_id} com preço inválido ({price!r})")
+            continue
+        if key in rows and rows[key] != price:
+            problems.append(f"precos: {key[0]} ({key[1]}, {key[2]}) com dois preços diferentes")
+            continue
+        rows[key] = float(price)
+    if not prices:
+        problems.append("precos: tabela vazia")
+
+    if problems:
+        raise SnapshotError("Cardápio inválido:\n- " + "\n- ".join(problems))
+
+    unpriced = set(flavour_names.values()) - {flavour for flavour, _, _ in rows}
+    if unpriced:
+        logger.warning("Sabores sem preço ficam fora do snapshot: %s", ", ".join(sorted(unpriced)))
+    return [(flavour, size, crust, price) for (flavour, size, crust), price in rows.items()]
+
+
+def build_snapshot(rows: Sequence[MenuRow]) -> bytes:
+    """Montar o conteúdo do arquivo de snapshot a partir das linhas do cardápio."""
+    flavours = list(dict.fromkeys(row[0] for row in rows))
+    sizes = list(dict.fromkeys(row[1] for row in rows))
+    crusts = list(dict.fromkeys(row[2] for row in rows))
+    flavour_index = {name: index for index, name in enumerate(flavours)}
+    size_index = {name: index for index, name in enumerate(sizes)}
+    crust_index = {name: index for index, name in enumerate(crusts)}
+
+    matrix = array.array("d", [math.nan]) * (len(flavours) * len(sizes) * len(crusts))
+    for flavour, size, crust, price in rows:
+        matrix[(flavour_index[flavour] * len(sizes) + size_index[size]) * len(crusts) + crust_index[crust]] = price
+    if sys.byteorder != "little":
+        matrix.byteswap()
+
+    names = json.dumps(
+        {"flavours": flavours, "normalized": [normalize(name) for name in flavours], "sizes": sizes, "crusts": crusts},
+        ensure_ascii=False, separators=(",", ":"),
+    ).encode("utf-8")
+    names_offset = HEADER.size
+    prices_offset = -(-(names_offset + len(names)) // 8) * 8
+    body = names + b"\0" * (prices_offset - names_offset - len(names)) + matrix.tobytes()
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, len(flavours), len(sizes), len(crusts),
+        names_offset, len(names), prices_offset, zlib.crc32(body),
+    )
+    return header + body
+
+
+def publish_snapshot(rows: Sequence[MenuRow], path: str) -> int:
+    """Gravar o snapshot em ``path`` de forma atômica; devolve o tamanho em bytes."""
+    content = build_snapshot(rows)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as snapshot_file:
+            snapshot_file.write(content)
+            snapshot_file.flush()
+            os.fsync(snapshot_file.fileno())
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+    return len(content)
+
+
+class MenuSnapshot:
+    """Snapshot aberto por ``mmap``; os preços são lidos direto do mapa até a saída do contexto."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as snapshot_file:
+            self._map = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._parse(path)
+        except Exception:
+            self._map.close()
+            raise
+
+    def _parse(self, path: str) -> None:
+        if len(self._map) < HEADER.size:
+            raise SnapshotError(f"Snapshot truncado: {path}")
+        (magic, version, flavours, sizes, crusts,
+         names_offset, names_length, prices_offset, checksum) = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise SnapshotError(f"Formato de snapshot não suportado: {path}")
+        cells = flavours * sizes * crusts
+        if len(self._map) != prices_offset + cells * 8 or zlib.crc32(self._map[HEADER.size:]) != checksum:
+            raise SnapshotError(f"Snapshot corrompido: {path}")
+
+        names = json.loads(self._map[names_offset:names_offset + names_length].decode("utf-8"))
+        self.flavours: Tuple[str, ...] = tuple(names["flavours"])
+        self.normalized: Tuple[str, ...] = tuple(names["normalized"])
+        self.sizes: Tuple[str, ...] = tuple(names["sizes"])
+        self.crusts: Tuple[str, ...] = tuple(names["crusts"])
+
+        # As duas views precisam ser liberadas antes de fechar o mapa.
+        self._buffer = memoryview(self._map)[prices_offset:prices_offset + cells * 8]
+        if sys.byteorder == "little":
+            self._prices = self._buffer.cast("d")
+        else:
+            swapped = array.array("d", self._buffer.tobytes())
+            swapped.byteswap()
+            self._prices = memoryview(swapped)
+
+    def price(self, flavour: int, size: int, crust: int) -> Optional[float]:
+        price = self._prices[(flavour * len(self.sizes) + size) * len(self.crusts) + crust]
+        return None if math.isnan(price) else price
+
+    def rows(self) -> Iterator[MenuRow]:
+        prices = self._prices
+        cell = 0
+        for flavour in self.flavours:
+            for size in self.sizes:
+                for crust in self.crusts:
+                    price = prices[cell]
+                    cell += 1
+                    if price == price:
+                        yield flavour, size, crust, price
+
+    def close(self) -> None:
+        self._prices.release()
+        self._buffer.release()
+        self._map.close()
+
+    def __enter__(self) -> "MenuSnapshot":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def load_snapshot(path: str) -> MenuData:
+    """Linhas do cardápio e nomes normalizados, no formato aceito pelo ``MenuCatalog``."""
+    with MenuSnapshot(path) as snapshot:
+        return MenuData(list(snapshot.rows()), dict(zip(snapshot.flavours, snapshot.normalized)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=os.getenv("SQLITE_DB_PATH"), help="Banco SQLite do cardápio (padrão: SQLITE_DB_PATH)")
+    parser.add_argument("--output", default=os.getenv("MENU_SNAPSHOT_PATH"), help="Arquivo de snapshot (padrão: MENU_SNAPSHOT_PATH)")
+    args = parser.parse_args()
+    if not args.db or not args.output:
+        parser.error("informe --db e --output (ou SQLITE_DB_PATH e MENU_SNAPSHOT_PATH)")
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    try:
+        rows = read_menu(args.db)
+    except SnapshotError as exc:
+        logger.error("%s", exc)
+        sys.exit(1)
+    size = publish_snapshot(rows, args.output)
+    logger.info("Snapshot publicado em %s: %d preços, %d bytes", args.output, len(rows), size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import threading
+from typing import Dict, Tuple
+
+MetricKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _format_key(key: MetricKey) -> str:
+    name, labels = key
+    if not labels:
+        return name
+    rendered = ",".join(f'{label}="{value}"' for label, value in labels)
+    return f"{name}{{{rendered}}}"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """Contadores e medidores simples, compartilhados pelo processo."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[MetricKey, float] = {}
+        self._gauges: Dict[MetricKey, float] = {}
+
+    @staticmethod
+    def _key(name: str, labels: Dict[str, object]) -> MetricKey:
+        return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+    def increment(self, name: str, value: float = 1.0, **labels) -> None:
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def set_gauge(self, name: str, value: float, **labels) -> None:
+        key = self._key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def value(self, name: str, **labels) -> float:
+        key = self._key(name, labels)
+        with self._lock:
+            return self._counters.get(key, self._gauges.get(key, 0.0))
+
+    def total(self, name: str) -> float:
+        """Soma de um contador em todas as combinações de labels."""
+        with self._lock:
+            return sum(value for (metric, _), value in self._counters.items() if metric == name)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            items = list(self._counters.items()) + list(self._gauges.items())
+        return {_format_key(key): value for key, value in sorted(items)}
+
+    def typed_snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Contadores e medidores separados, para quem agrega vários processos."""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+        return {
+            "counters": {_format_key(key): value for key, value in counters},
+            "gauges": {_format_key(key): value for key, value in gauges},
+        }
+
+    def render_prometheus(self) -> str:
+        """Todas as métricas no formato de texto do Prometheus."""
+        with self._lock:
+            groups = [("counter", sorted(self._counters.items())), ("gauge", sorted(self._gauges.items()))]
+
+        lines = []
+        for metric_type, items in groups:
+            declared = set()
+            for (name, labels), value in items:
+                if name not in declared:
+                    declared.add(name)
+                    lines.append(f"# TYPE {name} {metric_type}")
+                rendered = ",".join(f'{label}="{_escape_label(value)}"' for label, value in labels)
+                lines.append(f"{name}{{{rendered}}} {value}" if rendered else f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
@@ -3,8 +3,11 @@ import os
 from textwrap import dedent
 from agno.agent import Agent
 from agno.models.openai import OpenAIChat
-from agno.db.in_memory import InMemoryDb
 
+from ..history import HISTORY_NUM_RUNS, HISTORY_POST_HOOKS
+from ..storage import agent_db
+from ..tracing import TOOL_HOOKS
+from .router import CREATE_ORDER_KEYWORDS, UPDATE_ORDER_KEYWORDS
 from .tools import call_create_order_agent, call_update_order_agent
 
 def set_active_agent(session_state, agent_name: str) -> None:
@@ -29,11 +32,11 @@ system_instructions = dedent("""\
        - SEMPRE comece dando as boas vindas a beauty pizzaria e pergunte como pode ajudar.
 
     3. Identifique o que o cliente deseja:
-       - Se quer CRIAR/FAZER pedido (palavras: "quero pedir", "fazer pedido", "encomendar", "comprar pizza", "pizza", etc.)
+       - Se quer CRIAR/FAZER pedido (palavras: {create_keywords}, etc.)
          → Defina session_state["active_agent"] = "create_order"
          → Use call_create_order_agent para direcionar
        
-       - Se quer ALTERAR/MODIFICAR/ATUALIZAR pedido (palavras: "alterar", "modificar", "atualizar", "mudar pedido", "editar", etc.)
+       - Se quer ALTERAR/MODIFICAR/ATUALIZAR pedido (palavras: {update_keywords}, etc.)
          → Defina session_state["active_agent"] = "update_order"
          → Use call_update_order_agent para direcionar
     
@@ -45,7 +48,10 @@ system_instructions = dedent("""\
     REGRAS CRÍTICAS: 
     - Uma vez que active_agent = "create_order", TODA mensagem subsequente deve ir direto para call_create_order_agent
     - Uma vez que active_agent = "update_order", TODA mensagem subsequente deve ir direto para call_update_order_agent
-    """)
+    """).format(
+    create_keywords=", ".join(f'"{keyword}"' for keyword in CREATE_ORDER_KEYWORDS),
+    update_keywords=", ".join(f'"{keyword}"' for keyword in UPDATE_ORDER_KEYWORDS),
+)
 
 def set_active_agent(session_state, agent_name: str) -> None:
     """Definir qual agente está ativo."""
@@ -57,7 +63,10 @@ agent = Agent(
     tools=[call_create_order_agent, call_update_order_agent, set_active_agent],
     instructions=system_instructions,
     session_state={},
-    db=InMemoryDb(),
+    db=agent_db,
+    num_history_runs=HISTORY_NUM_RUNS,
+    post_hooks=HISTORY_POST_HOOKS,
+    tool_hooks=TOOL_HOOKS,
     additional_context=dedent("""\
     Você é um orquestrador que direciona clientes para os agentes corretos.
     Não processe pedidos diretamente - apenas direcione.
@@ -0,0 +1,197 @@
+import asyncio
+import logging
+import os
+import uuid
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional, Tuple
+
+from ..deadline import TURN_DEADLINE_GRACE, DeadlineExceeded, bounded, turn_deadline
+from ..flavour_matcher import normalize
+from ..metrics import metrics
+from ..storage import SessionStore, agent_db, session_store
+from ..streaming import current_sink, run_agent_streaming, stream_turn
+from ..tracing import annotate_run, tracer
+from .tools import call_create_order_agent, call_update_order_agent, degraded_reply
+
+logger = logging.getLogger(__name__)
+
+# Palavras-chave usadas tanto pelo classificador local quanto pelas instruções
+# do orquestrador, para que as duas formas de roteamento concordem.
+CREATE_ORDER_KEYWORDS = (
+    "quero pedir",
+    "fazer pedido",
+    "fazer um pedido",
+    "novo pedido",
+    "encomendar",
+    "comprar pizza",
+    "pizza",
+)
+UPDATE_ORDER_KEYWORDS = (
+    "alterar",
+    "modificar",
+    "atualizar",
+    "mudar pedido",
+    "editar",
+    "trocar",
+    "remover item",
+)
+
+try:
+    ROUTER_CONFIDENCE_THRESHOLD = float(os.getenv("ROUTER_CONFIDENCE_THRESHOLD", "0.6"))
+except (TypeError, ValueError):
+    ROUTER_CONFIDENCE_THRESHOLD = 0.6
+
+SUB_AGENT_TOOLS = {
+    "create_order": call_create_order_agent,
+    "update_order": call_update_order_agent,
+}
+
+ROUTING_STATE_KEYS = ("active_agent", "create_order_session_id", "update_order_session_id")
+AGENT_SESSION_KEYS = ("orchestrator_session_id", "create_order_session_id", "update_order_session_id")
+
+
+class RoutingDecision(NamedTuple):
+    target: str
+    route: str
+    confidence: float
+
+
+def _keyword_score(text: str, keywords: Tuple[str, ...]) -> float:
+    padded = f" {text} "
+    return sum(len(keyword.split()) for keyword in keywords if f" {normalize(keyword)} " in padded)
+
+
+def classify_intent(message: str) -> Tuple[Optional[str], float]:
+    """Classificar a intenção da mensagem pelas palavras-chave, com uma confiança entre 0 e 1."""
+    text = normalize(message)
+    scores = {
+        "create_order": _keyword_score(text, CREATE_ORDER_KEYWORDS),
+        "update_order": _keyword_score(text, UPDATE_ORDER_KEYWORDS),
+    }
+    (target, best), (_, second) = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    if best == 0:
+        return None, 0.0
+    return target, (best / (best + second)) * min(1.0, best)
+
+
+class IntentRouter:
+    """Camada de roteamento na frente do orquestrador, que só chama o LLM quando a intenção não é clara."""
+
+    def __init__(self, store: SessionStore, confidence_threshold: float = 0.6):
+        self.store = store
+        self.confidence_threshold = confidence_threshold
+
+    def _state_for(self, conversation_id: str) -> Dict:
+        state = self.store.get(conversation_id)
+        if state is None:
+            # As sessões dos agentes são criadas junto com a conversa, para que
+            # qualquer processo que compartilhe o banco de sessões as encontre
+            # e para que sejam removidas quando a conversa expirar.
+            suffix = uuid.uuid4().hex[:12]
+            state = {
+                "orchestrator_session_id": f"{conversation_id}:{suffix}",
+                "create_order_session_id": f"{conversation_id}:create_order:{suffix}",
+                "update_order_session_id": f"{conversation_id}:update_order:{suffix}",
+            }
+        return state
+
+    def decide(self, state: Dict, message: str) -> RoutingDecision:
+        active_agent = state.get("active_agent")
+        if active_agent in SUB_AGENT_TOOLS:
+            return RoutingDecision(active_agent, "sticky", 1.0)
+
+        target, confidence = classify_intent(message)
+        if target is not None and confidence >= self.confidence_threshold:
+            return RoutingDecision(target, "keyword", confidence)
+        return RoutingDecision("orchestrator", "llm", confidence)
+
+    async def respond(self, conversation_id: str, message: str) -> str:
+        """Responder uma mensagem, chamando o LLM do orquestrador apenas quando necessário.
+
+        O turno segue o prazo em vigor (ou um novo, a partir de agora); se ele
+        acabar, a resposta é a mensagem degradada de ``deadline``.
+        """
+        with turn_deadline() as deadline, tracer.trace("turn", message_chars=len(message)) as turn:
+            try:
+                # O orquestrador é o último a ser interrompido, depois dos subagentes.
+                reply = await bounded(
+                    self._respond(conversation_id, message, turn), "orchestrator", grace=2 * TURN_DEADLINE_GRACE
+                )
+            except DeadlineExceeded:
+                logger.warning("[ORQUESTRADOR] Prazo do turno esgotado na sessão %s", conversation_id)
+                reply = degraded_reply()
+            if deadline is not None and deadline.exceeded_in:
+                turn.set(deadline_exceeded=deadline.exceeded_in)
+            return reply
+
+    async def _respond(self, conversation_id: str, message: str, turn) -> str:
+        state = self._state_for(conversation_id)
+        decision = self.decide(state, message)
+        turn.set(route=decision.route, target=decision.target)
+        metrics.increment("router_decisions_total", route=decision.route, target=decision.target)
+        if decision.route != "llm":
+            metrics.increment("router_llm_calls_saved_total")
+        metrics.set_gauge("router_llm_calls_saved_ratio", self.stats()["llm_calls_saved_ratio"])
+
+        if decision.route != "llm":
+            state["active_agent"] = decision.target
+            try:
+                return await SUB_AGENT_TOOLS[decision.target](state, message)
+            finally:
+                self.store.put(conversation_id, state)
+
+        from .agent import agent
+
+        run_options = {
+            "session_id": state["orchestrator_session_id"],
+            "session_state": dict(state),
+            "add_history_to_context": True,
+        }
+        with tracer.span("orchestrator", kind="llm") as span:
+            if current_sink() is not None:
+                response = await run_agent_streaming(agent, message, **run_options)
+            else:
+                response = await agent.arun(message, **run_options)
+            annotate_run(span, response)
+        for key in ROUTING_STATE_KEYS:
+            if response.session_state and response.session_state.get(key):
+                state[key] = response.session_state[key]
+        self.store.put(conversation_id, state)
+        return response.content
+
+    async def respond_stream(self, conversation_id: str, message: str) -> AsyncIterator[str]:
+        """Responder uma mensagem entregando o texto à medida que o modelo o gera."""
+        async for chunk in stream_turn(lambda: self.respond(conversation_id, message)):
+            yield chunk
+
+    def evict_idle(self) -> List[str]:
+        """Remover conversas inativas e as sessões correspondentes dos agentes."""
+        expired = self.store.evict_expired()
+        if expired:
+            session_ids = [
+                state[key] for state in expired.values() for key in AGENT_SESSION_KEYS if state.get(key)
+            ]
+            agent_db.delete_sessions(session_ids)
+            metrics.increment("sessions_evicted_total", len(expired))
+        return list(expired)
+
+    async def run_maintenance(self, interval: float) -> None:
+        """Gravar o estado pendente e expirar conversas inativas periodicamente."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.store.flush)
+                await asyncio.to_thread(self.evict_idle)
+            except Exception:
+                logger.exception("[ERRO] Falha na manutenção das sessões")
+
+    def stats(self) -> Dict[str, float]:
+        decisions = metrics.total("router_decisions_total")
+        saved = metrics.total("router_llm_calls_saved_total")
+        return {
+            "decisions": decisions,
+            "llm_calls_saved": saved,
+            "llm_calls_saved_ratio": round(saved / decisions, 4) if decisions else 0.0,
+        }
+
+
+router = IntentRouter(session_store, confidence_threshold=ROUTER_CONFIDENCE_THRESHOLD)
@@ -1,42 +1,85 @@
+import logging
+
+from ..deadline import DeadlineExceeded, bounded, current_deadline
+from ..streaming import current_sink, run_agent_streaming
+from ..tool_cache import run_scope
+from ..tracing import annotate_run, tracer
+
+logger = logging.getLogger(__name__)
+
+
+def degraded_reply() -> str:
+    """Resposta do turno cujo prazo acabou.
+
+    Se parte do texto já foi entregue em streaming, o aviso segue no mesmo
+    stream (uma única vez por turno).
+    """
+    deadline = current_deadline()
+    sink = current_sink()
+    if sink is not None and sink.streamed and not deadline.degraded:
+        sink.push(f"\n\n{deadline.degraded_reply()}")
+    return deadline.degraded_reply()
+
+
 async def call_create_order_agent(session_state, user_input: str) -> str:
     """Chamar o agente de criação de pedido."""
-    print("🔄 [ORQUESTRADOR] Direcionando para agente de CRIAR PEDIDO")
-    print("Processando solicitação...")
-    
+    logger.debug("[ORQUESTRADOR] Direcionando para agente de CRIAR PEDIDO")
+
     try:
         from ..create_order.agent import agent
-        
+
         session_id = session_state.get("create_order_session_id")
-        response = await agent.arun(user_input, session_id=session_id, add_history_to_context=True)
-        
+        with run_scope(), tracer.span("create_order", kind="agent", streaming=current_sink() is not None) as span:
+            if current_sink() is not None:
+                run = run_agent_streaming(
+                    agent, user_input, sub_agent=True, session_id=session_id, add_history_to_context=True
+                )
+            else:
+                run = agent.arun(user_input, session_id=session_id, add_history_to_context=True)
+            response = await bounded(run, "create_order")
+            annotate_run(span, response)
+
         session_state["create_order_session_id"] = response.session_id
 
-        print("[AGENTE CRIAR PEDIDOS] Resposta processada")
+        logger.debug("[AGENTE CRIAR PEDIDOS] Resposta processada")
         return response.content
-        
-    except Exception as e:
-        print(f"❌ [ERRO] Falha ao carregar agente de criar pedidos: {e}")
+
+    except DeadlineExceeded:
+        logger.warning("[AGENTE CRIAR PEDIDOS] Prazo do turno esgotado")
+        return degraded_reply()
+
+    except Exception:
+        logger.exception("[ERRO] Falha ao executar agente de criar pedidos")
         return "Desculpe, estou com problemas técnicos no momento. Tente novamente em alguns instantes."
 
 
 async def call_update_order_agent(session_state, user_input: str) -> str:
     """Chamar o agente de atualização de pedido."""
-    print("🔄 [ORQUESTRADOR] Direcionando para agente de ATUALIZAR PEDIDO")
-    print("Processando solicitação...")
-    
+    logger.debug("[ORQUESTRADOR] Direcionando para agente de ATUALIZAR PEDIDO")
+
     try:
         from ..update_order.agent import agent
-        
+
         session_id = session_state.get("update_order_session_id")
-        response = await agent.arun(user_input, session_id=session_id, add_history_to_context=True)
+        with run_scope(), tracer.span("update_order", kind="agent", streaming=current_sink() is not None) as span:
+            if current_sink() is not None:
+                run = run_agent_streaming(
+                    agent, user_input, sub_agent=True, session_id=session_id, add_history_to_context=True
+                )
+            else:
+                run = agent.arun(user_input, session_id=session_id, add_history_to_context=True)
+            response = await bounded(run, "update_order")
+            annotate_run(span, response)
 
         session_state["update_order_session_id"] = response.session_id
-        
-        print("[AGENTE ATUALIZAR PEDIDOS] Resposta processada")
+
+        logger.debug("[AGENTE ATUALIZAR PEDIDOS] Resposta processada")
         return response.content
-        
-    except Exception as e:
-        print(f"❌ [ERRO] Falha ao carregar agente de atualizar pedidos: {e}")
-        import traceback
-        traceback.print_exc()
-        return "Desculpe, estou com problemas técnicos no momento. Tente novamente em alguns instantes."
\ No newline at end of file
+
+    except DeadlineExceeded:
+        logger.warning("[AGENTE ATUALIZAR PEDIDOS] Prazo do turno esgotado")
+        return degraded_reply()
+
+    except Exception:
+        logger.exception("[ERRO] Falha ao executar agente de atualizar pedidos")
+        return "Desculpe, estou com problemas técnicos no momento. Tente novamente em alguns instantes."
@@ -0,0 +1,127 @@
+"""Validação local do pedido, numa única passada, antes do envio à API."""
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .cart import Cart, LineItem
+from .pricing import PricingEngine, PricingError, format_price
+from .records import ValidationProblem
+
+_NON_DIGITS = re.compile(r"\D")
+_SPACES = re.compile(r"\s+")
+_NUMBER = re.compile(r"\d+")
+# Abreviações comuns do tipo de logradouro no início do nome da rua.
+_STREET_TYPES = (
+    (re.compile(r"^r\.?\s+", re.IGNORECASE), "Rua "),
+    (re.compile(r"^av\.?\s+", re.IGNORECASE), "Avenida "),
+    (re.compile(r"^al\.?\s+", re.IGNORECASE), "Alameda "),
+    (re.compile(r"^tv\.?\s+|^trav\.?\s+", re.IGNORECASE), "Travessa "),
+    (re.compile(r"^rod\.?\s+", re.IGNORECASE), "Rodovia "),
+    (re.compile(r"^estr\.?\s+", re.IGNORECASE), "Estrada "),
+    (re.compile(r"^p[cç]a\.?\s+", re.IGNORECASE), "Praça "),
+)
+
+
+class ValidatedOrder(NamedTuple):
+    """Resultado da validação: os itens com preço do cardápio e os problemas encontrados."""
+
+    client_name: str
+    client_document: str
+    address: Dict
+    items: List[Dict]
+    cart: Cart
+    problems: List[ValidationProblem]
+
+
+def cpf_digits(document: str) -> Optional[str]:
+    """Os 11 dígitos do CPF, ou ``None`` se o número for inválido."""
+    digits = _NON_DIGITS.sub("", document or "")
+    if len(digits) != 11 or digits == digits[0] * 11:
+        return None
+    for length in (9, 10):
+        total = sum(int(digit) * weight for digit, weight in zip(digits, range(length + 1, 1, -1)))
+        if (total * 10 % 11) % 10 != int(digits[length]):
+            return None
+    return digits
+
+
+def _clean(value) -> str:
+    return _SPACES.sub(" ", str(value or "")).strip()
+
+
+def normalize_address(address: Optional[Dict]) -> Tuple[Dict, List[ValidationProblem]]:
+    """Endereço com espaços e abreviações padronizados, e os problemas encontrados."""
+    address = address or {}
+    problems: List[ValidationProblem] = []
+
+    street_name = _clean(address.get("street_name"))
+    for pattern, replacement in _STREET_TYPES:
+        street_name = pattern.sub(replacement, street_name, count=1)
+    if not street_name:
+        problems.append(ValidationProblem("address.street_name", "Informe o nome da rua."))
+
+    number_match = _NUMBER.search(str(address.get("number") or ""))
+    number = int(number_match.group()) if number_match else 0
+    if number <= 0:
+        problems.append(ValidationProblem("address.number", "Informe o número do endereço."))
+
+    normalized = {
+        "street_name": street_name,
+        "number": number,
+        "complement": _clean(address.get("complement")),
+        "reference_point": _clean(address.get("reference_point")),
+    }
+    return normalized, problems
+
+
+def _check_items(cart: Cart, engine: PricingEngine) -> Tuple[List[Dict], Cart, List[ValidationProblem]]:
+    items: List[Dict] = []
+    lines: List[LineItem] = []
+    problems: List[ValidationProblem] = []
+    if not cart:
+        problems.append(ValidationProblem("cart", "Adicione pelo menos uma pizza ao pedido."))
+    for line in cart:
+        label = f"{line.name} ({line.size}, borda {line.crust})"
+        try:
+            item = engine.price_item(line.as_item())
+        except PricingError as e:
+            problems.append(ValidationProblem("cart", f"{label}: {e}"))
+            lines.append(line)
+            continue
+        # Os itens do carrinho já têm os nomes do cardápio; outro nome aqui é só
+        # a busca aproximada achando um sabor parecido com um que saiu do cardápio.
+        if (item["name"], item["size"], item["crust"]) != line.key:
+            problems.append(ValidationProblem("cart", f"{label}: não está mais disponível no cardápio."))
+            lines.append(line)
+            continue
+        if abs(item["unit_price"] - line.unit_price) > 0.005:
+            problems.append(ValidationProblem(
+                "cart",
+                f"{label}: o preço mudou de {format_price(line.unit_price)} para "
+                f"{format_price(item['unit_price'])}. Confirme com o cliente antes de enviar.",
+            ))
+        items.append(item)
+        lines.append(LineItem(item["name"], item["size"], item["crust"], item["quantity"], item["unit_price"]))
+    return items, Cart(lines), problems
+
+
+def validate_order(session_state: Dict, engine: PricingEngine) -> ValidatedOrder:
+    """Conferir nome, CPF, endereço e itens do pedido de uma vez."""
+    problems: List[ValidationProblem] = []
+
+    client_name = _clean(session_state.get("user_name"))
+    if not client_name:
+        problems.append(ValidationProblem("user_name", "Informe o nome do cliente."))
+
+    client_document = _clean(session_state.get("user_document"))
+    if not client_document:
+        problems.append(ValidationProblem("user_document", "Informe o CPF do cliente."))
+    elif cpf_digits(client_document) is None:
+        problems.append(ValidationProblem("user_document", f"O CPF {client_document} é inválido; confira os dígitos com o cliente."))
+
+    address, address_problems = normalize_address(session_state.get("address"))
+    problems.extend(address_problems)
+
+    items, cart, item_problems = _check_items(Cart.from_state(session_state.get("cart")), engine)
+    problems.extend(item_problems)
+
+    return ValidatedOrder(client_name, client_document, address, items, cart, problems)
@@ -0,0 +1,142 @@
+"""Buscas antecipadas na API de pedidos, em segundo plano, por sessão."""
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from .api_cache import ResponseCache
+from .deadline import no_deadline
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+PrefetchPlan = Callable[[Callable[[str], None]], Awaitable[None]]
+# (sessão, chave ou endpoint)
+Owned = Tuple[str, str]
+
+
+class Prefetcher:
+    """Dispara e acompanha buscas antecipadas, cada uma pertencente a uma sessão."""
+
+    def __init__(
+        self,
+        name: str,
+        cache: Optional[ResponseCache] = None,
+        max_per_session: int = 3,
+        max_in_flight: int = 32,
+        max_tracked: int = 1024,
+    ):
+        self.name = name
+        self.cache = cache
+        self.max_per_session = max_per_session
+        self.max_in_flight = max_in_flight
+        self.max_tracked = max_tracked
+        self._tasks: Dict[Owned, asyncio.Task] = {}
+        # Endpoints antecipados que nenhuma ferramenta da mesma sessão usou ainda.
+        self._unclaimed: "OrderedDict[Owned, str]" = OrderedDict()
+
+    def _count(self, result: str, amount: float = 1.0) -> None:
+        metrics.increment("orders_prefetch_total", amount, prefetcher=self.name, result=result)
+
+    def start(self, session_state: Dict, key: str, plan: PrefetchPlan) -> bool:
+        """Iniciar a busca antecipada de ``key``; devolve ``False`` se ela foi recusada."""
+        marker = session_state.get("prefetch") or {"keys": [], "used": 0}
+        marker.setdefault("session", uuid.uuid4().hex)
+        if key in marker["keys"]:
+            return False
+        if len(marker["keys"]) >= self.max_per_session or len(self._tasks) >= self.max_in_flight:
+            self._count("skipped")
+            return False
+
+        # Um documento novo torna a busca do anterior inútil.
+        if marker["keys"]:
+            self.cancel(session_state, marker["keys"][-1])
+        marker["keys"].append(key)
+        session_state["prefetch"] = marker
+
+        owned = (marker["session"], key)
+        self._tasks[owned] = asyncio.get_running_loop().create_task(self._run(owned, plan))
+        return True
+
+    async def _run(self, owned: Owned, plan: PrefetchPlan) -> None:
+        session, key = owned
+        marked = []
+
+        def mark(endpoint: str) -> None:
+            marked.append((session, endpoint))
+            self._unclaimed[(session, endpoint)] = key
+            while len(self._unclaimed) > self.max_tracked:
+                self._unclaimed.popitem(last=False)
+                self._count("expired")
+
+        def unmark() -> None:
+            for endpoint in marked:
+                self._unclaimed.pop(endpoint, None)
+
+        try:
+            # A busca serve aos próximos turnos também, então não herda o prazo
+            # do turno que a iniciou.
+            with no_deadline():
+                await plan(mark)
+            self._count("completed")
+        except asyncio.CancelledError:
+            self._count("cancelled")
+            unmark()
+            raise
+        except Exception as e:
+            # Uma busca antecipada que falha não afeta a conversa: a ferramenta
+            # fará a própria requisição.
+            logger.debug("Busca antecipada %s falhou: %s", key, e)
+            self._count("failed")
+            unmark()
+        finally:
+            self._tasks.pop(owned, None)
+
+    def claim(self, session_state: Dict, endpoint: str) -> bool:
+        """Registrar que uma ferramenta usou o endpoint; ``True`` se esta sessão o antecipou."""
+        marker = session_state.get("prefetch")
+        if not marker or "session" not in marker:
+            return False
+        if self._unclaimed.pop((marker["session"], endpoint), None) is None:
+            return False
+        # A resposta antecipada pode ter saído do cache (TTL, LRU ou invalidação);
+        # nesse caso a ferramenta fará uma nova requisição.
+        if self.cache is not None and not self.cache.has(endpoint):
+            self._count("expired")
+            return False
+        metrics.increment("orders_prefetch_used_total", prefetcher=self.name)
+        marker["used"] = marker.get("used", 0) + 1
+        return True
+
+    def cancel(self, session_state: Dict, key: str) -> bool:
+        """Cancelar a busca de ``key`` iniciada por esta sessão."""
+        marker = session_state.get("prefetch")
+        if not marker or "session" not in marker:
+            return False
+        task = self._tasks.get((marker["session"], key))
+        if task is None or task.done():
+            return False
+        task.cancel()
+        return True
+
+    async def cancel_all(self) -> None:
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, float]:
+        def value(result: str) -> float:
+            return metrics.value("orders_prefetch_total", prefetcher=self.name, result=result)
+
+        return {
+            "in_flight": len(self._tasks),
+            "completed": value("completed"),
+            "failed": value("failed"),
+            "cancelled": value("cancelled"),
+            "skipped": value("skipped"),
+            "expired": value("expired"),
+            "used": metrics.value("orders_prefetch_used_total", prefetcher=self.name),
+            "unclaimed": len(self._unclaimed),
+        }
@@ -0,0 +1,74 @@
+from typing import Dict, List, NamedTuple, Optional
+
+from .menu_catalog import MenuCatalog
+
+
+class PricingError(ValueError):
+    """O item não corresponde a nenhuma combinação do cardápio."""
+
+
+class PriceQuote(NamedTuple):
+    pizza_name: str
+    size: str
+    crust: str
+    unit_price: float
+
+
+class PricingEngine:
+    """Preços e totais calculados a partir do cardápio, sem depender do LLM."""
+
+    def __init__(self, catalog: MenuCatalog, match_margin: float = 0.05):
+        self.catalog = catalog
+        self.match_margin = match_margin
+
+    def quote(self, pizza_name: str, size: str, crust: str) -> PriceQuote:
+        matches = self.catalog.match_flavour(pizza_name, limit=3, cutoff=0.5)
+        if not matches:
+            raise PricingError(f"Sabor '{pizza_name}' não encontrado no cardápio.")
+        # Mesma regra de empate de get_pizza_prices: nunca cobrar por um sabor escolhido no chute.
+        tied = [match.name for match in matches if matches[0].score - match.score <= self.match_margin]
+        if len(tied) > 1:
+            raise PricingError(f"Sabor '{pizza_name}' é ambíguo; escolha entre: {', '.join(tied)}.")
+        canonical_size = self.catalog.match_size(size)
+        if canonical_size is None:
+            raise PricingError(f"Tamanho '{size}' não encontrado no cardápio.")
+        canonical_crust = self.catalog.match_crust(crust)
+        if canonical_crust is None:
+            raise PricingError(f"Borda '{crust}' não encontrada no cardápio.")
+
+        flavour = matches[0].name
+        price = self.catalog.price(flavour, canonical_size, canonical_crust)
+        if price is None:
+            raise PricingError(
+                f"A pizza {flavour} não está disponível no tamanho {canonical_size} com borda {canonical_crust}."
+            )
+        return PriceQuote(flavour, canonical_size, canonical_crust, float(price))
+
+    def price_item(self, item: Dict) -> Dict:
+        """Item canônico, com o preço unitário do cardápio."""
+        quote = self.quote(item["name"], item["size"], item["crust"])
+        return {
+            "name": quote.pizza_name,
+            "size": quote.size,
+            "crust": quote.crust,
+            "quantity": int(item["quantity"]),
+            "unit_price": quote.unit_price,
+        }
+
+    @staticmethod
+    def line_total(item: Dict) -> float:
+        return round(float(item["unit_price"]) * int(item["quantity"]), 2)
+
+    def cart_total(self, items: List[Dict]) -> float:
+        return round(sum(self.line_total(item) for item in items), 2)
+
+
+def corrected_price(requested: Optional[float], item: Dict) -> Optional[float]:
+    """Preço informado pelo modelo, quando diverge do preço do cardápio."""
+    if requested is not None and abs(float(requested) - item["unit_price"]) > 0.005:
+        return float(requested)
+    return None
+
+
+def format_price(value: Optional[float]) -> str:
+    return f"R$ {float(value or 0):.2f}".replace(".", ",")
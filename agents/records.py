@@ -0,0 +1,76 @@
+"""Registros estruturados, em JSON compacto, devolvidos pelas ferramentas dos agentes."""
+import json
+from typing import Any, Dict, NamedTuple, Optional
+
+
+class CartLine(NamedTuple):
+    name: str
+    size: str
+    crust: str
+    quantity: int
+    unit_price: float
+    line_total: float
+
+    @classmethod
+    def from_item(cls, item: Dict) -> "CartLine":
+        quantity = int(item["quantity"])
+        unit_price = float(item["unit_price"])
+        return cls(item["name"], item["size"], item["crust"], quantity, unit_price, round(unit_price * quantity, 2))
+
+
+class OrderSummary(NamedTuple):
+    id: int
+    status: str
+    delivery_date: str
+    total: float
+
+    @classmethod
+    def from_api(cls, order: Dict) -> "OrderSummary":
+        return cls(
+            order.get("id"),
+            order.get("status", ""),
+            order.get("delivery_date", ""),
+            round(float(order.get("total_value") or 0), 2),
+        )
+
+
+class OrderItem(NamedTuple):
+    id: int
+    name: str
+    quantity: int
+    unit_price: float
+
+    @classmethod
+    def from_api(cls, item: Dict) -> "OrderItem":
+        return cls(item["id"], item["name"], int(item["quantity"]), round(float(item["unit_price"]), 2))
+
+
+class UpdateResult(NamedTuple):
+    operation: str
+    ok: bool
+    item_id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class ValidationProblem(NamedTuple):
+    field: str
+    message: str
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, tuple) and hasattr(value, "_asdict"):
+        return {key: _plain(field) for key, field in value._asdict().items() if field is not None}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _plain(field) for key, field in value.items() if field is not None}
+    return value
+
+
+def tool_result(**fields: Any) -> str:
+    """Resultado de ferramenta em JSON compacto; campos ``None`` são omitidos."""
+    return json.dumps(_plain(fields), ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def tool_error(message: str, **fields: Any) -> str:
+    return tool_result(error=message, **fields)
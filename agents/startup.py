@@ -0,0 +1,101 @@
+"""Fase de inicialização dos agentes: preparação antecipada (``eager``) ou no primeiro uso (``lazy``)."""
+import asyncio
+import contextlib
+import importlib
+import logging
+import os
+import time
+from typing import Callable, Dict, Optional
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+STARTUP_MODES = ("eager", "lazy")
+
+STARTUP_MODE = os.getenv("STARTUP_MODE", "").lower() or None
+if STARTUP_MODE not in STARTUP_MODES:
+    STARTUP_MODE = None
+
+AGENT_MODULES = {
+    "orchestrator": "agents.orchestrator.agent",
+    "create_order": "agents.create_order.agent",
+    "update_order": "agents.update_order.agent",
+}
+
+
+def resolve_mode(requested: Optional[str], default: str) -> str:
+    """Modo pedido na linha de comando, senão ``STARTUP_MODE``, senão o padrão do comando."""
+    return requested or STARTUP_MODE or default
+
+
+def _build_agent(module_name: str) -> None:
+    agent = importlib.import_module(module_name).agent
+    # O SDK da OpenAI só importa os recursos de chat no primeiro acesso.
+    get_async_client = getattr(agent.model, "get_async_client", None)
+    if get_async_client is not None:
+        get_async_client().chat.completions
+    # O evento de telemetria do agno importa seu módulo na primeira execução.
+    if getattr(agent, "telemetry", False):
+        with contextlib.suppress(ImportError):
+            importlib.import_module("agno.api.agent")
+
+
+def _load_menu() -> None:
+    from .common_tools import MENU_SNAPSHOT_PATH, catalog_db, menu_catalog
+
+    if not MENU_SNAPSHOT_PATH:
+        # A conexão é aberta no primeiro acesso à propriedade.
+        catalog_db.connection
+    menu_catalog.refresh()
+
+
+def _prepare_agent_db() -> None:
+    from agno.db.base import SessionType
+
+    from .storage import agent_db
+
+    # Uma leitura abre a conexão (com os PRAGMAs do SQLite) e carrega a tabela de sessões, se já existir.
+    agent_db.get_session(session_id="startup", session_type=SessionType.AGENT)
+
+
+def _timed(phase: str, step: Callable[[], None], timings: Dict[str, float], errors: Dict[str, str]) -> None:
+    started = time.perf_counter()
+    try:
+        step()
+    except Exception as e:
+        logger.warning("Falha ao preparar %s na inicialização: %s", phase, e)
+        errors[phase] = f"{type(e).__name__}: {e}"
+    finally:
+        timings[phase] = time.perf_counter() - started
+        metrics.set_gauge("startup_seconds", timings[phase], phase=phase)
+
+
+async def warm_up() -> Dict:
+    """Preparar agentes, cardápio e banco de sessões em paralelo; uma etapa que falha é refeita no primeiro uso."""
+    steps: Dict[str, Callable[[], None]] = {
+        name: (lambda module_name=module_name: _build_agent(module_name))
+        for name, module_name in AGENT_MODULES.items()
+    }
+    steps["menu"] = _load_menu
+    steps["agent_db"] = _prepare_agent_db
+
+    timings: Dict[str, float] = {}
+    errors: Dict[str, str] = {}
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        asyncio.to_thread(_timed, phase, step, timings, errors) for phase, step in steps.items()
+    ))
+    total = time.perf_counter() - started
+    metrics.set_gauge("startup_seconds", total, phase="total")
+
+    logger.info(
+        "Inicialização concluída em %.0f ms (%s)",
+        total * 1000,
+        ", ".join(f"{phase}: {seconds * 1000:.0f} ms" for phase, seconds in timings.items()),
+    )
+    return {
+        "total_ms": round(total * 1000, 3),
+        "phases_ms": {phase: round(seconds * 1000, 3) for phase, seconds in timings.items()},
+        "errors": errors,
+    }
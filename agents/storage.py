@@ -0,0 +1,262 @@
+import abc
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH")
+
+try:
+    SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", "3600"))
+except (TypeError, ValueError):
+    SESSION_TTL_SECONDS = 3600.0
+
+try:
+    SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "1000"))
+except (TypeError, ValueError):
+    SESSION_CACHE_SIZE = 1000
+
+try:
+    SESSION_EVICTION_INTERVAL = float(os.getenv("SESSION_EVICTION_INTERVAL", "60"))
+except (TypeError, ValueError):
+    SESSION_EVICTION_INTERVAL = 60.0
+
+try:
+    SESSION_FLUSH_INTERVAL = float(os.getenv("SESSION_FLUSH_INTERVAL", "1"))
+except (TypeError, ValueError):
+    SESSION_FLUSH_INTERVAL = 1.0
+
+
+class SessionStore(abc.ABC):
+    """Armazenamento do estado de conversas, com expiração por inatividade."""
+
+    @abc.abstractmethod
+    def get(self, session_id: str) -> Optional[Dict]:
+        """Estado atual da conversa, ou ``None`` se não existir ou tiver expirado."""
+
+    @abc.abstractmethod
+    def put(self, session_id: str, state: Dict) -> None:
+        """Gravar o estado da conversa, renovando o prazo de expiração."""
+
+    @abc.abstractmethod
+    def delete(self, session_id: str) -> None:
+        """Remover a conversa."""
+
+    @abc.abstractmethod
+    def evict_expired(self) -> Dict[str, Dict]:
+        """Remover conversas inativas há mais que o TTL e retornar o último estado de cada uma."""
+
+    def flush(self) -> None:
+        """Gravar escritas pendentes, quando houver."""
+
+    def close(self) -> None:
+        self.flush()
+
+
+class InMemorySessionStore(SessionStore):
+    """Armazenamento em memória, limitado por tamanho (LRU) e por TTL."""
+
+    def __init__(self, ttl: float = 3600.0, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[Dict, float]]" = OrderedDict()
+        self._expired: Dict[str, Dict] = {}
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            state, updated_at = entry
+            if time.time() - updated_at > self.ttl:
+                del self._entries[session_id]
+                self._expired[session_id] = state
+                return None
+            self._entries.move_to_end(session_id)
+            return state
+
+    def put(self, session_id: str, state: Dict) -> None:
+        with self._lock:
+            self._entries[session_id] = (state, time.time())
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_entries:
+                evicted_id, (evicted_state, _) = self._entries.popitem(last=False)
+                self._expired[evicted_id] = evicted_state
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+    def evict_expired(self) -> Dict[str, Dict]:
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            expired, self._expired = self._expired, {}
+            for key in [key for key, (_, updated_at) in self._entries.items() if updated_at < cutoff]:
+                expired[key] = self._entries.pop(key)[0]
+        return expired
+
+
+class SqliteSessionStore(SessionStore):
+    """Armazenamento em SQLite (modo WAL), com escritas em lote e um cache LRU em memória na frente."""
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = 3600.0,
+        cache_size: int = 1000,
+        flush_interval: float = 1.0,
+        batch_size: int = 200,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._cache = InMemorySessionStore(ttl=ttl, max_entries=cache_size)
+        self._pending: Dict[str, Tuple[str, float]] = {}
+        self._expired: Dict[str, Dict] = {}
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("PRAGMA busy_timeout=5000")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS conversation_sessions ("
+            "session_id TEXT PRIMARY KEY, state TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_conversation_sessions_updated_at "
+            "ON conversation_sessions (updated_at)"
+        )
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        state = self._cache.get(session_id)
+        if state is not None:
+            return state
+
+        with self._lock:
+            pending = self._pending.get(session_id)
+            if pending is not None:
+                row = pending
+            else:
+                row = self._connection.execute(
+                    "SELECT state, updated_at FROM conversation_sessions WHERE session_id = ?",
+                    (session_id,),
+                ).fetchone()
+        if row is None:
+            return None
+
+        state = json.loads(row[0])
+        if time.time() - row[1] > self.ttl:
+            # O estado antigo é guardado para que evict_expired() possa limpar
+            # as sessões dos agentes antes de a conversa ser sobrescrita.
+            with self._lock:
+                self._expired[session_id] = state
+            return None
+        self._cache.put(session_id, state)
+        return state
+
+    def put(self, session_id: str, state: Dict) -> None:
+        self._cache.put(session_id, state)
+        with self._lock:
+            self._pending[session_id] = (json.dumps(state, ensure_ascii=False), time.time())
+            due = (
+                len(self._pending) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+        if due:
+            self.flush()
+
+    def delete(self, session_id: str) -> None:
+        self._cache.delete(session_id)
+        with self._lock:
+            self._pending.pop(session_id, None)
+            self._connection.execute("DELETE FROM conversation_sessions WHERE session_id = ?", (session_id,))
+
+    def flush(self) -> None:
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._pending:
+                return
+            rows = [(key, state, updated_at) for key, (state, updated_at) in self._pending.items()]
+            self._pending.clear()
+            self._connection.execute("BEGIN")
+            try:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO conversation_sessions (session_id, state, updated_at) VALUES (?, ?, ?)",
+                    rows,
+                )
+                self._connection.execute("COMMIT")
+            except sqlite3.Error:
+                self._connection.execute("ROLLBACK")
+                raise
+
+    def evict_expired(self) -> Dict[str, Dict]:
+        self.flush()
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            expired, self._expired = self._expired, {}
+            expired.update({
+                row[0]: json.loads(row[1])
+                for row in self._connection.execute(
+                    "SELECT session_id, state FROM conversation_sessions WHERE updated_at < ?", (cutoff,)
+                )
+            })
+            self._connection.execute("DELETE FROM conversation_sessions WHERE updated_at < ?", (cutoff,))
+        for key in expired:
+            self._cache.delete(key)
+        # O que sai do cache continua gravado no SQLite, então não há nada a limpar.
+        self._cache.evict_expired()
+        return expired
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            self._connection.close()
+
+
+def build_session_store() -> SessionStore:
+    """Criar o armazenamento de conversas configurado pelas variáveis de ambiente."""
+    if SESSION_DB_PATH:
+        return SqliteSessionStore(
+            SESSION_DB_PATH,
+            ttl=SESSION_TTL_SECONDS,
+            cache_size=SESSION_CACHE_SIZE,
+            flush_interval=SESSION_FLUSH_INTERVAL,
+        )
+    return InMemorySessionStore(ttl=SESSION_TTL_SECONDS)
+
+
+def build_agent_db():
+    """Criar o banco de sessões dos agentes (SQLite compartilhado ou em memória)."""
+    if not SESSION_DB_PATH:
+        from agno.db.in_memory import InMemoryDb
+
+        return InMemoryDb()
+
+    from agno.db.sqlite import SqliteDb
+    from sqlalchemy import create_engine, event
+
+    engine = create_engine(f"sqlite:///{SESSION_DB_PATH}")
+
+    @event.listens_for(engine, "connect")
+    def _configure_sqlite(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.close()
+
+    return SqliteDb(db_engine=engine, session_table="agent_sessions")
+
+
+session_store = build_session_store()
+agent_db = build_agent_db()
@@ -0,0 +1,101 @@
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+from agno.run.agent import RunContentEvent, RunOutput
+
+from .metrics import metrics
+
+
+class StreamSink:
+    """Destino dos trechos de texto gerados durante um turno em modo streaming."""
+
+    def __init__(self):
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue()
+        self.streamed = False
+        self.sub_agent_streamed = False
+
+    def push(self, chunk: str) -> None:
+        self.streamed = True
+        self.queue.put_nowait(chunk)
+
+
+_current_sink: ContextVar[Optional[StreamSink]] = ContextVar("stream_sink", default=None)
+
+
+def current_sink() -> Optional[StreamSink]:
+    return _current_sink.get()
+
+
+async def run_agent_streaming(agent, message: str, sub_agent: bool = False, **kwargs) -> RunOutput:
+    """Executar o agente em modo streaming, repassando o texto gerado ao turno atual.
+
+    Quando um subagente já enviou sua resposta pelo stream, o texto gerado
+    depois disso pelo orquestrador não é repassado, para que o cliente não
+    receba a mesma resposta duas vezes.
+    """
+    sink = current_sink()
+    run_output = None
+
+    async for event in agent.arun(message, stream=True, yield_run_output=True, **kwargs):
+        if isinstance(event, RunOutput):
+            run_output = event
+        elif isinstance(event, RunContentEvent) and isinstance(event.content, str) and event.content:
+            if sink is None or (not sub_agent and sink.sub_agent_streamed):
+                continue
+            sink.push(event.content)
+            if sub_agent:
+                sink.sub_agent_streamed = True
+
+    if run_output is None:
+        raise RuntimeError("O agente não retornou o resultado da execução.")
+    return run_output
+
+
+async def stream_turn(run: Callable[[], Awaitable[str]]) -> AsyncIterator[str]:
+    """Executar um turno e entregar o texto à medida que é gerado.
+
+    Se nada for gerado em streaming (por exemplo, uma resposta de erro), a
+    resposta final é entregue de uma vez ao término do turno.
+    """
+    sink = StreamSink()
+    token = _current_sink.set(sink)
+    try:
+        task = asyncio.ensure_future(run())
+    finally:
+        _current_sink.reset(token)
+
+    started = time.perf_counter()
+    first_chunk = True
+    try:
+        while True:
+            getter = asyncio.ensure_future(sink.queue.get())
+            done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+            if getter in done:
+                chunk = getter.result()
+            else:
+                getter.cancel()
+                if sink.queue.empty():
+                    break
+                chunk = sink.queue.get_nowait()
+
+            if first_chunk:
+                first_chunk = False
+                _record_first_token(time.perf_counter() - started)
+            yield chunk
+
+        reply = task.result()
+        if not sink.streamed and reply:
+            if first_chunk:
+                _record_first_token(time.perf_counter() - started)
+            yield reply
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+def _record_first_token(seconds: float) -> None:
+    metrics.increment("stream_first_token_seconds_total", seconds)
+    metrics.increment("stream_turns_total")
+    metrics.set_gauge("stream_first_token_seconds_last", round(seconds, 4))
@@ -0,0 +1,92 @@
+"""Memoização dos resultados das ferramentas de consulta ao cardápio."""
+import functools
+import inspect
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from .flavour_matcher import normalize
+from .metrics import metrics
+from .records import tool_result
+
+_run_results: ContextVar[Optional[Dict[Hashable, str]]] = ContextVar("tool_run_results", default=None)
+
+
+@contextmanager
+def run_scope() -> Iterator[None]:
+    """Delimitar uma execução de agente para a deduplicação de chamadas repetidas."""
+    token = _run_results.set({})
+    try:
+        yield
+    finally:
+        _run_results.reset(token)
+
+
+def _normalize_argument(value: Any) -> Hashable:
+    if isinstance(value, str):
+        return normalize(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize_argument(item) for item in value)
+    return value
+
+
+class ToolMemo:
+    """Cache LRU dos resultados de ferramentas, versionado pelos dados de origem."""
+
+    def __init__(self, version: Callable[[], Hashable], max_entries: int = 512):
+        self._version = version
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self._tools: List[str] = []
+
+    def memoize(self, function: Callable) -> Callable:
+        """Decorar uma ferramenta síncrona; a assinatura e a docstring são preservadas para o agno."""
+        signature = inspect.signature(function)
+        name = function.__name__
+        self._tools.append(name)
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = tuple((key, _normalize_argument(value)) for key, value in bound.arguments.items())
+            key = (name, arguments, self._version())
+
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                result = self._entries[key]
+                outcome = "hit"
+            else:
+                result = function(*args, **kwargs)
+                self._entries[key] = result
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                outcome = "miss"
+
+            seen = _run_results.get()
+            if seen is not None:
+                label = f"{name}({', '.join(f'{argument}={value}' for argument, value in arguments if value not in (None, ''))})"
+                first = seen.setdefault(key, label)
+                reference = tool_result(same_as=first)
+                if first is not label and len(reference) < len(str(result)):
+                    outcome = "same_as"
+                    result = reference
+            metrics.increment("tool_cache_requests_total", tool=name, result=outcome)
+            return list(result) if isinstance(result, list) else result
+
+        return wrapper
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        def total(outcome: str) -> float:
+            return sum(metrics.value("tool_cache_requests_total", tool=tool, result=outcome) for tool in self._tools)
+
+        return {
+            "entries": len(self._entries),
+            "hits": total("hit"),
+            "misses": total("miss"),
+            "same_as": total("same_as"),
+        }
@@ -0,0 +1,241 @@
+import atexit
+import inspect
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .deadline import enforce_tool_deadline
+from .metrics import metrics
+
+try:
+    TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))
+except (TypeError, ValueError):
+    TRACE_SAMPLE_RATE = 0.1
+
+TRACE_JSONL_PATH = os.getenv("TRACE_JSONL_PATH")
+
+_NUMERIC_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+class Span:
+    """Trecho cronometrado de um turno (chamada ao LLM, ferramenta, consulta, requisição)."""
+
+    __slots__ = ("trace", "name", "kind", "span_id", "parent_id", "started_at", "duration", "status", "attributes")
+
+    def __init__(self, trace: "Trace", name: str, kind: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.trace = trace
+        self.name = name
+        self.kind = kind
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.started_at = time.perf_counter()
+        self.duration = 0.0
+        self.status = "ok"
+        self.attributes = attributes
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ms": round((self.started_at - self.trace.started_at) * 1000, 3),
+            "duration_ms": round(self.duration * 1000, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Span usado quando o turno não foi amostrado; descarta tudo."""
+
+    __slots__ = ()
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    __slots__ = ("trace_id", "started_at", "timestamp", "spans")
+
+    def __init__(self):
+        self.trace_id = uuid.uuid4().hex
+        self.started_at = time.perf_counter()
+        self.timestamp = time.time()
+        self.spans: List[Span] = []
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("trace_span", default=None)
+
+
+class JsonlExporter:
+    """Grava cada turno rastreado como uma linha JSON, em uma thread separada."""
+
+    def __init__(self, path: str, max_queue: int = 10000):
+        self.path = path
+        self._queue: "queue.Queue[Optional[Dict]]" = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, record: Dict) -> None:
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            metrics.increment("trace_export_dropped_total")
+
+    def _run(self) -> None:
+        with open(self.path, "a", encoding="utf-8") as output:
+            while True:
+                record = self._queue.get()
+                if record is None:
+                    break
+                lines = [record]
+                # Esvazia o que já estiver na fila para gravar em lote.
+                while True:
+                    try:
+                        record = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if record is None:
+                        self._queue.put(None)
+                        break
+                    lines.append(record)
+                output.write("".join(json.dumps(line, ensure_ascii=False, default=str) + "\n" for line in lines))
+                output.flush()
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+
+class Tracer:
+    """Rastreamento por turno com amostragem decidida no início de cada turno."""
+
+    def __init__(self, sample_rate: float = 0.1, exporters: Optional[List] = None):
+        self.sample_rate = sample_rate
+        self.exporters = list(exporters or [])
+
+    @contextmanager
+    def trace(self, name: str, **attributes: Any) -> Iterator[Any]:
+        """Iniciar o rastreamento de um turno (ou um span, se já houver um turno em andamento)."""
+        if _current_span.get() is not None:
+            with self.span(name, kind="turn", **attributes) as span:
+                yield span
+            return
+
+        if self.sample_rate <= 0 or (self.sample_rate < 1 and random.random() >= self.sample_rate):
+            yield NOOP_SPAN
+            return
+
+        trace = Trace()
+        root = Span(trace, name, "turn", None, attributes)
+        token = _current_span.set(root)
+        try:
+            yield root
+        except BaseException as e:
+            root.status = "error"
+            root.set(error=type(e).__name__)
+            raise
+        finally:
+            _current_span.reset(token)
+            self._finish(root)
+            metrics.increment("trace_turns_sampled_total")
+            self._export(trace)
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", **attributes: Any) -> Iterator[Any]:
+        """Medir um trecho do turno atual."""
+        parent = _current_span.get()
+        if parent is None:
+            yield NOOP_SPAN
+            return
+
+        span = Span(parent.trace, name, kind, parent.span_id, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.set(error=type(e).__name__)
+            raise
+        finally:
+            _current_span.reset(token)
+            self._finish(span)
+
+    def _finish(self, span: Span) -> None:
+        span.duration = time.perf_counter() - span.started_at
+        span.trace.spans.append(span)
+        metrics.increment("trace_span_seconds_total", span.duration, kind=span.kind, span=span.name)
+        metrics.increment("trace_spans_total", kind=span.kind, span=span.name)
+
+    def _export(self, trace: Trace) -> None:
+        if not self.exporters:
+            return
+        record = {
+            "trace_id": trace.trace_id,
+            "timestamp": trace.timestamp,
+            "spans": [span.to_dict() for span in sorted(trace.spans, key=lambda span: span.started_at)],
+        }
+        for exporter in self.exporters:
+            exporter.export(record)
+
+    def close(self) -> None:
+        for exporter in self.exporters:
+            exporter.close()
+
+
+def current_span() -> Any:
+    return _current_span.get() or NOOP_SPAN
+
+
+def endpoint_name(method: str, endpoint: str) -> str:
+    """Nome de span estável para uma requisição, sem IDs nem parâmetros de busca."""
+    path = endpoint.split("?", 1)[0]
+    return f"{method.upper()} {_NUMERIC_SEGMENT.sub('/{id}', path)}"
+
+
+def annotate_run(span: Any, run_output: Any) -> None:
+    """Copiar a contagem de tokens de uma execução do agente para o span."""
+    run_metrics = getattr(run_output, "metrics", None)
+    if run_metrics is None:
+        return
+    span.set(
+        input_tokens=getattr(run_metrics, "input_tokens", 0) or 0,
+        output_tokens=getattr(run_metrics, "output_tokens", 0) or 0,
+    )
+
+
+async def trace_tool_call(function_name: str, function_call: Callable, arguments: Dict[str, Any]) -> Any:
+    """Hook de ferramentas do agno que registra um span por chamada."""
+    with tracer.span(function_name, kind="tool") as span:
+        result = function_call(**arguments)
+        if inspect.isawaitable(result):
+            result = await result
+        if isinstance(result, str):
+            span.set(result_chars=len(result))
+        return result
+
+
+def build_tracer() -> Tracer:
+    exporters = [JsonlExporter(TRACE_JSONL_PATH)] if TRACE_JSONL_PATH else []
+    return Tracer(sample_rate=TRACE_SAMPLE_RATE, exporters=exporters)
+
+
+tracer = build_tracer()
+atexit.register(tracer.close)
+
+TOOL_HOOKS = [trace_tool_call, enforce_tool_deadline]
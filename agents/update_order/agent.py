@@ -3,9 +3,11 @@ import os
 from textwrap import dedent
 from agno.agent import Agent
 from agno.models.openai import OpenAIChat
-from agno.db.in_memory import InMemoryDb
 
 from ..common_tools import get_pizza_menu, get_pizza_prices
+from ..history import HISTORY_NUM_RUNS, HISTORY_POST_HOOKS, instructions_with_state
+from ..storage import agent_db
+from ..tracing import TOOL_HOOKS
 from .tools import (
     find_order_by_document,
     set_user_new_address,
@@ -13,9 +15,10 @@ from .tools import (
     set_item_to_remove,
     process_order_updates,
     find_order_by_id,
-    find_order_items
+    find_order_items,
+    set_user_document
 )
-from ..create_order.tools import set_user_document, set_user_name
+from ..create_order.tools import set_user_name
 
 load_dotenv()
 openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -24,6 +27,11 @@ system_instructions = dedent("""\
     REGRA FUNDAMENTAL: Use APENAS as funções disponíveis para obter dados.
     Para listar itens do pedido, use find_order_items().
     NUNCA invente informações, use apenas dados vindos das funções.
+    As alterações pendentes ficam em "changes" no estado do pedido: ["add", sabor, tamanho, borda, quantidade, preço],
+    ["remove", id_do_item] e ["address", rua, número, complemento, referência].
+    As funções devolvem JSON com os campos "id", "name", "quantity", "unit_price" e "total"; use os IDs exatamente
+    como vieram e apresente os dados ao cliente em texto amigável, com preços em reais. Um campo "error" indica falha.
+    Um campo "same_as" indica que o resultado é igual ao de uma chamada anterior neste turno; use o resultado anterior.
 
     Siga este fluxo de conversa para atualizar pedidos:
     
@@ -37,7 +45,7 @@ system_instructions = dedent("""\
     7. Para ADICIONAR ITENS:
        - Pergunte se quer ver o cardápio com get_pizza_menu()
        - Use get_pizza_prices() para mostrar preços de pizzas específicas
-       - Use set_new_item() para adicionar cada item ao estado (não envie para API ainda)
+       - Use set_new_item() para adicionar cada item ao estado (não envie para API ainda). O preço é calculado automaticamente pelo cardápio.
     
     8. Para ALTERAR ENDEREÇO:
        - Peça o novo endereço completo
@@ -77,15 +85,19 @@ agent = Agent(
         find_order_by_id,
         find_order_items
     ],
-    instructions=system_instructions,
+    instructions=instructions_with_state(
+        system_instructions,
+        ["user_document", "selected_order_id", "changes"],
+    ),
     session_state={
         "user_document": "", 
         "user_name": "",
-        "new_user_address": {},
-        "new_items": [],
-        "to_delete_items": [],
         "selected_order_id": None,
-        "orders_list": []
+        "selected_order": {},
+        "changes": []
     },
-    db=InMemoryDb(),
+    db=agent_db,
+    num_history_runs=HISTORY_NUM_RUNS,
+    post_hooks=HISTORY_POST_HOOKS,
+    tool_hooks=TOOL_HOOKS,
 )
\ No newline at end of file
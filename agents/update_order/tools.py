@@ -1,161 +1,295 @@
-from ..common_tools import make_request
+import asyncio
+import logging
+from typing import Awaitable, Dict, List, Optional
+
+from ..api_cache import document_tag, order_tag
+from ..cart import CartError, OrderDraft
+from ..common_tools import (
+    ORDERS_API_BULK_DELETE,
+    ORDERS_API_BULK_DELETE_ENDPOINT,
+    ORDERS_API_MAX_FANOUT,
+    ORDERS_PREFETCH,
+    cached_get,
+    make_request,
+    orders_cache,
+    orders_prefetcher,
+    pricing_engine,
+)
+from ..http_client import OrdersApiStatusError
+from ..order_validation import cpf_digits
+from ..pricing import PricingError, corrected_price
+from ..records import CartLine, OrderItem, OrderSummary, UpdateResult, tool_error, tool_result
+
+logger = logging.getLogger(__name__)
 
 
 def set_user_new_address(session_state, street_name: str, number: int, complement: str, reference_point: str) -> None:
     """Definir o novo endereço para atualização do pedido."""
-    print("Atualizando novo endereço no estado")
-    session_state["new_user_address"] = {
-        "street_name": street_name,
-        "number": number,
-        "complement": complement,
-        "reference_point": reference_point
-    }
-
-
-def set_new_item(session_state, pizza_name: str, size: str, crust: str, quantity: int, unit_price: float) -> None:
-    """Adicionar um novo item à lista de itens para adicionar ao pedido."""
-    print("Adicionando novo item ao estado")
-    session_state["new_items"].append({
-        "name": pizza_name,
-        "size": size,
-        "crust": crust,
-        "quantity": quantity,
-        "unit_price": unit_price
-    })
-
-
-def set_item_to_remove(session_state, item_id: int) -> None:
+    logger.debug("Atualizando novo endereço no estado")
+    draft = OrderDraft.from_state(session_state)
+    draft.set_address(street_name, number, complement, reference_point)
+    draft.save(session_state)
+
+
+def set_new_item(session_state, pizza_name: str, size: str, crust: str, quantity: int, unit_price: Optional[float] = None) -> str:
+    """Adicionar um novo item à lista de itens para adicionar ao pedido. O preço unitário é sempre o do cardápio."""
+    logger.debug("Adicionando novo item ao estado")
+    if int(quantity) <= 0:
+        return tool_error("A quantidade precisa ser maior que zero.")
+
+    try:
+        item = pricing_engine.price_item({"name": pizza_name, "size": size, "crust": crust, "quantity": quantity})
+        draft = OrderDraft.from_state(session_state)
+        line = draft.add_item(item)
+    except (PricingError, CartError) as e:
+        return tool_error(str(e))
+
+    draft.save(session_state)
+    return tool_result(
+        added=CartLine.from_item(line.as_item()),
+        new_items_total=draft.additions_total,
+        price_corrected_from=corrected_price(unit_price, item),
+    )
+
+
+def set_item_to_remove(session_state, item_id: int) -> str:
     """Adicionar um item à lista de itens para remover do pedido."""
-    print("Marcando item para remoção no estado")
-    session_state["to_delete_items"].append(item_id)
+    logger.debug("Marcando item para remoção no estado")
+    draft = OrderDraft.from_state(session_state)
+    try:
+        draft.remove_item(item_id)
+    except CartError as e:
+        return tool_error(str(e))
+    draft.save(session_state)
+    return tool_result(pending_removals=draft.removals())
+
+
+def _order_list_tags(client_document: str, orders) -> List[str]:
+    tags = [document_tag(client_document)]
+    if isinstance(orders, list):
+        tags.extend(order_tag(order.get('id')) for order in orders if isinstance(order, dict))
+    return tags
+
+
+def _order_tags(order_id: int, order) -> List[str]:
+    tags = [order_tag(order_id)]
+    if isinstance(order, dict) and order.get('client_document'):
+        tags.append(document_tag(order['client_document']))
+    return tags
+
+
+def _orders_endpoint(client_document: str) -> str:
+    return f'/api/orders/filter/?client_document={client_document}'
+
+
+def _order_endpoint(order_id: int) -> str:
+    return f'/api/orders/{order_id}/'
+
+
+async def _fetch_orders(client_document: str):
+    return await cached_get(
+        _orders_endpoint(client_document), tags=lambda orders: _order_list_tags(client_document, orders)
+    )
+
+
+async def _fetch_order(order_id: int):
+    return await cached_get(_order_endpoint(order_id), tags=lambda order: _order_tags(order_id, order))
+
+
+def _prefetch_plan(client_document: str):
+    async def plan(mark) -> None:
+        mark(_orders_endpoint(client_document))
+        orders = await _fetch_orders(client_document)
+        # Com um único pedido, o próximo passo do fluxo é selecioná-lo.
+        if isinstance(orders, list) and len(orders) == 1 and isinstance(orders[0], dict):
+            order_id = orders[0].get("id")
+            mark(_order_endpoint(order_id))
+            await _fetch_order(order_id)
+
+    return plan
+
+
+async def set_user_document(session_state, document: str) -> None:
+    """Definir o documento do usuário."""
+    logger.debug("Salvando documento do cliente")
+    session_state["user_document"] = document
+    # Os pedidos do cliente começam a ser buscados enquanto o modelo decide o
+    # próximo passo; CPFs inválidos não geram requisição.
+    if ORDERS_PREFETCH and cpf_digits(document):
+        orders_prefetcher.start(session_state, document, _prefetch_plan(document))
 
 
 async def find_order_by_document(session_state, client_document: str) -> str:
     """Buscar pedidos pelo documento do cliente."""
-    print("Buscando pedidos por documento")
+    logger.debug("Buscando pedidos por documento")
     session_state["client_document"] = client_document
-    
+    orders_prefetcher.claim(session_state, _orders_endpoint(client_document))
+
     try:
-        response = await make_request('GET', f'/api/orders/filter/?client_document={client_document}')
-        
-        if not response or not isinstance(response, list) or len(response) == 0:
-            return f"❌ Nenhum pedido encontrado para o documento {client_document}."
-        
-        session_state["orders_list"] = response
-        
-        orders_text = "📋 Pedidos encontrados:\n\n"
-        for i, order in enumerate(response, 1):
-            orders_text += f"{i}. **Pedido #{order.get('id', 'N/A')}**\n"
-            orders_text += f"   • Data de entrega: {order.get('delivery_date', 'N/A')}\n"
-            orders_text += f"   • Total: R$ {order.get('total_value', 0):.2f}\n"
-            orders_text += f"   • Status: {order.get('status', 'N/A')}\n\n"
-        
-        return orders_text + "Qual pedido você gostaria de modificar? (Digite o número)"
+        response = await _fetch_orders(client_document)
         
+        orders = response if isinstance(response, list) else []
+        return tool_result(client_document=client_document, orders=[OrderSummary.from_api(order) for order in orders])
+
     except Exception as e:
-        print(f"Erro ao buscar pedidos: {str(e)}")
-        return f"❌ Erro ao buscar pedidos: {str(e)}"
+        logger.error("Erro ao buscar pedidos: %s", e)
+        return tool_error(f"Erro ao buscar pedidos: {str(e)}")
 
 
 async def find_order_by_id(session_state, order_id: int) -> str:
     """Buscar um pedido específico pelo ID."""
-    print("Buscando pedido por ID")
-    session_state["selected_order_id"] = order_id
-    
+    logger.debug("Buscando pedido por ID")
+    orders_prefetcher.claim(session_state, _order_endpoint(order_id))
+
     try:
-        response = await make_request('GET', f'/api/orders/{order_id}/')
-        
+        response = await _fetch_order(order_id)
+
         if not response:
-            return f"❌ Nenhum pedido encontrado com o ID {order_id}."
-        
-        session_state["selected_order"] = response
-        
-        return f"✅ Pedido #{order_id} selecionado com sucesso! O que você gostaria de fazer?\n1. Adicionar mais itens\n2. Alterar endereço de entrega\n3. Remover um item"
-        
+            return tool_error(f"Nenhum pedido encontrado com o ID {order_id}.")
+
+        draft = OrderDraft.from_state(session_state)
+        draft.select(response)
+        draft.save(session_state)
+        return tool_result(selected=OrderSummary.from_api(response), item_count=len(response.get("items", [])))
+
     except Exception as e:
-        print(f"Erro ao buscar pedido: {str(e)}")
-        return f"❌ Erro ao buscar pedido: {str(e)}"
+        logger.error("Erro ao buscar pedido: %s", e)
+        return tool_error(f"Erro ao buscar pedido: {str(e)}")
 
 
 def find_order_items(session_state) -> str:
     """Listar os itens do pedido selecionado com IDs reais."""
-    print("Listando itens do pedido selecionado")
-    
-    selected_order = session_state.get("selected_order")
-    if not selected_order:
-        return "❌ Nenhum pedido selecionado. Por favor, selecione um pedido primeiro."
+    logger.debug("Listando itens do pedido selecionado")
     
-    items = selected_order.get("items", [])
-    if not items:
-        return "❌ Este pedido não possui itens."
-    
-    items_text = "📋 Itens do seu pedido:\n\n"
-    for item in items:
-        items_text += f"**ID: {item['id']}** - {item['name']}\n"
-        items_text += f"   Quantidade: {item['quantity']}\n"
-        items_text += f"   Preço unitário: R$ {item['unit_price']:.2f}\n\n"
-    
-    items_text += "Por favor, informe o ID do item que deseja remover."
-    return items_text
+    draft = OrderDraft.from_state(session_state)
+    if draft.order_id is None:
+        return tool_error("Nenhum pedido selecionado. Por favor, selecione um pedido primeiro.")
+
+    return tool_result(order_id=draft.order_id, items=[OrderItem(*row) for row in draft.items.values()])
+
+
+async def _run_operation(semaphore: asyncio.Semaphore, operation: Awaitable) -> Optional[Exception]:
+    async with semaphore:
+        try:
+            await operation
+            return None
+        except Exception as e:
+            return e
+
+
+async def _remove_items(order_id: int, item_ids: List[int], semaphore: asyncio.Semaphore) -> Dict[int, Optional[Exception]]:
+    """Remover itens do pedido, em uma única requisição quando o modo em lote está ativo."""
+    if ORDERS_API_BULK_DELETE and len(item_ids) > 1:
+        endpoint = ORDERS_API_BULK_DELETE_ENDPOINT.format(order_id=order_id)
+        error = await _run_operation(semaphore, make_request('PATCH', endpoint, {"item_ids": item_ids}))
+        if error is None:
+            return {item_id: None for item_id in item_ids}
+        # Só vale remover item a item quando a API recusou a remoção em lote;
+        # se ela estiver fora do ar, as remoções individuais falhariam também.
+        if not isinstance(error, OrdersApiStatusError):
+            return {item_id: error for item_id in item_ids}
+        logger.warning("Remoção em lote falhou, removendo itens individualmente: %s", error)
+
+    errors = await asyncio.gather(*(
+        _run_operation(semaphore, make_request('DELETE', f'/api/orders/{order_id}/items/{item_id}/'))
+        for item_id in item_ids
+    ))
+    return dict(zip(item_ids, errors))
+
+
+def _finished(task: Optional[asyncio.Future]) -> bool:
+    return task is not None and task.done() and not task.cancelled()
+
+
+def _record_results(draft: OrderDraft, add_items_task, address_task, remove_items_task) -> List[UpdateResult]:
+    """Resultados das operações concluídas; só as que falharam continuam no registro."""
+    results = []
+    if _finished(add_items_task):
+        error = add_items_task.result()
+        results.append(UpdateResult("add_items", error is None, error=str(error) if error else None))
+        if error is None:
+            draft.discard("add")
+
+    if _finished(address_task):
+        error = address_task.result()
+        results.append(UpdateResult("update_address", error is None, error=str(error) if error else None))
+        if error is None:
+            draft.discard("address")
+
+    if _finished(remove_items_task):
+        removal_errors = remove_items_task.result()
+        results.extend(
+            UpdateResult("remove_item", error is None, item_id, str(error) if error else None)
+            for item_id, error in removal_errors.items()
+        )
+        draft.discard("remove", [item_id for item_id, error in removal_errors.items() if error is None])
+    return results
 
 
 async def process_order_updates(session_state) -> str:
     """Processar todas as atualizações pendentes no pedido."""
-    print("Enviando todas as atualizações para a API")
+    logger.debug("Enviando todas as atualizações para a API")
     
-    order_id = session_state.get("selected_order_id")
+    draft = OrderDraft.from_state(session_state)
+    order_id = draft.order_id
     if not order_id:
-        return "❌ Nenhum pedido selecionado. Por favor, selecione um pedido primeiro."
-    
-    results = []
+        return tool_error("Nenhum pedido selecionado. Por favor, selecione um pedido primeiro.")
     
+    # As operações são independentes entre si, então são enviadas em paralelo,
+    # limitadas a ORDERS_API_MAX_FANOUT requisições simultâneas.
+    semaphore = asyncio.Semaphore(ORDERS_API_MAX_FANOUT)
+    add_items_task = None
+    address_task = None
+    remove_items_task = None
+
     # Adicionar novos itens
-    new_items = session_state.get("new_items", [])
+    new_items = draft.additions()
     if new_items:
-        try:
-            items_data = []
-            for item in new_items:
-                items_data.append({
-                    "name": f"{item['name']} - {item['size']} - {item['crust']}",
-                    "quantity": item["quantity"],
-                    "unit_price": item["unit_price"]
-                })
-            
-            data = {"items": items_data}
-            response = await make_request('PATCH', f'/api/orders/{order_id}/add-items/', data)
-            results.append(f"✅ {len(items_data)} item(ns) adicionado(s) com sucesso!")
-            
-            session_state["new_items"] = []
-            
-        except Exception as e:
-            results.append(f"❌ Erro ao adicionar itens: {str(e)}")
-    
+        data = {
+            "items": [
+                {
+                    "name": f"{line.name} - {line.size} - {line.crust}",
+                    "quantity": line.quantity,
+                    "unit_price": line.unit_price,
+                }
+                for line in new_items
+            ]
+        }
+        add_items_task = asyncio.ensure_future(
+            _run_operation(semaphore, make_request('PATCH', f'/api/orders/{order_id}/add-items/', data))
+        )
+
     # Atualizar endereço
-    new_address = session_state.get("new_user_address", {})
+    new_address = draft.address()
     if new_address and new_address.get("street_name"):
-        try:
-            data = {"delivery_address": new_address}
-            response = await make_request('PATCH', f'/api/orders/{order_id}/update-address/', data)
-            results.append(f"✅ Endereço atualizado com sucesso!")
-            
-            session_state["new_user_address"] = {}
-            
-        except Exception as e:
-            results.append(f"❌ Erro ao atualizar endereço: {str(e)}")
-    
+        data = {"delivery_address": new_address}
+        address_task = asyncio.ensure_future(
+            _run_operation(semaphore, make_request('PATCH', f'/api/orders/{order_id}/update-address/', data))
+        )
+
     # Remover itens
-    items_to_remove = session_state.get("to_delete_items", [])
+    items_to_remove = draft.removals()
     if items_to_remove:
-        for item_id in items_to_remove:
-            try:
-                response = await make_request('DELETE', f'/api/orders/{order_id}/items/{item_id}/')
-                results.append(f"✅ Item {item_id} removido com sucesso!")
-            except Exception as e:
-                results.append(f"❌ Erro ao remover item {item_id}: {str(e)}")
-        
-        session_state["to_delete_items"] = []
-    
-    if not results:
-        return "ℹ️ Nenhuma alteração pendente para processar."
-    
-    return "\n".join(results) + "\n\n🎉 Todas as atualizações foram processadas!"
\ No newline at end of file
+        remove_items_task = asyncio.ensure_future(_remove_items(order_id, items_to_remove, semaphore))
+
+    pending = [task for task in (add_items_task, address_task, remove_items_task) if task is not None]
+    try:
+        if pending:
+            await asyncio.wait(pending)
+    except asyncio.CancelledError:
+        # Cancelada (pelo prazo do turno, por exemplo), a ferramenta não deixa
+        # requisições órfãs: o que ainda não terminou é cancelado junto.
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        raise
+    finally:
+        # As leituras em cache deste pedido e das listagens que o contêm deixam
+        # de ser válidas, e o que já foi aplicado sai do registro mesmo em caso
+        # de cancelamento, para que uma nova tentativa não o repita.
+        if pending:
+            orders_cache.invalidate(order_tag(order_id))
+        results = _record_results(draft, add_items_task, address_task, remove_items_task)
+        draft.save(session_state)
+
+    return tool_result(order_id=order_id, results=results)
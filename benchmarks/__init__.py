@@ -0,0 +1 @@
+# Arquivo init para o diretório benchmarks
\ No newline at end of file
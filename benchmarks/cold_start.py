@@ -0,0 +1,169 @@
+"""Benchmark de inicialização a frio dos agentes, nos modos ``lazy`` e ``eager``.
+
+Cada rodada abre um processo Python novo, apontado para o modelo de chat
+roteirizado e a API de pedidos simulada (os mesmos do ``benchmarks.offline``),
+que mede:
+
+- ``import_ms``: importar o roteador;
+- ``warm_up_ms``: a fase de inicialização (só no modo ``eager``);
+- ``ready_ms``: da criação do processo até estar pronto para o primeiro turno;
+- ``first_turn_ms`` e ``repeat_turn_ms``: o primeiro turno de uma conversa de
+  criação de pedido no processo recém-aberto e o mesmo turno numa segunda
+  conversa, já com tudo aquecido;
+- ``first_conversation_ms`` e ``repeat_conversation_ms``: a conversa completa.
+
+O relatório sai em JSON no stdout.
+
+Uso:
+    python -m benchmarks.cold_start --runs 5
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from typing import Dict, List
+
+from .fake_llm import FakeChatModel, conversation_turns
+from .fake_orders_api import FakeOrdersApi
+from .fixtures import build_menu_db
+from .offline import configure_environment
+
+SPAWNED_AT_ENV = "COLD_START_SPAWNED_AT"
+MEASURES = (
+    "import_ms",
+    "warm_up_ms",
+    "ready_ms",
+    "first_turn_ms",
+    "repeat_turn_ms",
+    "first_conversation_ms",
+    "repeat_conversation_ms",
+)
+
+
+async def run_child(mode: str) -> Dict:
+    """Executado no processo novo: inicializar, conversar duas vezes e medir."""
+    started = time.perf_counter()
+    from agents.orchestrator.router import router
+    from agents.startup import warm_up
+
+    import_s = time.perf_counter() - started
+    warm_up_s = 0.0
+    errors: Dict[str, str] = {}
+    if mode == "eager":
+        warm_up_started = time.perf_counter()
+        errors = (await warm_up())["errors"]
+        warm_up_s = time.perf_counter() - warm_up_started
+    ready_s = time.time() - float(os.environ[SPAWNED_AT_ENV])
+
+    conversations: List[List[float]] = []
+    for _ in range(2):
+        session_id = str(uuid.uuid4())
+        latencies = []
+        for turn in conversation_turns("orchestrator", "create_order"):
+            turn_started = time.perf_counter()
+            await router.respond(session_id, turn.message)
+            latencies.append(time.perf_counter() - turn_started)
+        conversations.append(latencies)
+    router.store.close()
+
+    first, repeat = conversations
+    return {
+        "import_ms": import_s * 1000,
+        "warm_up_ms": warm_up_s * 1000,
+        "ready_ms": ready_s * 1000,
+        "first_turn_ms": first[0] * 1000,
+        "repeat_turn_ms": repeat[0] * 1000,
+        "first_conversation_ms": sum(first) * 1000,
+        "repeat_conversation_ms": sum(repeat) * 1000,
+        "errors": errors,
+    }
+
+
+async def spawn(mode: str) -> Dict:
+    env = dict(os.environ, **{SPAWNED_AT_ENV: repr(time.time())})
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "benchmarks.cold_start", "--child", mode,
+        env=env, stdout=asyncio.subprocess.PIPE,
+    )
+    stdout, _ = await process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(f"O processo do modo {mode} terminou com código {process.returncode}")
+    return json.loads(stdout)
+
+
+def summarize(samples: List[Dict]) -> Dict:
+    summary = {
+        measure: {
+            "median": round(statistics.median(sample[measure] for sample in samples), 3),
+            "min": round(min(sample[measure] for sample in samples), 3),
+            "max": round(max(sample[measure] for sample in samples), 3),
+        }
+        for measure in MEASURES
+    }
+    summary["errors"] = sorted({phase for sample in samples for phase in sample["errors"]})
+    return summary
+
+
+async def run(args: argparse.Namespace) -> Dict:
+    llm = await FakeChatModel(latency=args.llm_latency, seed=args.seed).start()
+    orders = await FakeOrdersApi(latency=args.api_latency, seed=args.seed).start()
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            menu_path = args.menu_db or build_menu_db(os.path.join(workdir, "menu.db"), args.flavours)
+            configure_environment(menu_path, orders.url, llm.base_url)
+            # Os modos são intercalados para que variações da máquina afetem os dois igualmente.
+            samples: Dict[str, List[Dict]] = {mode: [] for mode in args.modes}
+            for _ in range(args.runs):
+                for mode in args.modes:
+                    samples[mode].append(await spawn(mode))
+    finally:
+        await llm.close()
+        await orders.close()
+
+    return {
+        "config": {
+            "runs": args.runs,
+            "flavours": args.flavours if not args.menu_db else None,
+            "menu_db": args.menu_db,
+            "llm_latency_s": args.llm_latency,
+            "api_latency_s": args.api_latency,
+        },
+        "modes": {mode: summarize(mode_samples) for mode, mode_samples in samples.items()},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="Processos abertos por modo")
+    parser.add_argument("--modes", nargs="+", choices=("lazy", "eager"), default=["lazy", "eager"])
+    parser.add_argument("--flavours", type=int, default=50, help="Sabores no cardápio gerado")
+    parser.add_argument("--menu-db", help="Usar um cardápio existente em vez de gerar um")
+    parser.add_argument("--llm-latency", type=float, default=0.01)
+    parser.add_argument("--api-latency", type=float, default=0.005)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--child", choices=("lazy", "eager"), help=argparse.SUPPRESS)
+    parser.add_argument("--output", help="Gravar o relatório em um arquivo além do stdout")
+    args = parser.parse_args()
+
+    if args.child:
+        # Os logs dos agentes não podem se misturar ao JSON do stdout.
+        with contextlib.redirect_stdout(sys.stderr):
+            result = asyncio.run(run_child(args.child))
+        print(json.dumps(result))
+        return
+
+    report = json.dumps(asyncio.run(run(args)), indent=2, ensure_ascii=False)
+    print(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            output.write(report + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""Modelo de chat determinístico que imita a API de chat completions da OpenAI.
+
+Cada fluxo (orquestrador, criação e atualização de pedido) tem um roteiro que
+associa a mensagem do cliente às chamadas de ferramentas que o modelo faria e
+à resposta final. O fluxo é identificado pelas ferramentas enviadas na
+requisição, e a rodada de ferramentas pelo número de respostas do assistente
+desde a última mensagem do cliente. Mensagens fora do roteiro recebem uma
+resposta genérica sem ferramentas.
+
+Os agentes usam este modelo quando ``OPENAI_BASE_URL`` aponta para ele.
+"""
+import asyncio
+import itertools
+import json
+import random
+import time
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from server import BadRequest, read_request, write_response, write_stream_head
+
+MAX_REQUEST_BYTES = 16 * 1024 * 1024
+
+
+class ToolCall(NamedTuple):
+    name: str
+    arguments: Dict
+
+
+class ScriptTurn(NamedTuple):
+    message: str
+    rounds: List[List[ToolCall]]
+    reply: str
+
+
+CREATE_DOCUMENT = "111.444.777-35"
+UPDATE_DOCUMENT = "123.456.789-09"
+
+SCRIPTS: Dict[str, List[ScriptTurn]] = {
+    "orchestrator": [
+        ScriptTurn("Boa noite!", [], "Boa noite! Bem-vindo à Beauty Pizza. Você quer fazer um novo pedido ou alterar um pedido existente?"),
+    ],
+    "create_order": [
+        ScriptTurn("Quero fazer um pedido", [], "Oba! Eu sou a Bea. Qual é o seu nome?"),
+        ScriptTurn(
+            "Meu nome é Ana",
+            [[ToolCall("set_user_name", {"name": "Ana"})]],
+            "Prazer, Ana! Você já sabe o que quer ou quer ver o cardápio?",
+        ),
+        ScriptTurn(
+            "Quero ver o cardápio",
+            [[ToolCall("get_pizza_menu", {})]],
+            "Aqui está o nosso cardápio! Qual sabor você escolhe?",
+        ),
+        ScriptTurn(
+            "Uma sabor 001 grande com borda de cheddar",
+            [
+                [ToolCall("get_pizza_prices", {"pizza_flavour": "sabor 001"})],
+                [ToolCall("set_item", {
+                    "pizza_name": "Sabor 001", "size": "Grande", "crust": "Recheada com Cheddar", "quantity": 1,
+                })],
+            ],
+            "Anotado! Quer adicionar mais alguma coisa?",
+        ),
+        ScriptTurn(
+            "E duas sabor 002 médias tradicionais",
+            [[ToolCall("set_item", {
+                "pizza_name": "Sabor 002", "size": "Média", "crust": "Tradicional", "quantity": 2,
+            })]],
+            "Perfeito! Mais alguma coisa?",
+        ),
+        ScriptTurn(
+            "Só isso, quanto ficou?",
+            [[ToolCall("get_cart_total", {})]],
+            "Qual é o endereço de entrega?",
+        ),
+        ScriptTurn(
+            "Rua das Flores, 123, apto 4, perto da praça",
+            [[ToolCall("set_user_address", {
+                "street_name": "Rua das Flores", "number": 123, "reference_point": "perto da praça", "complement": "apto 4",
+            })]],
+            "Endereço salvo! Qual é o seu CPF para a nota fiscal?",
+        ),
+        ScriptTurn(
+            CREATE_DOCUMENT,
+            [
+                [ToolCall("set_user_document", {"document": CREATE_DOCUMENT})],
+                [ToolCall("send_data_to_api", {})],
+            ],
+            "Pedido confirmado! Obrigada, Ana!",
+        ),
+    ],
+    "update_order": [
+        ScriptTurn("Quero alterar meu pedido", [], "Claro! Qual é o CPF usado no pedido?"),
+        ScriptTurn(
+            f"Meu CPF é {UPDATE_DOCUMENT}",
+            [
+                [ToolCall("set_user_document", {"document": UPDATE_DOCUMENT})],
+                [ToolCall("find_order_by_document", {"client_document": UPDATE_DOCUMENT})],
+            ],
+            "Encontrei seus pedidos. Qual você quer alterar?",
+        ),
+        ScriptTurn(
+            "O pedido 1",
+            [[ToolCall("find_order_by_id", {"order_id": 1})], [ToolCall("find_order_items", {})]],
+            "Pedido selecionado. O que você quer mudar?",
+        ),
+        ScriptTurn(
+            "Remova o item 2 e mude o endereço para Rua Nova, 45",
+            [[
+                ToolCall("set_item_to_remove", {"item_id": 2}),
+                ToolCall("set_user_new_address", {
+                    "street_name": "Rua Nova", "number": 45, "complement": "", "reference_point": "",
+                }),
+            ]],
+            "Posso confirmar as alterações?",
+        ),
+        ScriptTurn("Pode confirmar", [[ToolCall("process_order_updates", {})]], "Alterações enviadas!"),
+    ],
+}
+
+# Ferramenta que identifica cada fluxo nas requisições recebidas.
+FLOW_MARKERS = (
+    ("create_order", "send_data_to_api"),
+    ("update_order", "process_order_updates"),
+    ("orchestrator", "call_create_order_agent"),
+)
+
+FALLBACK_REPLY = "Desculpe, não entendi. Pode repetir?"
+
+
+def conversation_turns(*flows: str) -> List[ScriptTurn]:
+    """Turnos, em ordem, para percorrer os fluxos informados do roteiro."""
+    return [turn for flow in flows for turn in SCRIPTS[flow]]
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class FakeChatModel:
+    """Servidor HTTP em processo que responde ``POST /v1/chat/completions`` seguindo os roteiros.
+
+    Cada resposta espera ``latency`` segundos antes do primeiro trecho; em
+    modo streaming o texto é dividido em ``chunks`` trechos, espaçados por
+    ``token_interval`` segundos.
+    """
+
+    def __init__(self, latency: float = 0.05, token_interval: float = 0.0, chunks: int = 8, seed: int = 42):
+        self.latency = latency
+        self.token_interval = token_interval
+        self.chunks = chunks
+        self.calls: Counter = Counter()
+        self._rng = random.Random(seed)
+        self._ids = itertools.count(1)
+        self._scripts = {flow: {turn.message: turn for turn in turns} for flow, turns in SCRIPTS.items()}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Dict[asyncio.StreamWriter, asyncio.Task] = {}
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _flow_for(self, tools: List[Dict]) -> str:
+        names = {tool.get("function", {}).get("name") for tool in tools or []}
+        for flow, marker in FLOW_MARKERS:
+            if marker in names:
+                return flow
+        return "unknown"
+
+    def next_step(self, request: Dict) -> Tuple[str, Optional[str], List[ToolCall]]:
+        """Decidir a próxima resposta do modelo: (fluxo, texto, chamadas de ferramentas)."""
+        flow = self._flow_for(request.get("tools"))
+        messages = request.get("messages", [])
+        last_user = max((index for index, message in enumerate(messages) if message.get("role") == "user"), default=-1)
+        user_text = messages[last_user].get("content") if last_user >= 0 else ""
+        if isinstance(user_text, list):
+            user_text = " ".join(part.get("text", "") for part in user_text if isinstance(part, dict))
+        rounds_done = sum(
+            1 for message in messages[last_user + 1:] if message.get("role") == "assistant" and message.get("tool_calls")
+        )
+
+        turn = self._scripts.get(flow, {}).get((user_text or "").strip())
+        if turn is None:
+            return flow, FALLBACK_REPLY, []
+        if rounds_done < len(turn.rounds):
+            return flow, None, turn.rounds[rounds_done]
+        return flow, turn.reply, []
+
+    def _completion(self, request: Dict, content: Optional[str], tool_calls: List[ToolCall]) -> Dict:
+        calls = [
+            {
+                "id": f"call_{next(self._ids)}",
+                "type": "function",
+                "function": {"name": call.name, "arguments": json.dumps(call.arguments, ensure_ascii=False)},
+            }
+            for call in tool_calls
+        ]
+        prompt_tokens = _estimate_tokens(json.dumps(request.get("messages", []), ensure_ascii=False))
+        completion_tokens = _estimate_tokens(content or json.dumps(calls))
+        message = {"role": "assistant", "content": content}
+        if calls:
+            message["tool_calls"] = calls
+        return {
+            "id": f"chatcmpl-{next(self._ids)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fake"),
+            "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if calls else "stop"}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    async def _stream(self, writer: asyncio.StreamWriter, completion: Dict) -> None:
+        def send(payload) -> None:
+            data = f"data: {payload if isinstance(payload, str) else json.dumps(payload, ensure_ascii=False)}\n\n"
+            encoded = data.encode("utf-8")
+            writer.write(f"{len(encoded):X}\r\n".encode("latin-1") + encoded + b"\r\n")
+
+        choice = completion["choices"][0]
+        base = {key: completion[key] for key in ("id", "created", "model")}
+        base["object"] = "chat.completion.chunk"
+
+        def chunk(delta: Dict, finish_reason: Optional[str] = None) -> Dict:
+            return dict(base, choices=[{"index": 0, "delta": delta, "finish_reason": finish_reason}])
+
+        write_stream_head(writer)
+        content = choice["message"].get("content") or ""
+        if content:
+            step = max(1, len(content) // self.chunks)
+            for start in range(0, len(content), step):
+                send(chunk({"role": "assistant", "content": content[start:start + step]}))
+                await writer.drain()
+                if self.token_interval:
+                    await asyncio.sleep(self.token_interval)
+        for index, call in enumerate(choice["message"].get("tool_calls", [])):
+            send(chunk({"role": "assistant", "tool_calls": [dict(call, index=index)]}))
+        send(chunk({}, choice["finish_reason"]))
+        send(dict(base, choices=[], usage=completion["usage"]))
+        send("[DONE]")
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._connections[writer] = asyncio.current_task()
+        try:
+            while True:
+                try:
+                    request = await read_request(reader, max_body_bytes=MAX_REQUEST_BYTES)
+                except BadRequest as e:
+                    write_response(writer, e.status, {"error": {"message": str(e)}}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, path, _, body = request
+                if method != "POST" or not path.rstrip("/").endswith("/chat/completions"):
+                    write_response(writer, 404, {"error": {"message": f"{method} {path} não suportado"}})
+                    await writer.drain()
+                    continue
+
+                payload = json.loads(body or b"{}")
+                flow, content, tool_calls = self.next_step(payload)
+                self.calls[flow] += 1
+                await asyncio.sleep(self.latency * self._rng.uniform(0.75, 1.25))
+                completion = self._completion(payload, content, tool_calls)
+                if payload.get("stream"):
+                    await self._stream(writer, completion)
+                else:
+                    write_response(writer, 200, completion)
+                    await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.pop(writer, None)
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> "FakeChatModel":
+        self._server = await asyncio.start_server(self.handle_connection, host, port)
+        return self
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            # Conexões keep-alive dos clientes seguram os handlers abertos.
+            handlers = list(self._connections.values())
+            for writer in list(self._connections):
+                writer.close()
+            await asyncio.gather(*handlers, return_exceptions=True)
+            await self._server.wait_closed()
+
+    def stats(self) -> Dict:
+        return {"calls": dict(self.calls)}
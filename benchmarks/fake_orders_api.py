@@ -0,0 +1,176 @@
+"""API de pedidos local para os benchmarks, com latência e falhas configuráveis.
+
+Implementa, em memória, os endpoints ``/api/orders/`` usados pelos agentes.
+"""
+import asyncio
+import json
+import random
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from server import BadRequest, read_request, write_response
+
+ORDER_PATH = re.compile(r"^/api/orders/(\d+)/$")
+ORDER_ACTION_PATH = re.compile(r"^/api/orders/(\d+)/(add-items|update-address|remove-items)/$")
+ORDER_ITEM_PATH = re.compile(r"^/api/orders/(\d+)/items/(\d+)/$")
+NUMERIC_SEGMENT = re.compile(r"/\d+/")
+
+
+class FakeOrdersApi:
+    """Servidor HTTP em processo que imita a API de pedidos.
+
+    Cada requisição espera ``latency`` segundos (com variação de ``jitter``) e
+    falha com ``500`` na proporção ``error_rate``. Um ``POST /api/orders/`` com
+    ``Idempotency-Key`` já vista devolve o pedido criado antes, sem duplicá-lo.
+    """
+
+    def __init__(self, latency: float = 0.02, jitter: float = 0.25, error_rate: float = 0.0, seed: int = 42):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests: Counter = Counter()
+        self.errors: Counter = Counter()
+        self._rng = random.Random(seed)
+        self._orders: Dict[int, Dict] = {}
+        self._idempotent: Dict[str, int] = {}
+        self.replays = 0
+        self._next_order_id = 1
+        self._next_item_id = 1
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Dict[asyncio.StreamWriter, asyncio.Task] = {}
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    def seed_order(self, client_document: str, items: List[Dict], client_name: str = "Cliente") -> Dict:
+        """Criar diretamente um pedido existente para os fluxos de atualização."""
+        return self._create_order({
+            "client_name": client_name,
+            "client_document": client_document,
+            "delivery_date": "2025-01-01",
+            "delivery_address": {"street_name": "Rua Teste", "number": 1, "complement": "", "reference_point": ""},
+            "items": items,
+        })
+
+    def _create_order(self, data: Dict) -> Dict:
+        order = dict(data, id=self._next_order_id, status="pending", items=[])
+        self._next_order_id += 1
+        self._orders[order["id"]] = order
+        self._add_items(order, data.get("items", []))
+        return order
+
+    def _add_items(self, order: Dict, items: List[Dict]) -> None:
+        for item in items:
+            order["items"].append(dict(item, id=self._next_item_id))
+            self._next_item_id += 1
+        order["total_value"] = round(sum(item["quantity"] * item["unit_price"] for item in order["items"]), 2)
+
+    def _remove_items(self, order: Dict, item_ids: List[int]) -> None:
+        order["items"] = [item for item in order["items"] if item["id"] not in item_ids]
+        self._add_items(order, [])
+
+    def route(self, method: str, path: str, body: bytes, headers: Optional[Dict[str, str]] = None) -> Tuple[int, object]:
+        url = urlsplit(path)
+        data = json.loads(body) if body else {}
+
+        if url.path == "/api/orders/" and method == "POST":
+            key = (headers or {}).get("idempotency-key")
+            if key and key in self._idempotent:
+                self.replays += 1
+                return 201, self._orders[self._idempotent[key]]
+            order = self._create_order(data)
+            if key:
+                self._idempotent[key] = order["id"]
+            return 201, order
+
+        if url.path == "/api/orders/filter/" and method == "GET":
+            document = parse_qs(url.query).get("client_document", [""])[0]
+            digits = re.sub(r"\D", "", document)
+            return 200, [
+                order for order in self._orders.values()
+                if re.sub(r"\D", "", order["client_document"]) == digits
+            ]
+
+        match = ORDER_PATH.match(url.path)
+        if match and method == "GET":
+            order = self._orders.get(int(match.group(1)))
+            return (200, order) if order else (404, {"detail": "Not found."})
+
+        match = ORDER_ACTION_PATH.match(url.path)
+        if match and method == "PATCH":
+            order = self._orders.get(int(match.group(1)))
+            if order is None:
+                return 404, {"detail": "Not found."}
+            action = match.group(2)
+            if action == "add-items":
+                self._add_items(order, data.get("items", []))
+            elif action == "update-address":
+                order["delivery_address"] = data
+            else:
+                self._remove_items(order, data.get("item_ids", []))
+            return 200, order
+
+        match = ORDER_ITEM_PATH.match(url.path)
+        if match and method == "DELETE":
+            order = self._orders.get(int(match.group(1)))
+            if order is None:
+                return 404, {"detail": "Not found."}
+            self._remove_items(order, [int(match.group(2))])
+            return 200, order
+
+        return 404, {"detail": "Not found."}
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._connections[writer] = asyncio.current_task()
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except BadRequest as e:
+                    write_response(writer, e.status, {"detail": str(e)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                endpoint = f"{method} {NUMERIC_SEGMENT.sub('/{id}/', urlsplit(path).path)}"
+                self.requests[endpoint] += 1
+
+                await asyncio.sleep(max(0.0, self.latency * (1 + self._rng.uniform(-self.jitter, self.jitter))))
+                if self._rng.random() < self.error_rate:
+                    self.errors[endpoint] += 1
+                    status, payload = 500, {"detail": "Erro simulado"}
+                else:
+                    status, payload = self.route(method, path, body, headers)
+                write_response(writer, status, payload)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.pop(writer, None)
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> "FakeOrdersApi":
+        self._server = await asyncio.start_server(self.handle_connection, host, port)
+        return self
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            # Conexões keep-alive dos clientes seguram os handlers abertos.
+            handlers = list(self._connections.values())
+            for writer in list(self._connections):
+                writer.close()
+            await asyncio.gather(*handlers, return_exceptions=True)
+            await self._server.wait_closed()
+
+    def stats(self) -> Dict:
+        return {
+            "requests": dict(self.requests),
+            "errors": dict(self.errors),
+            "orders": len(self._orders),
+            "idempotent_replays": self.replays,
+        }
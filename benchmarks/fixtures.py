@@ -0,0 +1,53 @@
+"""Cardápio SQLite de teste, no mesmo esquema do banco gerado pela API de pedidos."""
+import sqlite3
+
+from .menu_formats import CRUSTS, SIZES
+
+
+def build_menu_db(path: str, flavours: int) -> str:
+    """Criar (ou recriar) em ``path`` um cardápio com ``flavours`` sabores em todos os tamanhos e bordas."""
+    connection = sqlite3.connect(path)
+    try:
+        connection.executescript(
+            """
+            DROP TABLE IF EXISTS precos;
+            DROP TABLE IF EXISTS pizzas;
+            DROP TABLE IF EXISTS tamanhos;
+            DROP TABLE IF EXISTS bordas;
+            CREATE TABLE pizzas (id INTEGER PRIMARY KEY, sabor TEXT NOT NULL);
+            CREATE TABLE tamanhos (id INTEGER PRIMARY KEY, tamanho TEXT NOT NULL);
+            CREATE TABLE bordas (id INTEGER PRIMARY KEY, tipo TEXT NOT NULL);
+            CREATE TABLE precos (
+                id INTEGER PRIMARY KEY,
+                pizza_id INTEGER NOT NULL REFERENCES pizzas (id),
+                tamanho_id INTEGER NOT NULL REFERENCES tamanhos (id),
+                borda_id INTEGER NOT NULL REFERENCES bordas (id),
+                preco REAL NOT NULL
+            );
+            """
+        )
+        connection.executemany(
+            "INSERT INTO pizzas (id, sabor) VALUES (?, ?)",
+            [(index + 1, f"Sabor {index:03d}") for index in range(flavours)],
+        )
+        connection.executemany(
+            "INSERT INTO tamanhos (id, tamanho) VALUES (?, ?)",
+            [(index + 1, size) for index, (size, _) in enumerate(SIZES)],
+        )
+        connection.executemany(
+            "INSERT INTO bordas (id, tipo) VALUES (?, ?)",
+            [(index + 1, crust) for index, (crust, _) in enumerate(CRUSTS)],
+        )
+        connection.executemany(
+            "INSERT INTO precos (pizza_id, tamanho_id, borda_id, preco) VALUES (?, ?, ?, ?)",
+            [
+                (flavour + 1, size_id + 1, crust_id + 1, base + extra + flavour % 5)
+                for flavour in range(flavours)
+                for size_id, (_, base) in enumerate(SIZES)
+                for crust_id, (_, extra) in enumerate(CRUSTS)
+            ],
+        )
+        connection.commit()
+    finally:
+        connection.close()
+    return path
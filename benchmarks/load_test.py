@@ -0,0 +1,217 @@
+"""Gerador de carga para o servidor de conversas.
+
+Reproduz conversas roteirizadas contra o ``ChatServer`` usando um LLM simulado
+(sem chamadas à OpenAI nem à API de pedidos) e reporta a latência por turno
+(p50/p99) e a vazão em conversas por segundo. Com ``--stream`` usa o endpoint
+SSE e reporta também o tempo até o primeiro trecho da resposta.
+
+Uso:
+    python -m benchmarks.load_test --conversations 200 --concurrency 50
+    python -m benchmarks.load_test --stream --llm-latency 0.5
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from typing import Dict, List, Tuple
+
+from agents.conversation import ConversationManager
+from agents.streaming import current_sink
+from server import ChatServer
+
+SCRIPTS: Dict[str, List[str]] = {
+    "create_order": [
+        "Oi, quero pedir uma pizza",
+        "Meu nome é Ana",
+        "Quero ver o cardápio",
+        "Uma calabresa grande com borda recheada",
+        "Só isso",
+        "Rua das Flores, 123, apto 4, perto da praça",
+        "123.456.789-09",
+    ],
+    "update_order": [
+        "Olá, quero alterar meu pedido",
+        "Meu CPF é 123.456.789-09",
+        "O pedido 1",
+        "Quero remover um item",
+        "O item 2",
+        "Não, só isso",
+    ],
+}
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def build_stub_responder(mean_latency: float, seed: int, chunks: int = 8):
+    """Responder que simula a latência de um LLM sem chamar nenhum modelo.
+
+    Em modo streaming, a resposta é entregue em ``chunks`` trechos espaçados
+    ao longo da latência simulada, como faria um modelo gerando tokens.
+    """
+    rng = random.Random(seed)
+
+    async def responder(conversation_id: str, message: str) -> str:
+        latency = rng.lognormvariate(0, 0.35) * mean_latency
+        reply = f"[stub] resposta para: {message}"
+        sink = current_sink()
+        if sink is None:
+            await asyncio.sleep(latency)
+            return reply
+
+        step = max(1, len(reply) // chunks)
+        for start in range(0, len(reply), step):
+            await asyncio.sleep(latency / chunks)
+            sink.push(reply[start:start + step])
+        return reply
+
+    return responder
+
+
+async def post_json(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, path: str, payload: Dict) -> Tuple[int, Dict]:
+    """Enviar um POST em uma conexão keep-alive já aberta e ler a resposta JSON."""
+    body = json.dumps(payload).encode("utf-8")
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: bench\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def post_stream(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, path: str, payload: Dict, started: float) -> Tuple[int, Dict, float]:
+    """Enviar um POST para o endpoint SSE e ler os eventos até o fim, medindo o primeiro trecho."""
+    body = json.dumps(payload).encode("utf-8")
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: bench\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get("transfer-encoding") != "chunked":
+        return status, json.loads(await reader.readexactly(int(headers.get("content-length", "0")))), 0.0
+
+    first_chunk_at = 0.0
+    done: Dict = {}
+    while True:
+        size = int((await reader.readline()).strip(), 16)
+        if size == 0:
+            await reader.readline()
+            break
+        event = (await reader.readexactly(size)).decode("utf-8")
+        await reader.readline()
+        if not first_chunk_at:
+            first_chunk_at = time.perf_counter() - started
+        if event.startswith("event: done"):
+            done = json.loads(event.split("data: ", 1)[1])
+    return status, done, first_chunk_at
+
+
+async def run_conversation(host: str, port: int, script: List[str], stats: Dict[str, List], stream: bool) -> None:
+    # Cada conversa simula um cliente com a própria conexão keep-alive.
+    reader, writer = await asyncio.open_connection(host, port)
+    session_id = None
+    try:
+        for message in script:
+            started = time.perf_counter()
+            request = {"session_id": session_id, "message": message}
+            if stream:
+                status, payload, first_chunk = await post_stream(reader, writer, "/chat/stream", request, started)
+                stats["first_chunk"].append(first_chunk)
+            else:
+                status, payload = await post_json(reader, writer, "/chat", request)
+            stats["latency"].append(time.perf_counter() - started)
+            if status != 200:
+                stats["errors"].append(status)
+                return
+            session_id = payload["session_id"]
+    finally:
+        writer.close()
+
+
+async def run(args: argparse.Namespace) -> Dict:
+    manager = ConversationManager(
+        responder=build_stub_responder(args.llm_latency, args.seed),
+        max_concurrent_turns=args.max_concurrent_turns,
+    )
+    server = await ChatServer(manager).start(args.host, args.port)
+
+    stats: Dict[str, List] = {"latency": [], "first_chunk": [], "errors": []}
+    latencies = stats["latency"]
+    scripts = list(SCRIPTS.values())
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def worker(index: int) -> None:
+        async with semaphore:
+            await run_conversation(args.host, args.port, scripts[index % len(scripts)], stats, args.stream)
+
+    async with server:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(args.conversations)))
+        elapsed = time.perf_counter() - started
+
+    report = {
+        "conversations": args.conversations,
+        "concurrency": args.concurrency,
+        "stream": args.stream,
+        "turns": len(latencies),
+        "errors": len(stats["errors"]),
+        "elapsed_s": round(elapsed, 3),
+        "conversations_per_s": round(args.conversations / elapsed, 2),
+        "turn_latency_ms": {
+            "p50": round(percentile(latencies, 0.50) * 1000, 2),
+            "p99": round(percentile(latencies, 0.99) * 1000, 2),
+            "mean": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+        },
+    }
+    if args.stream:
+        report["time_to_first_chunk_ms"] = {
+            "p50": round(percentile(stats["first_chunk"], 0.50) * 1000, 2),
+            "p99": round(percentile(stats["first_chunk"], 0.99) * 1000, 2),
+        }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Latência média simulada do LLM, em segundos")
+    parser.add_argument("--max-concurrent-turns", type=int, default=64)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--stream", action="store_true", help="Usar POST /chat/stream e medir o tempo até o primeiro trecho")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
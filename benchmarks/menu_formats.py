@@ -0,0 +1,78 @@
+"""Compara o tamanho, em tokens, de cada formato de saída de ``get_pizza_menu``.
+
+Usa um cardápio sintético do tamanho informado. A contagem de tokens usa o
+``tiktoken`` quando está instalado e, caso contrário, a aproximação de 4
+caracteres por token.
+
+Uso:
+    python -m benchmarks.menu_formats --flavours 30
+"""
+import argparse
+import json
+import time
+from typing import Callable, Dict, List, Tuple
+
+from agents.menu_catalog import MENU_FORMATS, MenuCatalog
+
+SIZES = (("Pequena", 30.0), ("Média", 40.0), ("Grande", 50.0))
+CRUSTS = (("Tradicional", 0.0), ("Recheada com Cheddar", 8.0), ("Recheada com Catupiry", 10.0))
+
+
+def synthetic_menu(flavours: int) -> List[Tuple[str, str, str, float]]:
+    return [
+        (f"Sabor {index:03d}", size, crust, base + extra + index % 5)
+        for index in range(flavours)
+        for size, base in SIZES
+        for crust, extra in CRUSTS
+    ]
+
+
+def token_counter() -> Tuple[str, Callable[[str], int]]:
+    try:
+        import tiktoken
+
+        encoding = tiktoken.encoding_for_model("gpt-4o-mini")
+        return "tiktoken", lambda text: len(encoding.encode(text))
+    except Exception:
+        return "chars/4", lambda text: len(text) // 4
+
+
+def run(flavours: int) -> Dict:
+    catalog = MenuCatalog(lambda: synthetic_menu(flavours))
+    started = time.perf_counter()
+    catalog.refresh()
+    load_ms = (time.perf_counter() - started) * 1000
+
+    method, count_tokens = token_counter()
+    formats = {}
+    for menu_format in MENU_FORMATS:
+        started = time.perf_counter()
+        payload = str(catalog.view(menu_format))
+        formats[menu_format] = {
+            "chars": len(payload),
+            "tokens": count_tokens(payload),
+            "render_us": round((time.perf_counter() - started) * 1_000_000, 1),
+        }
+
+    baseline = formats["full"]["tokens"] or 1
+    for result in formats.values():
+        result["tokens_vs_full"] = round(result["tokens"] / baseline, 3)
+
+    return {
+        "flavours": flavours,
+        "rows": flavours * len(SIZES) * len(CRUSTS),
+        "token_counter": method,
+        "load_ms": round(load_ms, 2),
+        "formats": formats,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--flavours", type=int, default=30)
+    args = parser.parse_args()
+    print(json.dumps(run(args.flavours), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Compara o tempo de carga do cardápio pelo DuckDB e pelo snapshot pré-compilado.
+
+Gera um cardápio SQLite com o número de sabores pedido, publica o snapshot com
+o comando de ingestão e, em cada rodada, carrega o cardápio do zero pelos dois
+caminhos:
+
+- ``duckdb``: abrir a conexão somente leitura, executar a consulta do cardápio
+  e montar o ``MenuCatalog``;
+- ``snapshot``: mapear o arquivo, ler as linhas e montar o ``MenuCatalog``.
+
+Para cada caminho são reportados o tempo de leitura (``load``) e o total até o
+catálogo pronto (``ready``). Cada caminho roda também uma vez em um processo
+novo (``cold_ms``), que inclui a importação dos módulos necessários.
+
+Uso:
+    python -m benchmarks.menu_load --flavours 500 --runs 20
+    python -m benchmarks.menu_load --duckdb-menu cardapio.duckdb --flavours 50
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from agents.menu_catalog import MenuCatalog
+
+from .fixtures import build_menu_db
+
+# Executado em um processo novo: importar, carregar e montar o catálogo.
+COLD_SCRIPT = """
+import sys, time
+started = time.perf_counter()
+from agents.menu_catalog import MenuCatalog
+path, kind = sys.argv[1], sys.argv[2]
+if kind == "snapshot":
+    from agents.menu_snapshot import load_snapshot
+    loader = lambda: load_snapshot(path)
+else:
+    from agents.catalog_db import MENU_COLUMNS, MENU_QUERY, CatalogDatabase
+    database = CatalogDatabase(path)
+    database.prepare("menu", MENU_QUERY, MENU_COLUMNS)
+    loader = lambda: list(zip(*database.query_columns("menu")))
+MenuCatalog(loader).refresh()
+print((time.perf_counter() - started) * 1000)
+"""
+
+
+def _duckdb_loader(path: str) -> Callable[[], List]:
+    from agents.catalog_db import MENU_COLUMNS, MENU_QUERY, CatalogDatabase
+
+    def load() -> List:
+        database = CatalogDatabase(path)
+        try:
+            database.prepare("menu", MENU_QUERY, MENU_COLUMNS)
+            return list(zip(*database.query_columns("menu")))
+        finally:
+            database.close()
+
+    return load
+
+
+def _snapshot_loader(path: str) -> Callable:
+    from agents.menu_snapshot import load_snapshot
+
+    return lambda: load_snapshot(path)
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    return {
+        "median_ms": round(statistics.median(samples) * 1000, 3),
+        "min_ms": round(min(samples) * 1000, 3),
+        "max_ms": round(max(samples) * 1000, 3),
+    }
+
+
+def measure(loader: Callable, runs: int) -> Dict:
+    loads: List[float] = []
+    ready: List[float] = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        data = loader()
+        loaded = time.perf_counter()
+        catalog = MenuCatalog(lambda: data)
+        catalog.refresh()
+        loads.append(loaded - started)
+        ready.append(time.perf_counter() - started)
+    return {"load": _summary(loads), "ready": _summary(ready), "flavours": len(catalog.flavours)}
+
+
+def cold(path: str, kind: str) -> float:
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [os.getcwd(), os.getenv("PYTHONPATH")])))
+    output = subprocess.run(
+        [sys.executable, "-c", COLD_SCRIPT, path, kind],
+        env=environment, check=True, capture_output=True, text=True,
+    ).stdout
+    return round(float(output.strip().splitlines()[-1]), 3)
+
+
+def run(args: argparse.Namespace) -> Dict:
+    from agents.menu_snapshot import publish_snapshot, read_menu
+
+    with tempfile.TemporaryDirectory() as workdir:
+        sqlite_path = build_menu_db(os.path.join(workdir, "menu.db"), args.flavours)
+        snapshot_path = os.path.join(workdir, "menu.snapshot")
+        started = time.perf_counter()
+        snapshot_bytes = publish_snapshot(read_menu(sqlite_path), snapshot_path)
+        ingest_s = time.perf_counter() - started
+
+        duckdb_path = args.duckdb_menu or sqlite_path
+        paths = {
+            "duckdb": (duckdb_path, _duckdb_loader(duckdb_path)),
+            "snapshot": (snapshot_path, _snapshot_loader(snapshot_path)),
+        }
+        results: Dict[str, Dict] = {}
+        for kind, (path, loader) in paths.items():
+            try:
+                results[kind] = measure(loader, args.runs)
+                results[kind]["cold_ms"] = cold(path, kind)
+            except Exception as exc:
+                results[kind] = {"error": f"{type(exc).__name__}: {exc}"}
+
+    return {
+        "config": {"flavours": args.flavours, "runs": args.runs, "duckdb_menu": args.duckdb_menu},
+        "ingest_ms": round(ingest_s * 1000, 3),
+        "snapshot_bytes": snapshot_bytes,
+        "paths": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--flavours", type=int, default=200, help="Sabores no cardápio gerado")
+    parser.add_argument("--runs", type=int, default=20, help="Cargas medidas por caminho")
+    parser.add_argument("--duckdb-menu", help="Cardápio lido pelo caminho DuckDB (padrão: o SQLite gerado)")
+    parser.add_argument("--output", help="Gravar o relatório em um arquivo além do stdout")
+    args = parser.parse_args()
+
+    report = json.dumps(run(args), indent=2, ensure_ascii=False)
+    print(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            output.write(report + "\n")
+
+
+if __name__ == "__main__":
+    main()
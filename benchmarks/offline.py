@@ -0,0 +1,343 @@
+"""Benchmark offline dos agentes, sem OpenAI nem API de pedidos reais.
+
+Sobe, no mesmo processo, um modelo de chat roteirizado (``fake_llm``) e uma
+API de pedidos simulada (``fake_orders_api``), gera um cardápio SQLite com o
+número de sabores pedido e aponta os agentes para eles pelas variáveis de
+ambiente. Em seguida mede:
+
+- ``tools``: latência e alocações de cada ferramenta chamada diretamente;
+- ``turns``: latência de ponta a ponta por turno e vazão, percorrendo os
+  fluxos de criação e atualização de pedido pelo roteador;
+- ``tool_calls``: latência das ferramentas chamadas pelos agentes durante os turnos.
+
+As alocações são medidas com ``tracemalloc`` em passadas separadas, para não
+distorcer as latências, e incluem o que a API simulada aloca no mesmo processo.
+O relatório sai em JSON no stdout; os logs dos agentes vão para o stderr.
+
+Uso:
+    python -m benchmarks.offline --flavours 200 --conversations 40 --concurrency 8
+    python -m benchmarks.offline --stream --error-rate 0.05 --output resultado.json
+"""
+import argparse
+import asyncio
+import contextlib
+import inspect
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, NamedTuple
+
+from .fake_llm import CREATE_DOCUMENT, UPDATE_DOCUMENT, FakeChatModel, ScriptTurn, conversation_turns
+from .fake_orders_api import FakeOrdersApi
+from .fixtures import build_menu_db
+from .load_test import percentile
+
+CONVERSATIONS = {
+    "create_order": conversation_turns("orchestrator", "create_order"),
+    "update_order": conversation_turns("update_order"),
+}
+
+
+class ToolCase(NamedTuple):
+    name: str
+    make_state: Callable[[], Dict]
+    call: Callable[[Dict], Any]
+
+
+def latency_summary(samples: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(samples, 0.99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3) if samples else 0.0,
+    }
+
+
+def configure_environment(menu_path: str, orders_url: str, llm_url: str) -> None:
+    """Apontar os agentes para os serviços locais; precisa acontecer antes de importá-los."""
+    if "agents.common_tools" in sys.modules:
+        raise RuntimeError("O ambiente do benchmark deve ser configurado antes de importar os agentes.")
+    os.environ.update({
+        "SQLITE_DB_PATH": menu_path,
+        "ORDER_API_URL": orders_url,
+        "OPENAI_BASE_URL": llm_url,
+        "OPENAI_API_KEY": "offline-benchmark",
+    })
+    for name in ("SESSION_DB_PATH", "MENU_ALIASES_PATH"):
+        os.environ.pop(name, None)
+
+
+def tool_cases() -> List[ToolCase]:
+    from agents.common_tools import get_pizza_menu, get_pizza_prices
+    from agents.create_order.tools import get_cart_total, send_data_to_api, set_item
+    from agents.update_order.tools import (
+        find_order_by_document,
+        find_order_by_id,
+        process_order_updates,
+        set_new_item,
+    )
+
+    def cart() -> Dict:
+        state = {"cart": [], "total": 0.0}
+        set_item(state, "Sabor 001", "Grande", "Recheada com Cheddar", 1)
+        set_item(state, "Sabor 002", "Média", "Tradicional", 2)
+        return state
+
+    def complete_order() -> Dict:
+        return dict(
+            cart(),
+            user_name="Ana",
+            user_document=CREATE_DOCUMENT,
+            address={"street_name": "Rua das Flores", "number": 123, "reference_point": "", "complement": ""},
+        )
+
+    def pending_update() -> Dict:
+        return {
+            "selected_order_id": 1,
+            "selected_order": {"id": 1, "items": []},
+            "changes": [["address", "Rua Nova", 45, "", ""]],
+        }
+
+    return [
+        ToolCase("get_pizza_menu", dict, lambda state: get_pizza_menu()),
+        ToolCase("get_pizza_menu[names]", dict, lambda state: get_pizza_menu(menu_format="names")),
+        ToolCase("get_pizza_prices", dict, lambda state: get_pizza_prices("Sabor 001")),
+        ToolCase("get_pizza_prices[fuzzy]", dict, lambda state: get_pizza_prices("sabr 01")),
+        ToolCase("set_item", lambda: {"cart": [], "total": 0.0},
+                 lambda state: set_item(state, "Sabor 001", "Grande", "Tradicional", 2)),
+        ToolCase("get_cart_total", cart, get_cart_total),
+        ToolCase("set_new_item", dict,
+                 lambda state: set_new_item(state, "Sabor 003", "Pequena", "Tradicional", 1)),
+        ToolCase("send_data_to_api", complete_order, send_data_to_api),
+        ToolCase("find_order_by_document", dict, lambda state: find_order_by_document(state, UPDATE_DOCUMENT)),
+        ToolCase("find_order_by_id", dict, lambda state: find_order_by_id(state, 1)),
+        ToolCase("process_order_updates", pending_update, process_order_updates),
+    ]
+
+
+async def _invoke(call: Callable[[Dict], Any], state: Dict) -> Any:
+    result = call(state)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+async def bench_tool(case: ToolCase, iterations: int, alloc_iterations: int) -> Dict:
+    from .render import render_tool_result
+
+    # A primeira chamada carrega o cardápio e abre conexões; fica fora da medição.
+    # O agno envia ao modelo ``str()`` do resultado.
+    result = await _invoke(case.call, case.make_state())
+    content = result if isinstance(result, str) else str(result)
+
+    samples = []
+    for _ in range(iterations):
+        state = case.make_state()
+        started = time.perf_counter()
+        await _invoke(case.call, state)
+        samples.append(time.perf_counter() - started)
+
+    peaks, retained = [], []
+    tracemalloc.start()
+    try:
+        for _ in range(alloc_iterations):
+            state = case.make_state()
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            await _invoke(case.call, state)
+            current, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - baseline)
+            retained.append(current - baseline)
+    finally:
+        tracemalloc.stop()
+
+    return dict(
+        latency_summary(samples),
+        result_chars=len(content),
+        rendered_chars=len(render_tool_result(content)),
+        alloc_peak_kib=round(statistics.fmean(peaks) / 1024, 2) if peaks else 0.0,
+        alloc_retained_kib=round(statistics.fmean(retained) / 1024, 2) if retained else 0.0,
+    )
+
+
+def install_tool_timer(agents, samples: Dict[str, List[float]]) -> None:
+    """Medir cada chamada de ferramenta feita pelos agentes durante os turnos."""
+
+    async def timer(function_name: str, function_call: Callable, arguments: Dict[str, Any]):
+        started = time.perf_counter()
+        try:
+            result = function_call(**arguments)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+        finally:
+            samples[function_name].append(time.perf_counter() - started)
+
+    for agent in agents:
+        agent.tool_hooks = [*(agent.tool_hooks or []), timer]
+
+
+async def run_turn(router, conversation_id: str, message: str, stream: bool, first_chunks: List[float]) -> str:
+    if not stream:
+        return await router.respond(conversation_id, message)
+
+    started = time.perf_counter()
+    chunks = []
+    async for chunk in router.respond_stream(conversation_id, message):
+        if not chunks:
+            first_chunks.append(time.perf_counter() - started)
+        chunks.append(chunk)
+    return "".join(chunks)
+
+
+async def bench_turns(args: argparse.Namespace) -> Dict:
+    from agents.orchestrator.router import router
+
+    names = list(CONVERSATIONS)
+    latencies: List[float] = []
+    first_chunks: List[float] = []
+    per_flow: Dict[str, List[float]] = defaultdict(list)
+    mismatched = 0
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def conversation(index: int, turns: List[ScriptTurn], flow: str, record: bool) -> None:
+        nonlocal mismatched
+        conversation_id = f"bench-{flow}-{index}"
+        for turn in turns:
+            started = time.perf_counter()
+            reply = await run_turn(router, conversation_id, turn.message, args.stream, first_chunks)
+            if record:
+                elapsed = time.perf_counter() - started
+                latencies.append(elapsed)
+                per_flow[flow].append(elapsed)
+                mismatched += (reply or "").strip() != turn.reply
+
+    async def worker(index: int) -> None:
+        flow = names[index % len(names)]
+        async with semaphore:
+            await conversation(index, CONVERSATIONS[flow], flow, record=True)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(index) for index in range(args.conversations)))
+    elapsed = time.perf_counter() - started
+
+    # Uma conversa de cada fluxo, fora da medição de tempo, para as alocações por turno.
+    peaks = []
+    tracemalloc.start()
+    try:
+        for flow in names:
+            for turn in CONVERSATIONS[flow]:
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+                await run_turn(router, f"bench-alloc-{flow}", turn.message, args.stream, [])
+                peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+
+    report = {
+        "conversations": args.conversations,
+        "concurrency": args.concurrency,
+        "stream": args.stream,
+        "turns": len(latencies),
+        "unexpected_replies": mismatched,
+        "elapsed_s": round(elapsed, 3),
+        "turns_per_s": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "conversations_per_s": round(args.conversations / elapsed, 2) if elapsed else 0.0,
+        "latency": latency_summary(latencies),
+        "latency_by_flow": {flow: latency_summary(samples) for flow, samples in per_flow.items()},
+        "alloc_peak_kib_per_turn": round(statistics.fmean(peaks) / 1024, 2) if peaks else 0.0,
+        "router": router.stats(),
+    }
+    if args.stream:
+        report["time_to_first_chunk"] = latency_summary(first_chunks)
+    return report
+
+
+async def run(args: argparse.Namespace) -> Dict:
+    llm = await FakeChatModel(latency=args.llm_latency, token_interval=args.token_interval, seed=args.seed).start()
+    orders = await FakeOrdersApi(latency=args.api_latency, error_rate=args.error_rate, seed=args.seed).start()
+    orders.seed_order(UPDATE_DOCUMENT, [
+        {"name": "Sabor 000 - Grande - Tradicional", "quantity": 1, "unit_price": 50.0},
+        {"name": "Sabor 001 - Média - Tradicional", "quantity": 2, "unit_price": 41.0},
+        {"name": "Sabor 002 - Pequena - Recheada com Cheddar", "quantity": 1, "unit_price": 40.0},
+    ])
+
+    with tempfile.TemporaryDirectory() as workdir:
+        menu_path = args.menu_db or build_menu_db(os.path.join(workdir, "menu.db"), args.flavours)
+        configure_environment(menu_path, orders.url, llm.base_url)
+
+        from agents.common_tools import orders_api, orders_cache, orders_prefetcher, tool_memo
+        from agents.create_order.agent import agent as create_order_agent
+        from agents.orchestrator.agent import agent as orchestrator_agent
+        from agents.update_order.agent import agent as update_order_agent
+
+        tool_calls: Dict[str, List[float]] = defaultdict(list)
+        install_tool_timer([orchestrator_agent, create_order_agent, update_order_agent], tool_calls)
+
+        try:
+            tools = {}
+            for case in tool_cases():
+                tools[case.name] = await bench_tool(case, args.tool_iterations, args.alloc_iterations)
+            orders_cache.clear()
+            turns = await bench_turns(args)
+        finally:
+            await orders_prefetcher.cancel_all()
+            await orders_api.aclose()
+            await llm.close()
+            await orders.close()
+
+    return {
+        "config": {
+            "flavours": args.flavours if not args.menu_db else None,
+            "menu_db": args.menu_db,
+            "llm_latency_s": args.llm_latency,
+            "api_latency_s": args.api_latency,
+            "error_rate": args.error_rate,
+            "seed": args.seed,
+        },
+        "tools": tools,
+        "turns": turns,
+        "tool_calls": {name: latency_summary(samples) for name, samples in sorted(tool_calls.items())},
+        "llm": llm.stats(),
+        "orders_api": orders.stats(),
+        "orders_client": orders_api.stats(),
+        "orders_cache": orders_cache.stats(),
+        "orders_prefetch": orders_prefetcher.stats(),
+        "tool_cache": tool_memo.stats(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--flavours", type=int, default=50, help="Sabores no cardápio gerado")
+    parser.add_argument("--menu-db", help="Usar um cardápio SQLite existente em vez de gerar um")
+    parser.add_argument("--conversations", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--tool-iterations", type=int, default=50)
+    parser.add_argument("--alloc-iterations", type=int, default=10)
+    parser.add_argument("--llm-latency", type=float, default=0.02, help="Latência de cada resposta do modelo, em segundos")
+    parser.add_argument("--token-interval", type=float, default=0.0, help="Intervalo entre trechos em modo streaming")
+    parser.add_argument("--api-latency", type=float, default=0.01, help="Latência da API de pedidos, em segundos")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Proporção de requisições à API que falham com 500")
+    parser.add_argument("--stream", action="store_true", help="Percorrer os turnos em modo streaming")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Gravar o relatório também neste arquivo")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(sys.stderr):
+        report = asyncio.run(run(args))
+
+    payload = json.dumps(report, indent=2, ensure_ascii=False)
+    print(payload)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            output.write(payload)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Texto equivalente aos registros das ferramentas, para comparar tamanhos no benchmark offline."""
+import json
+from typing import Callable, Dict, Iterable, List
+
+from agents.pricing import format_price
+from agents.records import CartLine, OrderItem, OrderSummary, UpdateResult
+
+UPDATE_OPERATIONS = {
+    "add_items": "adicionar itens",
+    "update_address": "atualizar endereço",
+    "remove_item": "remover item",
+}
+
+
+def render_cart(lines: Iterable[CartLine], total: float) -> str:
+    rendered = [
+        f"{line.quantity}x {line.name} ({line.size}, borda {line.crust}): {format_price(line.line_total)}"
+        for line in lines
+    ]
+    if not rendered:
+        return "O pedido ainda não tem itens."
+    return "\n".join(rendered) + f"\nTotal: {format_price(total)}"
+
+
+def render_orders(orders: List[OrderSummary]) -> str:
+    if not orders:
+        return "❌ Nenhum pedido encontrado."
+    parts = ["📋 Pedidos encontrados:\n"]
+    for index, order in enumerate(orders, 1):
+        parts.append(
+            f"{index}. **Pedido #{order.id}**\n"
+            f"   • Data de entrega: {order.delivery_date or 'N/A'}\n"
+            f"   • Total: {format_price(order.total)}\n"
+            f"   • Status: {order.status or 'N/A'}\n"
+        )
+    return "\n".join(parts)
+
+
+def render_order_items(items: List[OrderItem]) -> str:
+    if not items:
+        return "❌ Este pedido não possui itens."
+    parts = ["📋 Itens do seu pedido:\n"]
+    for item in items:
+        parts.append(
+            f"**ID: {item.id}** - {item.name}\n"
+            f"   Quantidade: {item.quantity}\n"
+            f"   Preço unitário: {format_price(item.unit_price)}\n"
+        )
+    return "\n".join(parts)
+
+
+def render_update_results(results: Iterable[UpdateResult]) -> str:
+    lines: List[str] = []
+    for result in results:
+        operation = UPDATE_OPERATIONS.get(result.operation, result.operation)
+        if result.item_id is not None:
+            operation = f"{operation} {result.item_id}"
+        lines.append(f"✅ {operation}: ok" if result.ok else f"❌ {operation}: {result.error}")
+    return "\n".join(lines) if lines else "ℹ️ Nenhuma alteração pendente."
+
+
+def render_cart_change(line: CartLine, verb: str, total: float) -> str:
+    return (
+        f"✅ {line.quantity}x {line.name} ({line.size}, borda {line.crust}) {verb} por "
+        f"{format_price(line.unit_price)} cada. Total parcial: {format_price(total)}."
+    )
+
+
+def render_selected_order(order: OrderSummary) -> str:
+    return (
+        f"✅ Pedido #{order.id} selecionado com sucesso! O que você gostaria de fazer?\n"
+        "1. Adicionar mais itens\n2. Alterar endereço de entrega\n3. Remover um item"
+    )
+
+
+def _records(record_type, rows) -> List:
+    return [record_type(**row) for row in rows or []]
+
+
+_RENDERERS: Dict[str, Callable[[Dict], str]] = {
+    "cart": lambda payload: render_cart(_records(CartLine, payload["cart"]), payload.get("total", 0.0)),
+    "orders": lambda payload: render_orders(_records(OrderSummary, payload["orders"])),
+    "items": lambda payload: render_order_items(_records(OrderItem, payload["items"])),
+    "results": lambda payload: render_update_results(_records(UpdateResult, payload["results"])),
+    "added": lambda payload: render_cart_change(
+        CartLine(**payload["added"]), "adicionada", payload.get("total", payload.get("new_items_total", 0.0))
+    ),
+    "removed": lambda payload: render_cart_change(CartLine(**payload["removed"]), "removida", payload.get("total", 0.0)),
+    "selected": lambda payload: render_selected_order(OrderSummary(**payload["selected"])),
+    "same_as": lambda payload: f"Mesmo resultado de {payload['same_as']}.",
+    "status": lambda payload: f"Pedido enviado para confirmação com sucesso! 🎉 Total: {format_price(payload.get('total'))}",
+}
+
+
+def render_tool_result(content: str) -> str:
+    """Converter o JSON devolvido por uma ferramenta em texto para o cliente."""
+    try:
+        payload = json.loads(content)
+    except (TypeError, ValueError):
+        return content
+    if not isinstance(payload, dict):
+        return content
+    if "error" in payload:
+        problems = [f"• {problem.get('message')}" for problem in payload.get("problems") or [] if isinstance(problem, dict)]
+        return "\n".join([f"❌ Erro: {payload['error']}", *problems])
+    for key, render in _RENDERERS.items():
+        if key in payload:
+            try:
+                return render(payload)
+            except (KeyError, TypeError):
+                return content
+    return content
@@ -1,23 +1,110 @@
+import argparse
 import asyncio
-from agents.orchestrator.agent import agent
+import logging
+import os
+import signal
+import uuid
 
+logger = logging.getLogger("beauty_pizza")
 
-async def main():
-    session_id = None
+
+def configure_logging() -> None:
+    logging.basicConfig(
+        level=os.getenv("LOG_LEVEL", "INFO").upper(),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+
+
+async def main(stream: bool = True, startup: str = "lazy"):
+    from agents.orchestrator.router import router
+    from agents.startup import warm_up
+
+    session_id = str(uuid.uuid4())
     print("🚀 [SISTEMA] Iniciando Beauty Pizza Bot")
+    if startup == "eager":
+        await warm_up()
     
-    while True:
-        user_input = await asyncio.to_thread(input, "Você: ")
+    try:
+        while True:
+            user_input = await asyncio.to_thread(input, "Você: ")
+            try:
+                print("🎯 [ORQUESTRADOR] Processando sua solicitação...")
+                if stream:
+                    print("Bot: ", end="", flush=True)
+                    async for chunk in router.respond_stream(session_id, user_input):
+                        print(chunk, end="", flush=True)
+                    print()
+                else:
+                    response = await router.respond(session_id, user_input)
+                    print("Bot:", response)
+            except Exception:
+                logger.exception("[ERRO] Ocorreu um erro ao processar a mensagem")
+    finally:
+        router.store.close()
+
+
+def stop_on_signals() -> asyncio.Event:
+    """Evento sinalizado por SIGTERM/SIGINT, para encerrar o servidor sem cortar turnos."""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
         try:
-            print("🎯 [ORQUESTRADOR] Processando sua solicitação...")
-            response = await agent.arun(user_input, session_id=session_id, add_history_to_context=True)  
-            session_id = response.session_id
-            print("Bot:", response.content)
-        except Exception as e:
-            print("❌ [ERRO] Ocorreu um erro:")
-            import traceback
-            traceback.print_exc()
+            loop.add_signal_handler(signum, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+    return stop
+
+
+async def serve(host: str, port: int, startup: str = "eager"):
+    from agents.orchestrator.router import router
+    from agents.startup import warm_up
+    from agents.storage import SESSION_EVICTION_INTERVAL
+    from server import ChatServer
+
+    if startup == "eager":
+        await warm_up()
+
+    maintenance = asyncio.create_task(router.run_maintenance(SESSION_EVICTION_INTERVAL))
+    try:
+        await ChatServer().serve_forever(host, port, stop=stop_on_signals())
+    finally:
+        maintenance.cancel()
+        router.store.close()
+
+
+async def supervise(host: str, port: int, workers: int, startup: str = "eager"):
+    from supervisor import Supervisor
+
+    await Supervisor(workers, worker_base_port=port + 1, startup=startup).serve_forever(host, port, stop=stop_on_signals())
+
 
 if __name__ == "__main__":
-    asyncio.run(main())
-    
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Beauty Pizza Bot")
+    parser.add_argument("--serve", action="store_true", help="Iniciar o servidor HTTP com várias conversas simultâneas")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("SERVER_WORKERS", "1")),
+        help="Número de processos do servidor; acima de 1, um supervisor distribui as conversas "
+             "entre eles pelas portas seguintes à --port (padrão: SERVER_WORKERS, ou 1)",
+    )
+    parser.add_argument("--no-stream", action="store_true", help="Mostrar a resposta só quando estiver completa")
+    parser.add_argument(
+        "--startup",
+        choices=("eager", "lazy"),
+        help="eager prepara todos os agentes antes do primeiro turno; lazy só no primeiro uso "
+             "(padrão: STARTUP_MODE, ou eager no servidor e lazy no terminal)",
+    )
+    args = parser.parse_args()
+    configure_logging()
+
+    from agents.startup import resolve_mode
+
+    if args.serve and args.workers > 1:
+        asyncio.run(supervise(args.host, args.port, args.workers, resolve_mode(args.startup, "eager")))
+    elif args.serve:
+        asyncio.run(serve(args.host, args.port, resolve_mode(args.startup, "eager")))
+    else:
+        asyncio.run(main(stream=not args.no_stream, startup=resolve_mode(args.startup, "lazy")))
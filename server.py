@@ -0,0 +1,299 @@
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Dict, Optional, Set, Tuple, Union
+from urllib.parse import parse_qs
+
+from agents.conversation import ConversationBusy, ConversationManager, ServerOverloaded
+from agents.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+try:
+    SERVER_MAX_BODY_BYTES = int(os.getenv("SERVER_MAX_BODY_BYTES", "65536"))
+except (TypeError, ValueError):
+    SERVER_MAX_BODY_BYTES = 65536
+
+try:
+    SERVER_MAX_CONCURRENT_TURNS = int(os.getenv("SERVER_MAX_CONCURRENT_TURNS", "64"))
+except (TypeError, ValueError):
+    SERVER_MAX_CONCURRENT_TURNS = 64
+
+try:
+    SERVER_MAX_PENDING_TURNS = int(os.getenv("SERVER_MAX_PENDING_TURNS", "1024"))
+except (TypeError, ValueError):
+    SERVER_MAX_PENDING_TURNS = 1024
+
+try:
+    SERVER_DRAIN_TIMEOUT = float(os.getenv("SERVER_DRAIN_TIMEOUT", "30"))
+except (TypeError, ValueError):
+    SERVER_DRAIN_TIMEOUT = 30.0
+
+try:
+    SERVER_MAX_PENDING_PER_SESSION = int(os.getenv("SERVER_MAX_PENDING_PER_SESSION", "4"))
+except (TypeError, ValueError):
+    SERVER_MAX_PENDING_PER_SESSION = 4
+
+REASONS = {
+    200: "OK",
+    201: "Created",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    429: "Too Many Requests",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class BadRequest(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+async def read_request(
+    reader: asyncio.StreamReader, max_body_bytes: int = SERVER_MAX_BODY_BYTES
+) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+    """Ler uma requisição HTTP/1.1 (método, caminho, cabeçalhos e corpo)."""
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+
+    try:
+        method, path, _ = request_line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise BadRequest(400, "Linha de requisição inválida")
+
+    headers: Dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise BadRequest(400, "Content-Length inválido")
+    if length > max_body_bytes:
+        raise BadRequest(413, "Corpo da requisição muito grande")
+
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), path, headers, body
+
+
+def parse_chat_request(body: bytes) -> Tuple[str, str]:
+    """Extrair o ``session_id`` (gerado quando ausente) e a mensagem do corpo JSON."""
+    try:
+        payload = json.loads(body or b"{}")
+    except ValueError:
+        raise BadRequest(400, "JSON inválido")
+
+    message = payload.get("message") if isinstance(payload, dict) else None
+    if not isinstance(message, str) or not message.strip():
+        raise BadRequest(400, "Campo 'message' é obrigatório")
+    return str(payload.get("session_id") or uuid.uuid4()), message
+
+
+def write_stream_head(writer: asyncio.StreamWriter, keep_alive: bool = True) -> None:
+    writer.write((
+        "HTTP/1.1 200 OK\r\n"
+        "Content-Type: text/event-stream; charset=utf-8\r\n"
+        "Cache-Control: no-cache\r\n"
+        "Transfer-Encoding: chunked\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    ).encode("latin-1"))
+
+
+def write_chunk(writer: asyncio.StreamWriter, data: bytes) -> None:
+    """Enviar um chunk HTTP de uma resposta com ``Transfer-Encoding: chunked``."""
+    if data:
+        writer.write(f"{len(data):X}\r\n".encode("latin-1") + data + b"\r\n")
+
+
+def write_event(writer: asyncio.StreamWriter, payload: Dict, event: Optional[str] = None) -> None:
+    """Enviar um evento SSE como um chunk HTTP."""
+    data = f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+    if event:
+        data = f"event: {event}\n{data}"
+    write_chunk(writer, data.encode("utf-8"))
+
+
+def write_response(writer: asyncio.StreamWriter, status: int, payload: Union[Dict, str], keep_alive: bool = True) -> None:
+    """Enviar uma resposta JSON, ou texto puro quando ``payload`` é uma string."""
+    if isinstance(payload, str):
+        body = payload.encode("utf-8")
+        content_type = "text/plain; version=0.0.4; charset=utf-8"
+    else:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        content_type = "application/json; charset=utf-8"
+    head = (
+        f"HTTP/1.1 {status} {REASONS.get(status, 'OK')}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+
+
+class ChatServer:
+    """Servidor HTTP assíncrono que atende várias conversas simultâneas."""
+
+    def __init__(self, manager: Optional[ConversationManager] = None):
+        self.manager = manager or ConversationManager(
+            max_concurrent_turns=SERVER_MAX_CONCURRENT_TURNS,
+            max_pending_turns=SERVER_MAX_PENDING_TURNS,
+            max_pending_per_conversation=SERVER_MAX_PENDING_PER_SESSION,
+        )
+        self._connections: Set[asyncio.StreamWriter] = set()
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, Union[Dict, str]]:
+        path, _, query = path.partition("?")
+        if path == "/health":
+            return 200, {
+                "status": "ok",
+                "active_conversations": self.manager.active_conversations,
+                "pending_turns": self.manager.pending_turns,
+            }
+
+        if path == "/metrics":
+            metrics_format = parse_qs(query).get("format")
+            if metrics_format == ["prometheus"]:
+                return 200, metrics.render_prometheus()
+            if metrics_format == ["typed"]:
+                return 200, metrics.typed_snapshot()
+            return 200, metrics.snapshot()
+
+        if path != "/chat":
+            return 404, {"error": "Rota não encontrada"}
+        if method != "POST":
+            return 405, {"error": "Use POST"}
+
+        try:
+            session_id, message = parse_chat_request(body)
+        except BadRequest as e:
+            return e.status, {"error": str(e)}
+
+        try:
+            reply = await self.manager.handle_message(session_id, message)
+        except (ConversationBusy, ServerOverloaded) as e:
+            return 429, {"session_id": session_id, "error": str(e)}
+        except Exception:
+            logger.exception("[ERRO] Falha ao processar mensagem da sessão %s", session_id)
+            return 500, {"session_id": session_id, "error": "Erro interno ao processar a mensagem"}
+
+        return 200, {"session_id": session_id, "reply": reply}
+
+    async def stream_chat(self, writer: asyncio.StreamWriter, body: bytes, keep_alive: bool) -> None:
+        """Responder ``POST /chat/stream`` com um evento SSE por trecho gerado."""
+        try:
+            session_id, message = parse_chat_request(body)
+        except BadRequest as e:
+            write_response(writer, e.status, {"error": str(e)}, keep_alive=keep_alive)
+            return
+
+        chunks = self.manager.stream_message(session_id, message)
+        try:
+            # O primeiro trecho é aguardado antes dos cabeçalhos para que erros de
+            # backpressure ainda possam ser respondidos com o status adequado.
+            first_chunk = await chunks.__anext__()
+        except StopAsyncIteration:
+            first_chunk = None
+        except (ConversationBusy, ServerOverloaded) as e:
+            write_response(writer, 429, {"session_id": session_id, "error": str(e)}, keep_alive=keep_alive)
+            return
+        except Exception:
+            logger.exception("[ERRO] Falha ao processar mensagem da sessão %s", session_id)
+            write_response(writer, 500, {"session_id": session_id, "error": "Erro interno ao processar a mensagem"}, keep_alive=keep_alive)
+            return
+
+        write_stream_head(writer, keep_alive=keep_alive)
+        try:
+            if first_chunk is not None:
+                write_event(writer, {"delta": first_chunk})
+                await writer.drain()
+            async for chunk in chunks:
+                write_event(writer, {"delta": chunk})
+                await writer.drain()
+            write_event(writer, {"session_id": session_id}, event="done")
+        except (ConnectionResetError, BrokenPipeError):
+            await chunks.aclose()
+            raise
+        except Exception:
+            logger.exception("[ERRO] Falha ao processar mensagem da sessão %s", session_id)
+            write_event(writer, {"session_id": session_id, "error": "Erro interno ao processar a mensagem"}, event="error")
+        writer.write(b"0\r\n\r\n")
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._connections.add(writer)
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except BadRequest as e:
+                    write_response(writer, e.status, {"error": str(e)}, keep_alive=False)
+                    break
+                except asyncio.IncompleteReadError:
+                    break
+                if request is None:
+                    break
+
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                if path.split("?", 1)[0] == "/chat/stream" and method == "POST":
+                    await self.stream_chat(writer, body, keep_alive)
+                else:
+                    status, payload = await self.dispatch(method, path, body)
+                    write_response(writer, status, payload, keep_alive=keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    async def start(self, host: str, port: int) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    async def serve_forever(self, host: str, port: int, stop: Optional[asyncio.Event] = None) -> None:
+        """Atender até ``stop`` ser sinalizado (ou para sempre, sem ``stop``)."""
+        server = await self.start(host, port)
+        logger.info("[SISTEMA] Servidor ouvindo em http://%s:%s", host, port)
+        if stop is None:
+            async with server:
+                await server.serve_forever()
+            return
+
+        await stop.wait()
+        # Novas conexões são recusadas, e os turnos em andamento terminam antes da saída.
+        server.close()
+        logger.info("[SISTEMA] Encerrando o servidor; aguardando %d turno(s) em andamento", self.in_flight)
+        await self.drain(SERVER_DRAIN_TIMEOUT)
+        # Conexões keep-alive ociosas são fechadas para que seus leitores terminem.
+        for writer in list(self._connections):
+            writer.close()
+        await asyncio.sleep(0)
+
+    @property
+    def in_flight(self) -> int:
+        return self.manager.pending_turns
+
+    async def drain(self, timeout: float) -> bool:
+        """Aguardar os turnos em andamento; ``False`` se o prazo acabar antes."""
+        deadline = time.monotonic() + timeout
+        while self.in_flight:
+            if time.monotonic() >= deadline:
+                logger.warning("[SISTEMA] Prazo de encerramento esgotado com %d turno(s) em andamento", self.in_flight)
+                return False
+            await asyncio.sleep(0.05)
+        return True
@@ -0,0 +1,345 @@
+"""Modo servidor com vários processos de trabalho, cada conversa fixa em um deles."""
+import asyncio
+import json
+import logging
+import os
+import signal
+import sys
+import time
+import zlib
+from typing import Dict, List, Optional, Set, Tuple, Union
+from urllib.parse import parse_qs
+
+import httpx
+
+from agents.metrics import metrics
+from server import (
+    SERVER_DRAIN_TIMEOUT,
+    BadRequest,
+    ChatServer,
+    parse_chat_request,
+    write_chunk,
+    write_event,
+    write_response,
+    write_stream_head,
+)
+
+logger = logging.getLogger(__name__)
+
+MAIN_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+try:
+    SUPERVISOR_WORKER_START_TIMEOUT = float(os.getenv("SUPERVISOR_WORKER_START_TIMEOUT", "60"))
+except (TypeError, ValueError):
+    SUPERVISOR_WORKER_START_TIMEOUT = 60.0
+
+try:
+    SUPERVISOR_WORKER_WAIT = float(os.getenv("SUPERVISOR_WORKER_WAIT", "10"))
+except (TypeError, ValueError):
+    SUPERVISOR_WORKER_WAIT = 10.0
+
+try:
+    SUPERVISOR_PROXY_TIMEOUT = float(os.getenv("SUPERVISOR_PROXY_TIMEOUT", "120"))
+except (TypeError, ValueError):
+    SUPERVISOR_PROXY_TIMEOUT = 120.0
+
+try:
+    SUPERVISOR_MAX_RESTART_DELAY = float(os.getenv("SUPERVISOR_MAX_RESTART_DELAY", "10"))
+except (TypeError, ValueError):
+    SUPERVISOR_MAX_RESTART_DELAY = 10.0
+
+UNAVAILABLE = "Servidor reiniciando, tente novamente em instantes."
+
+
+def worker_index(session_id: str, workers: int) -> int:
+    """Processo responsável pela conversa; estável enquanto o número de processos não mudar."""
+    return zlib.crc32(session_id.encode("utf-8")) % workers
+
+
+def with_worker_label(sample: str, worker: str) -> str:
+    """Acrescentar o label ``worker`` a uma métrica no formato ``nome{label="valor"}``."""
+    name, brace, labels = sample.partition("{")
+    label = f'worker="{worker}"'
+    return f"{name}{{{label},{labels}" if brace else f"{name}{{{label}}}"
+
+
+def merge_snapshots(snapshots: Dict[Optional[str], Dict[str, Dict[str, float]]]) -> Dict[str, float]:
+    """Juntar as métricas separadas (``?format=typed``) de vários processos.
+
+    Contadores são somados; medidores (razões, máximos, estados) não podem ser
+    somados e aparecem por processo, com o label ``worker``. A chave ``None``
+    (o próprio supervisor) entra sem o label.
+    """
+    merged: Dict[str, float] = {}
+    for worker, snapshot in snapshots.items():
+        for key, value in snapshot.get("counters", {}).items():
+            merged[key] = merged.get(key, 0.0) + value
+        for key, value in snapshot.get("gauges", {}).items():
+            merged[key if worker is None else with_worker_label(key, worker)] = value
+    return dict(sorted(merged.items()))
+
+
+def merge_prometheus(texts: Dict[Optional[str], str]) -> str:
+    """Juntar as métricas em texto do Prometheus, com o label ``worker`` em cada amostra.
+
+    As amostras de uma mesma métrica ficam juntas, sob uma única linha ``# TYPE``.
+    O texto da chave ``None`` (as métricas do próprio supervisor) entra sem o label.
+    """
+    families: Dict[str, Tuple[str, List[str]]] = {}
+    for worker, text in texts.items():
+        family_type = {}
+        for line in text.splitlines():
+            if line.startswith("# TYPE "):
+                _, _, name, metric_type = line.split(" ", 3)
+                family_type[name] = metric_type
+                continue
+            if not line or line.startswith("#"):
+                continue
+            sample, _, value = line.rpartition(" ")
+            name = sample.partition("{")[0]
+            if worker is not None:
+                sample = with_worker_label(sample, worker)
+            families.setdefault(name, (family_type.get(name, "untyped"), []))[1].append(f"{sample} {value}")
+
+    lines = []
+    for name, (metric_type, samples) in families.items():
+        lines.append(f"# TYPE {name} {metric_type}")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
+
+
+def _response_payload(response: httpx.Response) -> Union[Dict, str]:
+    try:
+        return response.json()
+    except ValueError:
+        return response.text
+
+
+class Worker:
+    """Um processo ``main.py --serve`` atendendo em uma porta local."""
+
+    def __init__(self, index: int, host: str, port: int):
+        self.index = index
+        self.host = host
+        self.port = port
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.ready = asyncio.Event()
+        self.restarts = 0
+
+    def url(self, path: str) -> str:
+        return f"http://{self.host}:{self.port}{path}"
+
+    def describe(self) -> Dict:
+        return {
+            "index": self.index,
+            "pid": self.process.pid if self.process else None,
+            "port": self.port,
+            "ready": self.ready.is_set(),
+            "restarts": self.restarts,
+        }
+
+
+class Supervisor(ChatServer):
+    """Porta pública que distribui as conversas entre os processos de trabalho."""
+
+    def __init__(self, workers: int, worker_host: str = "127.0.0.1", worker_base_port: int = 8081, startup: str = "eager"):
+        self.workers = [Worker(index, worker_host, worker_base_port + index) for index in range(workers)]
+        self.startup = startup
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(SUPERVISOR_PROXY_TIMEOUT, connect=3.0),
+            limits=httpx.Limits(max_connections=None, max_keepalive_connections=64),
+        )
+        self._watchers: List[asyncio.Task] = []
+        self._stopping = False
+        self._in_flight = 0
+        self._connections: Set[asyncio.StreamWriter] = set()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _update_ready_gauge(self) -> None:
+        metrics.set_gauge("supervisor_workers_ready", sum(worker.ready.is_set() for worker in self.workers))
+
+    async def _spawn(self, worker: Worker) -> None:
+        env = dict(os.environ, WORKER_ID=str(worker.index))
+        worker.process = await asyncio.create_subprocess_exec(
+            sys.executable, MAIN_SCRIPT, "--serve", "--workers", "1",
+            "--host", worker.host, "--port", str(worker.port), "--startup", self.startup,
+            env=env,
+        )
+        logger.info("[SUPERVISOR] Processo %d iniciado (pid %d, porta %d)", worker.index, worker.process.pid, worker.port)
+
+        deadline = time.monotonic() + SUPERVISOR_WORKER_START_TIMEOUT
+        while time.monotonic() < deadline and worker.process.returncode is None:
+            try:
+                response = await self._client.get(worker.url("/health"), timeout=1.0)
+                if response.status_code == 200:
+                    worker.ready.set()
+                    self._update_ready_gauge()
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.1)
+        logger.error("[SUPERVISOR] Processo %d não ficou pronto a tempo", worker.index)
+        if worker.process.returncode is None:
+            worker.process.kill()
+
+    async def _watch(self, worker: Worker) -> None:
+        """Manter o processo no ar, reiniciando-o quando terminar inesperadamente."""
+        failures = 0
+        while not self._stopping:
+            started = time.monotonic()
+            await self._spawn(worker)
+            code = await worker.process.wait()
+            worker.ready.clear()
+            self._update_ready_gauge()
+            if self._stopping:
+                return
+
+            # Um processo que ficou no ar por um bom tempo zera a espera.
+            failures = 1 if time.monotonic() - started > 60 else failures + 1
+            delay = min(0.5 * 2 ** (failures - 1), SUPERVISOR_MAX_RESTART_DELAY)
+            worker.restarts += 1
+            metrics.increment("supervisor_worker_restarts_total", worker=worker.index)
+            logger.warning("[SUPERVISOR] Processo %d terminou com código %s; reiniciando em %.1fs", worker.index, code, delay)
+            await asyncio.sleep(delay)
+
+    async def _worker_for(self, session_id: str) -> Optional[Worker]:
+        worker = self.workers[worker_index(session_id, len(self.workers))]
+        if worker.ready.is_set():
+            return worker
+        try:
+            await asyncio.wait_for(worker.ready.wait(), SUPERVISOR_WORKER_WAIT)
+        except asyncio.TimeoutError:
+            return None
+        return worker
+
+    @staticmethod
+    def _chat_body(body: bytes) -> Tuple[str, bytes]:
+        # O session_id é fixado aqui para que o hash e o processo usem o mesmo valor.
+        session_id, message = parse_chat_request(body)
+        return session_id, json.dumps({"session_id": session_id, "message": message}, ensure_ascii=False).encode("utf-8")
+
+    async def _gather(self, path: str) -> Dict[int, httpx.Response]:
+        ready = [worker for worker in self.workers if worker.ready.is_set()]
+        responses = await asyncio.gather(
+            *(self._client.get(worker.url(path), timeout=5.0) for worker in ready), return_exceptions=True
+        )
+        return {
+            worker.index: response for worker, response in zip(ready, responses)
+            if isinstance(response, httpx.Response) and response.status_code == 200
+        }
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, Union[Dict, str]]:
+        route, _, query = path.partition("?")
+        if route == "/health":
+            responses = await self._gather("/health")
+            healthy = len(responses) == len(self.workers)
+            return (200 if healthy else 503), {
+                "status": "ok" if healthy else "degraded",
+                "active_conversations": sum(r.json().get("active_conversations", 0) for r in responses.values()),
+                "pending_turns": sum(r.json().get("pending_turns", 0) for r in responses.values()),
+                "in_flight": self._in_flight,
+                "workers": [worker.describe() for worker in self.workers],
+            }
+
+        if route == "/metrics":
+            if parse_qs(query).get("format") == ["prometheus"]:
+                texts = {str(index): response.text for index, response in (await self._gather(path)).items()}
+                texts[None] = metrics.render_prometheus()
+                return 200, merge_prometheus(texts)
+            snapshots = {str(index): response.json() for index, response in (await self._gather("/metrics?format=typed")).items()}
+            snapshots[None] = metrics.typed_snapshot()
+            return 200, merge_snapshots(snapshots)
+
+        if route != "/chat":
+            return 404, {"error": "Rota não encontrada"}
+        if method != "POST":
+            return 405, {"error": "Use POST"}
+
+        try:
+            session_id, body = self._chat_body(body)
+        except BadRequest as e:
+            return e.status, {"error": str(e)}
+
+        self._in_flight += 1
+        try:
+            worker = await self._worker_for(session_id)
+            if worker is None:
+                return 503, {"session_id": session_id, "error": UNAVAILABLE}
+            metrics.increment("supervisor_requests_total", worker=worker.index)
+            try:
+                response = await self._client.post(worker.url("/chat"), content=body)
+            except httpx.HTTPError as e:
+                logger.error("[SUPERVISOR] Falha ao repassar a sessão %s ao processo %d: %s", session_id, worker.index, e)
+                return 503, {"session_id": session_id, "error": UNAVAILABLE}
+            return response.status_code, _response_payload(response)
+        finally:
+            self._in_flight -= 1
+
+    async def stream_chat(self, writer: asyncio.StreamWriter, body: bytes, keep_alive: bool) -> None:
+        try:
+            session_id, body = self._chat_body(body)
+        except BadRequest as e:
+            write_response(writer, e.status, {"error": str(e)}, keep_alive=keep_alive)
+            return
+
+        self._in_flight += 1
+        try:
+            worker = await self._worker_for(session_id)
+            if worker is None:
+                write_response(writer, 503, {"session_id": session_id, "error": UNAVAILABLE}, keep_alive=keep_alive)
+                return
+            metrics.increment("supervisor_requests_total", worker=worker.index)
+            await self._relay_stream(writer, worker, session_id, body, keep_alive)
+        finally:
+            self._in_flight -= 1
+
+    async def _relay_stream(self, writer: asyncio.StreamWriter, worker: Worker, session_id: str, body: bytes, keep_alive: bool) -> None:
+        head_sent = False
+        try:
+            async with self._client.stream("POST", worker.url("/chat/stream"), content=body) as response:
+                if response.status_code != 200:
+                    await response.aread()
+                    write_response(writer, response.status_code, _response_payload(response), keep_alive=keep_alive)
+                    return
+                write_stream_head(writer, keep_alive=keep_alive)
+                head_sent = True
+                async for data in response.aiter_bytes():
+                    write_chunk(writer, data)
+                    await writer.drain()
+        except httpx.HTTPError as e:
+            logger.error("[SUPERVISOR] Falha ao repassar a sessão %s ao processo %d: %s", session_id, worker.index, e)
+            if not head_sent:
+                write_response(writer, 503, {"session_id": session_id, "error": UNAVAILABLE}, keep_alive=keep_alive)
+                return
+            write_event(writer, {"session_id": session_id, "error": "Erro interno ao processar a mensagem"}, event="error")
+        writer.write(b"0\r\n\r\n")
+
+    async def _stop_workers(self, timeout: float) -> None:
+        self._stopping = True
+        processes = [worker.process for worker in self.workers if worker.process and worker.process.returncode is None]
+        for process in processes:
+            process.send_signal(signal.SIGTERM)
+        try:
+            await asyncio.wait_for(asyncio.gather(*(process.wait() for process in processes)), timeout)
+        except asyncio.TimeoutError:
+            for process in processes:
+                if process.returncode is None:
+                    process.kill()
+        for watcher in self._watchers:
+            watcher.cancel()
+        await asyncio.gather(*self._watchers, return_exceptions=True)
+
+    async def serve_forever(self, host: str, port: int, stop: Optional[asyncio.Event] = None) -> None:
+        self._watchers = [asyncio.create_task(self._watch(worker)) for worker in self.workers]
+        await asyncio.gather(*(worker.ready.wait() for worker in self.workers))
+        logger.info("[SUPERVISOR] %d processos prontos", len(self.workers))
+        try:
+            await super().serve_forever(host, port, stop=stop)
+        finally:
+            # Os processos recebem SIGTERM só depois que as requisições repassadas terminaram.
+            await self._stop_workers(SERVER_DRAIN_TIMEOUT)
+            await self._client.aclose()
+
@@ -0,0 +1,44 @@
+import asyncio
+
+from agents.api_cache import ResponseCache, order_tag
+
+
+def _slow_fetch(value, started, release):
+    async def fetch():
+        started.set()
+        await release.wait()
+        return value
+
+    return fetch
+
+
+def test_invalidating_an_unrelated_tag_keeps_the_in_flight_fetch():
+    async def scenario():
+        cache = ResponseCache()
+        started, release = asyncio.Event(), asyncio.Event()
+        task = asyncio.create_task(
+            cache.get_or_fetch("/orders/1", _slow_fetch({"id": 1}, started, release), [order_tag(1)])
+        )
+        await started.wait()
+        cache.invalidate(order_tag(999))
+        release.set()
+        await task
+        return cache.stats()["entries"]
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_invalidating_the_fetched_tag_discards_the_response():
+    async def scenario():
+        cache = ResponseCache()
+        started, release = asyncio.Event(), asyncio.Event()
+        task = asyncio.create_task(
+            cache.get_or_fetch("/orders/1", _slow_fetch({"id": 1}, started, release), lambda value: [order_tag(value["id"])])
+        )
+        await started.wait()
+        cache.invalidate(order_tag(1))
+        release.set()
+        assert await task == {"id": 1}
+        return cache.stats()["entries"]
+
+    assert asyncio.run(scenario()) == 0
@@ -0,0 +1,40 @@
+import pytest
+
+from agents.cart import CartError, OrderDraft
+
+ORDER = {"id": 7, "items": [{"id": 70, "name": "Calabresa - Grande - Tradicional", "quantity": 1, "unit_price": 50.0}]}
+
+
+def test_changes_recorded_before_selecting_order_are_kept():
+    draft = OrderDraft()
+    draft.set_address("Rua A", 10, "", "")
+    draft.add_item({"name": "Mussarela", "size": "Grande", "crust": "Tradicional", "quantity": 1, "unit_price": 45.0})
+
+    draft.select(ORDER)
+
+    assert draft.address()["street_name"] == "Rua A"
+    assert len(draft.additions()) == 1
+
+
+def test_switching_orders_discards_pending_changes():
+    draft = OrderDraft()
+    draft.select(ORDER)
+    draft.set_address("Rua A", 10, "", "")
+
+    draft.select({"id": 8, "items": []})
+
+    assert draft.changes == []
+
+
+def test_remove_item_rejects_ids_outside_the_order():
+    draft = OrderDraft()
+    with pytest.raises(CartError):
+        draft.remove_item(70)
+
+    draft.select({"id": 8, "items": []})
+    with pytest.raises(CartError):
+        draft.remove_item(70)
+
+    draft.select(ORDER)
+    draft.remove_item(70)
+    assert draft.removals() == [70]
@@ -0,0 +1,40 @@
+import asyncio
+
+import httpx
+import pytest
+
+from agents.http_client import OrdersApiClient, OrdersApiStatusError
+
+
+def _run(handler, method, endpoint):
+    async def scenario():
+        client = OrdersApiClient("http://orders.test", backoff_base=0.0, backoff_max=0.0)
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        client._loop = asyncio.get_running_loop()
+        try:
+            return await client.request(method, endpoint)
+        finally:
+            await client.aclose()
+
+    return asyncio.run(scenario())
+
+
+def test_retried_delete_that_already_applied_is_a_success():
+    attempts = []
+
+    def handler(request):
+        attempts.append(request.method)
+        if len(attempts) == 1:
+            raise httpx.ReadTimeout("timeout", request=request)
+        return httpx.Response(404, json={"detail": "Not found"})
+
+    assert _run(handler, "DELETE", "/api/orders/1/items/2/") == {}
+    assert attempts == ["DELETE", "DELETE"]
+
+
+def test_delete_404_on_first_attempt_is_an_error():
+    def handler(request):
+        return httpx.Response(404, json={"detail": "Not found"})
+
+    with pytest.raises(OrdersApiStatusError):
+        _run(handler, "DELETE", "/api/orders/1/items/2/")
@@ -0,0 +1,37 @@
+import os
+import threading
+import time
+
+from agents.menu_catalog import MenuCatalog
+
+ROWS = [("Calabresa", "Grande", "Tradicional", 50.0)]
+
+
+def test_lookups_do_not_wait_for_a_background_reload(tmp_path):
+    source = tmp_path / "menu.db"
+    source.write_text("")
+    reloading = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        if len(calls) > 1:
+            reloading.set()
+            release.wait(5)
+        return ROWS
+
+    catalog = MenuCatalog(loader, db_path=str(source), check_interval=0)
+    assert catalog.menu()[0]["pizza_name"] == "Calabresa"
+
+    os.utime(source, (time.time() + 10, time.time() + 10))
+    catalog.menu()
+    assert reloading.wait(5)
+    started = time.monotonic()
+    for _ in range(3):
+        catalog.menu()
+    elapsed = time.monotonic() - started
+    release.set()
+
+    assert elapsed < 1
+    assert len(calls) == 2
@@ -0,0 +1,66 @@
+import asyncio
+
+from agents.api_cache import ResponseCache, order_tag
+from agents.prefetch import Prefetcher
+
+
+def _plan(endpoint, started, release):
+    async def plan(mark):
+        mark(endpoint)
+        started.set()
+        await release.wait()
+
+    return plan
+
+
+def test_sessions_do_not_cancel_or_claim_each_others_prefetch():
+    async def scenario():
+        prefetcher = Prefetcher("test")
+        first, second = {}, {}
+        release = asyncio.Event()
+        started = [asyncio.Event(), asyncio.Event()]
+
+        assert prefetcher.start(first, "12345678909", _plan("/orders/a", started[0], release))
+        assert prefetcher.start(second, "12345678909", _plan("/orders/a", started[1], release))
+        await asyncio.gather(*(event.wait() for event in started))
+
+        # Trocar de documento só cancela a busca da própria sessão.
+        prefetcher.start(second, "98765432100", _plan("/orders/b", asyncio.Event(), release))
+        await asyncio.sleep(0)
+        assert prefetcher.stats()["cancelled"] == 1
+
+        assert not prefetcher.claim({}, "/orders/a")
+        assert not prefetcher.claim(second, "/orders/a")
+        assert prefetcher.claim(first, "/orders/a")
+        assert first["prefetch"]["used"] == 1
+
+        release.set()
+        await prefetcher.cancel_all()
+
+    asyncio.run(scenario())
+
+
+def test_claim_ignores_prefetches_dropped_from_the_cache():
+    async def scenario():
+        cache = ResponseCache()
+        prefetcher = Prefetcher("test-cache", cache=cache)
+        state = {}
+
+        async def fetch():
+            return [{"id": 1}]
+
+        async def plan(mark):
+            for endpoint in ("/orders/a", "/orders/b"):
+                mark(endpoint)
+                await cache.get_or_fetch(endpoint, fetch, [order_tag(1) if endpoint.endswith("a") else order_tag(2)])
+
+        assert prefetcher.start(state, "12345678909", plan)
+        await asyncio.sleep(0.01)
+        cache.invalidate(order_tag(1))
+
+        assert not prefetcher.claim(state, "/orders/a")
+        assert prefetcher.claim(state, "/orders/b")
+        assert state["prefetch"]["used"] == 1
+        assert prefetcher.stats()["expired"] == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,22 @@
+import pytest
+
+from agents.menu_catalog import MenuCatalog
+from agents.pricing import PricingEngine, PricingError
+
+ROWS = [
+    ("Frango com Bacon", "Grande", "Tradicional", 55.0),
+    ("Frango com Catupiry", "Grande", "Tradicional", 52.0),
+    ("Calabresa", "Grande", "Tradicional", 50.0),
+]
+
+
+def test_quote_rejects_tied_flavours():
+    engine = PricingEngine(MenuCatalog(lambda: ROWS), match_margin=0.05)
+
+    with pytest.raises(PricingError) as excinfo:
+        engine.quote("frango", "grande", "tradicional")
+
+    assert "Frango com Bacon" in str(excinfo.value)
+    assert "Frango com Catupiry" in str(excinfo.value)
+    assert engine.quote("frango com catupiry", "grande", "tradicional").unit_price == 52.0
+    assert engine.quote("calabresa", "grande", "tradicional").pizza_name == "Calabresa"
@@ -0,0 +1,20 @@
+import pytest
+
+from agents.storage import InMemorySessionStore, SessionStore
+
+
+def test_incomplete_store_fails_on_instantiation():
+    class PartialStore(SessionStore):
+        def get(self, session_id):
+            return None
+
+    with pytest.raises(TypeError):
+        PartialStore()
+
+
+def test_in_memory_store_round_trip():
+    store = InMemorySessionStore(ttl=60)
+    store.put("s1", {"active_agent": "create_order"})
+    assert store.get("s1") == {"active_agent": "create_order"}
+    store.delete("s1")
+    assert store.get("s1") is None
@@ -0,0 +1,39 @@
+from supervisor import merge_prometheus, merge_snapshots
+
+
+def test_merge_snapshots_sums_counters():
+    merged = merge_snapshots({
+        "0": {"counters": {'router_decisions_total{route="keyword"}': 3.0}, "gauges": {}},
+        "1": {"counters": {'router_decisions_total{route="keyword"}': 2.0}, "gauges": {}},
+    })
+    assert merged == {'router_decisions_total{route="keyword"}': 5.0}
+
+
+def test_merge_snapshots_keeps_gauges_per_worker():
+    merged = merge_snapshots({
+        "0": {"counters": {}, "gauges": {"router_llm_calls_saved_ratio": 0.9, 'orders_api_circuit_open{breaker="orders_api"}': 1.0}},
+        "1": {"counters": {}, "gauges": {"router_llm_calls_saved_ratio": 0.9, 'orders_api_circuit_open{breaker="orders_api"}': 0.0}},
+        None: {"counters": {}, "gauges": {"supervisor_workers_ready": 2.0}},
+    })
+    assert merged == {
+        'orders_api_circuit_open{worker="0",breaker="orders_api"}': 1.0,
+        'orders_api_circuit_open{worker="1",breaker="orders_api"}': 0.0,
+        'router_llm_calls_saved_ratio{worker="0"}': 0.9,
+        'router_llm_calls_saved_ratio{worker="1"}': 0.9,
+        "supervisor_workers_ready": 2.0,
+    }
+
+
+def test_merge_prometheus_labels_worker_samples():
+    text = merge_prometheus({
+        "0": "# TYPE startup_seconds gauge\nstartup_seconds 1.5\n",
+        "1": "# TYPE startup_seconds gauge\nstartup_seconds 2.0\n",
+        None: "# TYPE supervisor_workers_ready gauge\nsupervisor_workers_ready 2\n",
+    })
+    assert text.splitlines() == [
+        "# TYPE startup_seconds gauge",
+        'startup_seconds{worker="0"} 1.5',
+        'startup_seconds{worker="1"} 2.0',
+        "# TYPE supervisor_workers_ready gauge",
+        "supervisor_workers_ready 2",
+    ]
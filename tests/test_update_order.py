@@ -0,0 +1,41 @@
+import asyncio
+
+from agents.cart import OrderDraft
+from agents.update_order import tools
+
+ORDER = {"id": 7, "items": [{"id": 70, "name": "Calabresa - Grande - Tradicional", "quantity": 1, "unit_price": 50.0}]}
+
+
+def test_cancelled_update_cancels_pending_requests_and_keeps_applied_changes(monkeypatch):
+    cancelled = []
+
+    async def make_request(method, endpoint, data=None, idempotency_key=None):
+        if endpoint.endswith("add-items/"):
+            return {}
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.append(endpoint)
+            raise
+
+    monkeypatch.setattr(tools, "make_request", make_request)
+
+    async def scenario():
+        state = {}
+        draft = OrderDraft()
+        draft.select(ORDER)
+        draft.add_item({"name": "Mussarela", "size": "Grande", "crust": "Tradicional", "quantity": 1, "unit_price": 45.0})
+        draft.set_address("Rua A", 10, "", "")
+        draft.save(state)
+
+        try:
+            await asyncio.wait_for(tools.process_order_updates(state), 0.05)
+        except asyncio.TimeoutError:
+            pass
+        return OrderDraft.from_state(state)
+
+    draft = asyncio.run(scenario())
+
+    assert cancelled == ["/api/orders/7/update-address/"]
+    assert draft.additions() == []
+    assert draft.address()["street_name"] == "Rua A"